@@ -31,3 +31,23 @@ class IsStaffOrUserInRequest(IsUserInRequest):
             return True
 
         return super(IsStaffOrUserInRequest, self).has_permission(request, view)
+
+
+class IsStaffOrUserInBatchRequest(permissions.BasePermission):
+    """
+    Permission that checks to see if the request user is staff or is the only user
+    indicated in the consent requests listed in the request body.
+    """
+
+    def has_permission(self, request, view):
+        if request.user.is_staff:
+            return True
+
+        consent_requests = request.data.get(view.REQUIRED_PARAM_CONSENT_REQUESTS)
+        if not isinstance(consent_requests, list) or not consent_requests:
+            return False
+        return all(
+            isinstance(consent_request, dict) and
+            request.user.username == consent_request.get(view.REQUIRED_PARAM_USERNAME)
+            for consent_request in consent_requests
+        )
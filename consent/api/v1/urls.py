@@ -4,13 +4,14 @@ URL definitions for version 1 of the Consent API.
 
 Currently supports the following services:
     ``data_sharing_consent``: Allows for getting, providing, and revoking consent to share data.
+    ``data_sharing_consent/batch``: Allows for getting the consent state of many users and courses at once.
 """
 
 from __future__ import absolute_import, unicode_literals
 
 from django.conf.urls import url
 
-from .views import DataSharingConsentView
+from .views import DataSharingConsentBatchView, DataSharingConsentView
 
 urlpatterns = [
     url(
@@ -18,4 +19,9 @@ urlpatterns = [
         DataSharingConsentView.as_view(),
         name='data_sharing_consent'
     ),
+    url(
+        r'^data_sharing_consent/batch$',
+        DataSharingConsentBatchView.as_view(),
+        name='data_sharing_consent_batch'
+    ),
 ]
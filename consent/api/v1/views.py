@@ -7,14 +7,17 @@ from __future__ import absolute_import, unicode_literals
 
 from consent.api import permissions
 from consent.errors import ConsentAPIRequestError
-from consent.helpers import get_data_sharing_consent
+from consent.helpers import get_course_data_sharing_consents, get_data_sharing_consent
 from edx_rest_framework_extensions.authentication import BearerAuthentication, JwtAuthentication
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from rest_framework.views import APIView
 
+from django.utils.decorators import method_decorator
+
 from enterprise.api.throttles import ServiceUserThrottle
+from enterprise.decorators import memoize_per_request
 from enterprise.utils import get_request_value
 
 
@@ -140,6 +143,7 @@ class DataSharingConsentView(APIView):
 
         return Response(data, status=HTTP_200_OK)
 
+    @method_decorator(memoize_per_request)
     def get(self, request):
         """
         GET /consent/api/v1/data_sharing_consent?username=bob&course_id=id&enterprise_customer_uuid=uuid
@@ -159,6 +163,7 @@ class DataSharingConsentView(APIView):
 
         return Response(consent_record.serialize(), status=HTTP_200_OK)
 
+    @method_decorator(memoize_per_request)
     def post(self, request):
         """
         POST /consent/api/v1/data_sharing_consent
@@ -198,6 +203,7 @@ class DataSharingConsentView(APIView):
 
         return Response(consent_record.serialize())
 
+    @method_decorator(memoize_per_request)
     def delete(self, request):
         """
         DELETE /consent/api/v1/data_sharing_consent
@@ -235,3 +241,146 @@ class DataSharingConsentView(APIView):
             return Response({'error': str(invalid_request)}, status=HTTP_400_BAD_REQUEST)
 
         return Response(consent_record.serialize())
+
+
+class DataSharingConsentBatchView(APIView):
+    """
+        **Use Cases**
+
+            Presents the data sharing consent state of many (username, course)
+            pairs of a single Enterprise customer in one request, for
+            applications that would otherwise call the data sharing consent
+            API in a loop (e.g. the learner dashboard).
+
+        **Behavior**
+
+            POST /consent/api/v1/data_sharing_consent/batch
+            >>> {
+            >>>     "enterprise_customer_uuid": "enterprise-uuid-goes-right-here",
+            >>>     "consent_requests": [
+            >>>         {"username": "bob", "course_id": "course-v1:edX+DemoX+Demo_Course"},
+            >>>         {"username": "bob", "course_id": "edX+DemoX"}
+            >>>     ]
+            >>> }
+            >>> {
+            >>>     "enterprise_customer_uuid": "enterprise-uuid-goes-right-here",
+            >>>     "results": [
+            >>>         {
+            >>>             "username": "bob",
+            >>>             "course_id": "course-v1:edX+DemoX+Demo_Course",
+            >>>             "enterprise_customer_uuid": "enterprise-uuid-goes-right-here",
+            >>>             "exists": False,
+            >>>             "consent_provided": False,
+            >>>             "consent_required": True,
+            >>>         },
+            >>>         ...
+            >>>     ]
+            >>> }
+
+            Results are returned in the order of the consent requests. Consent
+            state is only read; use the data sharing consent API to grant or
+            revoke consent. Non-staff users may only request their own consent
+            state.
+
+    """
+
+    permission_classes = (permissions.IsStaffOrUserInBatchRequest,)
+    authentication_classes = (JwtAuthentication, BearerAuthentication, SessionAuthentication,)
+    throttle_classes = (ServiceUserThrottle,)
+
+    REQUIRED_PARAM_USERNAME = DataSharingConsentView.REQUIRED_PARAM_USERNAME
+    REQUIRED_PARAM_COURSE_ID = DataSharingConsentView.REQUIRED_PARAM_COURSE_ID
+    REQUIRED_PARAM_ENTERPRISE_CUSTOMER = DataSharingConsentView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER
+    REQUIRED_PARAM_CONSENT_REQUESTS = 'consent_requests'
+
+    MAX_CONSENT_REQUESTS = 100
+
+    MISSING_REQUIRED_PARAMS_MSG = DataSharingConsentView.MISSING_REQUIRED_PARAMS_MSG
+    INVALID_CONSENT_REQUESTS_MSG = (
+        "'consent_requests' must be a list of at most {max_requests} objects, "
+        "each with a 'username' and a 'course_id'."
+    )
+
+    def get_username_course_pairs(self, request):
+        """
+        Get the ``enterprise_customer_uuid`` and the (username, course_id) pairs from the request body.
+        """
+        enterprise_customer_uuid = request.data.get(self.REQUIRED_PARAM_ENTERPRISE_CUSTOMER)
+        consent_requests = request.data.get(self.REQUIRED_PARAM_CONSENT_REQUESTS)
+        if not (enterprise_customer_uuid and consent_requests):
+            raise ConsentAPIRequestError(
+                self.MISSING_REQUIRED_PARAMS_MSG.format(', '.join(
+                    name for name, present in (
+                        ("'enterprise_customer_uuid'", bool(enterprise_customer_uuid)),
+                        ("'consent_requests'", bool(consent_requests)),
+                    ) if not present
+                ))
+            )
+
+        invalid_requests = (
+            not isinstance(consent_requests, list) or
+            len(consent_requests) > self.MAX_CONSENT_REQUESTS or
+            not all(
+                isinstance(consent_request, dict) and
+                consent_request.get(self.REQUIRED_PARAM_USERNAME) and
+                consent_request.get(self.REQUIRED_PARAM_COURSE_ID)
+                for consent_request in consent_requests
+            )
+        )
+        if invalid_requests:
+            raise ConsentAPIRequestError(
+                self.INVALID_CONSENT_REQUESTS_MSG.format(max_requests=self.MAX_CONSENT_REQUESTS)
+            )
+
+        username_course_pairs = [
+            (consent_request[self.REQUIRED_PARAM_USERNAME], consent_request[self.REQUIRED_PARAM_COURSE_ID])
+            for consent_request in consent_requests
+        ]
+        return enterprise_customer_uuid, username_course_pairs
+
+    def get_no_record_data(self, username, course_id, enterprise_customer_uuid):
+        """
+        Get the consent state to report when there's no related EnterpriseCustomer.
+        """
+        return {
+            self.REQUIRED_PARAM_USERNAME: username,
+            self.REQUIRED_PARAM_COURSE_ID: course_id,
+            self.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: enterprise_customer_uuid,
+            DataSharingConsentView.CONSENT_EXISTS: False,
+            DataSharingConsentView.CONSENT_GRANTED: False,
+            DataSharingConsentView.CONSENT_REQUIRED: False,
+        }
+
+    @method_decorator(memoize_per_request)
+    def post(self, request):
+        """
+        POST /consent/api/v1/data_sharing_consent/batch
+
+        Keys:
+        *enterprise_customer_uuid*
+            The UUID of the enterprise customer that requires consent.
+        *consent_requests*
+            A list of objects, each with the edX ``username`` from whom to get consent
+            and the ``course_id`` for which consent is granted.
+        """
+        try:
+            enterprise_customer_uuid, username_course_pairs = self.get_username_course_pairs(request)
+        except ConsentAPIRequestError as invalid_request:
+            return Response({'error': str(invalid_request)}, status=HTTP_400_BAD_REQUEST)
+
+        consent_records = get_course_data_sharing_consents(username_course_pairs, enterprise_customer_uuid)
+        if consent_records is None:
+            results = [
+                self.get_no_record_data(username, course_id, enterprise_customer_uuid)
+                for username, course_id in username_course_pairs
+            ]
+        else:
+            results = [consent_record.serialize() for consent_record in consent_records]
+
+        return Response(
+            {
+                self.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: enterprise_customer_uuid,
+                'results': results,
+            },
+            status=HTTP_200_OK
+        )
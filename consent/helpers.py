@@ -8,8 +8,10 @@ from __future__ import absolute_import, unicode_literals
 from consent.models import ProxyDataSharingConsent
 
 from django.apps import apps
+from django.contrib.auth.models import User
 
 from enterprise.api_client.discovery import CourseCatalogApiServiceClient
+from enterprise.models import EnterpriseCourseEnrollment
 from enterprise.utils import get_enterprise_customer
 
 
@@ -87,6 +89,8 @@ def get_program_data_sharing_consent(username, program_uuid, enterprise_customer
     """
     Get the data sharing consent object associated with a certain user of a customer for a program.
 
+    The consent records of all of the program's courses are loaded with a single query.
+
     :param username: The user that grants consent.
     :param program_uuid: The program for which consent is granted.
     :param enterprise_customer_uuid: The consent requester.
@@ -94,8 +98,56 @@ def get_program_data_sharing_consent(username, program_uuid, enterprise_customer
     """
     discovery_client = CourseCatalogApiServiceClient()
     course_ids = discovery_client.get_program_course_keys(program_uuid)
-    child_consents = (
-        get_data_sharing_consent(username, enterprise_customer_uuid, course_id=individual_course_id)
-        for individual_course_id in course_ids
+    enterprise_customer = get_enterprise_customer(enterprise_customer_uuid)
+    if enterprise_customer is None:
+        return None
+
+    # Prevent circular imports.
+    DataSharingConsent = apps.get_model('consent', 'DataSharingConsent')  # pylint: disable=invalid-name
+    child_consents = DataSharingConsent.objects.proxied_get_many(
+        enterprise_customer,
+        [(username, individual_course_id) for individual_course_id in course_ids]
     )
     return ProxyDataSharingConsent.from_children(program_uuid, *child_consents)
+
+
+def get_course_data_sharing_consents(username_course_pairs, enterprise_customer_uuid):
+    """
+    Get the data sharing consent objects associated with many users and courses of a customer at once.
+
+    Consent records, including the course-level fallback for course run IDs, are looked up with one query;
+    whether a related enterprise enrollment exists is resolved with two more queries for the whole batch.
+
+    :param username_course_pairs: An iterable of ``(username, course_id)`` tuples.
+    :param enterprise_customer_uuid: The consent requester.
+    :return: A list of data sharing consent objects in the order of the given pairs, or None if the
+             enterprise customer for the given UUID does not exist.
+    """
+    enterprise_customer = get_enterprise_customer(enterprise_customer_uuid)
+    if enterprise_customer is None:
+        return None
+
+    # Prevent circular imports.
+    DataSharingConsent = apps.get_model('consent', 'DataSharingConsent')  # pylint: disable=invalid-name
+    consents = DataSharingConsent.objects.proxied_get_many(enterprise_customer, username_course_pairs)
+
+    proxied_consents = [consent for consent in consents if isinstance(consent, ProxyDataSharingConsent)]
+    if proxied_consents:
+        user_ids = dict(
+            User.objects.filter(
+                username__in=list(set(consent.username for consent in proxied_consents))
+            ).values_list('username', 'id')
+        )
+        enrollments = set(
+            EnterpriseCourseEnrollment.objects.filter(
+                course_id__in=list(set(consent.course_id for consent in proxied_consents)),
+                enterprise_customer_user__user_id__in=list(user_ids.values()),
+                enterprise_customer_user__enterprise_customer=enterprise_customer,
+            ).values_list('enterprise_customer_user__user_id', 'course_id')
+        )
+        for consent in proxied_consents:
+            consent._enterprise_enrollment_exists = (  # pylint: disable=protected-access
+                (user_ids.get(consent.username), consent.course_id) in enrollments
+            )
+
+    return consents
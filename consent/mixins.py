@@ -9,6 +9,7 @@ from django.contrib.auth.models import User
 from django.utils.encoding import python_2_unicode_compatible
 
 from enterprise.models import EnterpriseCourseEnrollment
+from enterprise.utils import get_request_memoized
 
 
 @python_2_unicode_compatible
@@ -39,32 +40,60 @@ class ConsentModelMixin(object):
         """
         children = getattr(self, '_child_consents', [])
         if children:
-            return any((child.consent_required() for child in children))
+            # Check the catalog containment of all of the children's courses at once.
+            pending_children = [child for child in children if not child.granted]
+            if not pending_children:
+                return False
+            enterprise_customer = pending_children[0].enterprise_customer
+            if not enterprise_customer.enforces_data_sharing_consent('at_enrollment'):
+                return False
+            containment = enterprise_customer.catalog_contains_courses(child.course_id for child in pending_children)
+            return any(containment.values())
 
         if self.granted:
             return False
 
-        return bool(
-            (self.enterprise_customer.enforces_data_sharing_consent('at_enrollment')) and
-            (self.enterprise_customer.catalog_contains_course(self.course_id))
-        )
+        if not self.enterprise_customer.enforces_data_sharing_consent('at_enrollment'):
+            return False
+        # The catalog containment may have been resolved ahead of time for many records at once.
+        contained = getattr(self, '_catalog_contains_course', None)
+        if contained is None:
+            contained = self.enterprise_customer.catalog_contains_course(self.course_id)
+        return bool(contained)
 
     @property
     def enterprise_enrollment_exists(self):
         """
         Determine whether there exists an EnterpriseCourseEnrollment related to this consent record.
+
+        The answer may have been resolved ahead of time for many records at once, in which case it is
+        stored in ``_enterprise_enrollment_exists``. Otherwise, it is memoized there and for the rest
+        of the request, if any.
         """
-        if self.course_id:
-            try:
-                user_id = User.objects.get(username=self.username).pk
-            except User.DoesNotExist:
-                return False
-            return EnterpriseCourseEnrollment.objects.filter(
-                course_id=self.course_id,
-                enterprise_customer_user__user_id=user_id,
-                enterprise_customer_user__enterprise_customer=self.enterprise_customer,
-            ).exists()
-        return False
+        resolved = getattr(self, '_enterprise_enrollment_exists', None)
+        if resolved is not None:
+            return resolved
+        if not self.course_id:
+            return False
+        self._enterprise_enrollment_exists = get_request_memoized(  # pylint: disable=attribute-defined-outside-init
+            ('enterprise_enrollment_exists', self.enterprise_customer.uuid, self.username, self.course_id),
+            self._get_enterprise_enrollment_exists
+        )
+        return self._enterprise_enrollment_exists
+
+    def _get_enterprise_enrollment_exists(self):
+        """
+        Query whether there exists an EnterpriseCourseEnrollment related to this consent record.
+        """
+        try:
+            user_id = User.objects.get(username=self.username).pk
+        except User.DoesNotExist:
+            return False
+        return EnterpriseCourseEnrollment.objects.filter(
+            course_id=self.course_id,
+            enterprise_customer_user__user_id=user_id,
+            enterprise_customer_user__enterprise_customer=self.enterprise_customer,
+        ).exists()
 
     @property
     def exists(self):
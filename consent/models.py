@@ -5,20 +5,40 @@ Models for edX Enterprise's Consent application.
 
 from __future__ import absolute_import, unicode_literals
 
+from logging import getLogger
+
 from consent.errors import InvalidProxyConsent
 from consent.mixins import ConsentModelMixin
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from simple_history.models import HistoricalRecords
 
-from django.db import models
+from django.contrib.auth.models import User
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from model_utils.models import TimeStampedModel
 
-from enterprise.models import EnterpriseCustomer
+from enterprise.models import EnterpriseCustomer, EnterpriseCustomerUser
 from enterprise.utils import get_course_id_from_course_run_id
 
+LOGGER = getLogger(__name__)
+
+
+def get_consent_course_id_candidates(course_id):
+    """
+    Return the course IDs under which consent for the given course or course run may be stored, best match first.
+
+    Consent for a course run may be recorded either for the run itself or for its parent course.
+    """
+    try:
+        course_run_key = str(CourseKey.from_string(course_id))
+    except InvalidKeyError:
+        # The ID we have is for a course instead of a course run.
+        return [course_id]
+    return [course_id, get_course_id_from_course_run_id(course_run_key)]
+
 
 class DataSharingConsentQuerySet(models.query.QuerySet):
     """
@@ -35,29 +55,184 @@ class DataSharingConsentQuerySet(models.query.QuerySet):
 
         This customizes the queryset to return an instance of ``ProxyDataSharingConsent`` when
         the searched-for ``DataSharingConsent`` instance does not exist.
+
+        When a course run ID is given, the records for the course run and for its parent course are
+        fetched with a single query, and the course run record is preferred. As with ``get``,
+        ``MultipleObjectsReturned`` is raised if several records match the same course or course run.
+        An already-loaded
+        ``EnterpriseCustomer`` passed as ``enterprise_customer`` is attached to the returned object,
+        so that it isn't looked up again.
         """
         original_kwargs = kwargs.copy()
+        enterprise_customer = kwargs.get('enterprise_customer')
         if 'course_id' in kwargs:
+            course_ids = get_consent_course_id_candidates(kwargs.pop('course_id'))
+            kwargs['course_id__in'] = course_ids
+            queryset = self.filter(*args, **kwargs)
+            if enterprise_customer is None:
+                queryset = queryset.select_related('enterprise_customer')
+            records = {}
+            for record in queryset:
+                if record.course_id in records:
+                    raise DataSharingConsent.MultipleObjectsReturned(
+                        'proxied_get() returned more than one DataSharingConsent for course {}.'.format(
+                            record.course_id
+                        )
+                    )
+                records[record.course_id] = record
+            # Candidates are ordered from the course run to its parent course, so the course run record wins.
+            consent = next((records[course_id] for course_id in course_ids if course_id in records), None)
+        else:
             try:
-                # Check if we have a course ID or a course run ID
-                course_run_key = str(CourseKey.from_string(kwargs['course_id']))
-            except InvalidKeyError:
-                # The ID we have is for a course instead of a course run; fall through
-                # to the second check.
-                pass
-            else:
-                try:
-                    # Try to get the record for the course run specifically
-                    return self.get(*args, **kwargs)
-                except DataSharingConsent.DoesNotExist:
-                    # A record for the course run didn't exist, so modify the query
-                    # parameters to look for just a course record on the second pass.
-                    kwargs['course_id'] = get_course_id_from_course_run_id(course_run_key)
+                consent = self.get(*args, **kwargs)
+            except DataSharingConsent.DoesNotExist:
+                consent = None
 
-        try:
-            return self.get(*args, **kwargs)
-        except DataSharingConsent.DoesNotExist:
+        if consent is None:
             return ProxyDataSharingConsent(**original_kwargs)
+        if isinstance(enterprise_customer, EnterpriseCustomer):
+            consent.enterprise_customer = enterprise_customer
+        return consent
+
+    def proxied_get_many(self, enterprise_customer, username_course_pairs):
+        """
+        Perform ``proxied_get`` for many (username, course ID) pairs of one enterprise customer at once.
+
+        All candidate records, including the course records used as a fallback for course run IDs,
+        are fetched with a single query and matched in memory.
+
+        Arguments:
+            enterprise_customer (EnterpriseCustomer): The consent requester.
+            username_course_pairs (iterable): ``(username, course_id)`` tuples.
+
+        Returns:
+            list: One ``DataSharingConsent`` or ``ProxyDataSharingConsent`` per pair, in the same order.
+        """
+        username_course_pairs = list(username_course_pairs)
+        candidates = [
+            (username, get_consent_course_id_candidates(course_id))
+            for username, course_id in username_course_pairs
+        ]
+        usernames = set(username for username, __ in candidates)
+        course_ids = set(course_id for __, course_ids in candidates for course_id in course_ids)
+
+        records = {}
+        if usernames and course_ids:
+            for record in self.filter(
+                    enterprise_customer=enterprise_customer,
+                    username__in=list(usernames),
+                    course_id__in=list(course_ids),
+            ):
+                record.enterprise_customer = enterprise_customer
+                records[(record.username, record.course_id)] = record
+
+        consents = []
+        for (username, course_id), (__, course_ids) in zip(username_course_pairs, candidates):
+            consent = next(
+                (records[(username, candidate)] for candidate in course_ids if (username, candidate) in records),
+                None
+            )
+            if consent is None:
+                consent = ProxyDataSharingConsent(
+                    enterprise_customer=enterprise_customer,
+                    username=username,
+                    course_id=course_id,
+                )
+            consents.append(consent)
+        return consents
+
+    def bulk_update_or_create(self, consents, granted):
+        """
+        Set the consent state of many consent objects at once, creating the records that don't exist yet.
+
+        All of the records are written with a few queries inside a single transaction. ``update`` and
+        ``bulk_create`` bypass ``simple_history``, so the matching historical records are written in bulk
+        as well. If another process creates one of the records concurrently, the records are updated or
+        created one at a time instead.
+
+        Arguments:
+            consents (iterable): ``DataSharingConsent`` or ``ProxyDataSharingConsent`` objects.
+            granted (bool): The consent state to set.
+
+        Returns:
+            list: The ``DataSharingConsent`` records, in the order of the given consent objects.
+        """
+        consents = list(consents)
+        if not consents:
+            return []
+
+        enterprise_customers = {consent.enterprise_customer.pk: consent.enterprise_customer for consent in consents}
+        keys = [(consent.enterprise_customer.pk, consent.username, consent.course_id) for consent in consents]
+        key_set = set(keys)
+
+        def get_records():
+            """
+            Get the records matching any of the consent objects, by (enterprise customer ID, username, course ID).
+            """
+            records = {}
+            for record in self.filter(
+                    enterprise_customer_id__in=list(enterprise_customers),
+                    username__in=list(set(key[1] for key in keys)),
+                    course_id__in=list(set(key[2] for key in keys)),
+            ):
+                key = (record.enterprise_customer_id, record.username, record.course_id)
+                if key in key_set:
+                    record.enterprise_customer = enterprise_customers[record.enterprise_customer_id]
+                    records[key] = record
+            return records
+
+        try:
+            with transaction.atomic():
+                existing_records = get_records()
+                missing_keys = [key for key in key_set if key not in existing_records]
+                now = timezone.now()
+                if existing_records:
+                    self.filter(
+                        pk__in=[record.pk for record in existing_records.values()]
+                    ).update(granted=granted, modified=now)
+                self.bulk_create([
+                    DataSharingConsent(
+                        enterprise_customer=enterprise_customers[enterprise_customer_id],
+                        username=username,
+                        course_id=course_id,
+                        granted=granted,
+                    )
+                    for enterprise_customer_id, username, course_id in missing_keys
+                ])
+                records = get_records()
+                history_model = DataSharingConsent.history.model
+                history_model.objects.bulk_create([
+                    history_model(
+                        history_date=now,
+                        history_type='~' if key in existing_records else '+',
+                        **{
+                            field.attname: getattr(record, field.attname)
+                            for field in DataSharingConsent._meta.fields  # pylint: disable=protected-access
+                        }
+                    )
+                    for key, record in records.items()
+                ])
+            # update() and bulk_create() don't send the signals that drop cached learner entitlements.
+            user_ids = dict(
+                User.objects.filter(username__in=list(set(key[1] for key in keys))).values_list('username', 'id')
+            )
+            for enterprise_customer_id, username, __ in records:
+                if username in user_ids:
+                    EnterpriseCustomerUser.clear_cached_entitlements(enterprise_customer_id, user_ids[username])
+        except IntegrityError:
+            LOGGER.warning(
+                'Conflicting DataSharingConsent records created concurrently, updating records one at a time.'
+            )
+            records = {}
+            for key, consent in zip(keys, consents):
+                records[key], __ = self.update_or_create(
+                    enterprise_customer=consent.enterprise_customer,
+                    username=consent.username,
+                    course_id=consent.course_id,
+                    defaults={'granted': granted},
+                )
+
+        return [records[key] for key in keys]
 
 
 class DataSharingConsentManager(models.Manager.from_queryset(DataSharingConsentQuerySet)):  # pylint: disable=no-member
@@ -106,7 +281,9 @@ class ProxyDataSharingConsent(ConsentModelMixin):
                 enterprise_customer_detail = key[len('enterprise_customer__'):]
                 ec_keys[enterprise_customer_detail] = kwargs[key]
 
-        if ec_keys:
+        if list(ec_keys) == ['uuid']:
+            enterprise_customer = EnterpriseCustomer.get_cached(ec_keys['uuid'])
+        elif ec_keys:
             enterprise_customer = EnterpriseCustomer.objects.get(**ec_keys)  # pylint: disable=no-member
 
         self.enterprise_customer = enterprise_customer
@@ -151,12 +328,7 @@ class ProxyDataSharingConsent(ConsentModelMixin):
         :return: A ``DataSharingConsent`` object if validation is successful, otherwise ``None``.
         """
         if self._child_consents:
-            consents = []
-
-            for consent in self._child_consents:
-                consent.granted = self.granted
-                consents.append(consent.save() or consent)
-
+            consents = DataSharingConsent.objects.bulk_update_or_create(self._child_consents, self.granted)
             return ProxyDataSharingConsent.from_children(self.program_uuid, *consents)
 
         consent, _ = DataSharingConsent.objects.update_or_create(
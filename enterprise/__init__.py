@@ -4,6 +4,6 @@ Your project description goes here.
 
 from __future__ import absolute_import, unicode_literals
 
-__version__ = "0.48.2"
+__version__ = "0.48.27"
 
 default_app_config = "enterprise.apps.EnterpriseConfig"  # pylint: disable=invalid-name
@@ -163,7 +163,7 @@ class EnterpriseCustomerManageLearnersView(View):
             customer_uuid (str): A unique identifier to filter down to only users linked to a
             particular EnterpriseCustomer.
         """
-        learners = EnterpriseCustomerUser.objects.filter(enterprise_customer__uuid=customer_uuid)
+        learners = EnterpriseCustomerUser.objects.filter(enterprise_customer__uuid=customer_uuid).prefetch_users()
 
         if search_keyword is not None:
             user_ids = learners.values_list('user_id', flat=True)
@@ -31,15 +31,16 @@ class EnterpriseCourseContextSerializerMixin(object):
             'enterprise_id': enterprise_customer and str(enterprise_customer.uuid),
         }
         enterprise_context.update(**kwargs)
+        url_builder = utils.EnterpriseUrlBuilder(enterprise_customer, enterprise_context)
 
         courses = []
         for course in self.data[course_container_key]:
             courses.append(
-                self.update_course(course, enterprise_customer, enterprise_context)
+                self.update_course(course, enterprise_customer, enterprise_context, url_builder=url_builder)
             )
         self.data[course_container_key] = courses
 
-    def update_course(self, course, enterprise_customer, enterprise_context):
+    def update_course(self, course, enterprise_customer, enterprise_context, url_builder=None):
         """
         Update course metadata of the given course and return updated course.
 
@@ -47,26 +48,31 @@ class EnterpriseCourseContextSerializerMixin(object):
             course (dict): Course Metadata returned by course catalog API
             enterprise_customer (EnterpriseCustomer): enterprise customer instance.
             enterprise_context (dict): Enterprise context to be added to course runs and URLs..
+            url_builder (EnterpriseUrlBuilder): URL builder to share between courses, for the same arguments.
 
         Returns:
             (dict): Updated course metadata
         """
+        if url_builder is None:
+            url_builder = utils.EnterpriseUrlBuilder(enterprise_customer, enterprise_context)
+
         course['course_runs'] = self.update_course_runs(
             course_runs=course.get('course_runs') or [],
             enterprise_customer=enterprise_customer,
             enterprise_context=enterprise_context,
+            url_builder=url_builder,
         )
 
         # Update marketing urls in course metadata to include enterprise related info (i.e. our global context).
         marketing_url = course.get('marketing_url')
         if marketing_url:
-            course.update({"marketing_url": utils.update_query_parameters(marketing_url, enterprise_context)})
+            course.update({"marketing_url": url_builder.update_query_parameters(marketing_url)})
 
         # Finally, add context to the course as a whole.
         course.update(enterprise_context)
         return course
 
-    def update_course_runs(self, course_runs, enterprise_customer, enterprise_context):
+    def update_course_runs(self, course_runs, enterprise_customer, enterprise_context, url_builder=None):
         """
         Update Marketing urls in course metadata and return updated course.
 
@@ -74,17 +80,18 @@ class EnterpriseCourseContextSerializerMixin(object):
             course_runs (list): List of course runs.
             enterprise_customer (EnterpriseCustomer): enterprise customer instance.
             enterprise_context (dict): The context to inject into URLs.
+            url_builder (EnterpriseUrlBuilder): URL builder to share between courses, for the same arguments.
 
         Returns:
             (dict): Dictionary containing updated course metadata.
         """
+        if url_builder is None:
+            url_builder = utils.EnterpriseUrlBuilder(enterprise_customer, enterprise_context)
+
         updated_course_runs = []
         for course_run in course_runs:
-            track_selection_url = utils.get_course_track_selection_url(
-                course_run=course_run,
-                query_parameters=enterprise_context,
-            )
-            enrollment_url = enterprise_customer.get_course_run_enrollment_url(course_run.get('key'))
+            track_selection_url = url_builder.get_course_track_selection_url(course_run)
+            enrollment_url = url_builder.get_course_run_enrollment_url(course_run.get('key'))
 
             course_run.update({
                 'enrollment_url': enrollment_url,
@@ -94,8 +101,105 @@ class EnterpriseCourseContextSerializerMixin(object):
             # Update marketing urls in course metadata to include enterprise related info.
             marketing_url = course_run.get('marketing_url')
             if marketing_url:
-                course_run.update({"marketing_url": utils.update_query_parameters(marketing_url, enterprise_context)})
+                course_run.update({"marketing_url": url_builder.update_query_parameters(marketing_url)})
 
             # Add updated course run to the list.
             updated_course_runs.append(course_run)
         return updated_course_runs
+
+
+# Query parameters selecting the serialized fields, which are not to be forwarded to other services.
+SPARSE_FIELDSETS_PARAMETERS = ('fields', 'expand')
+
+
+def get_requested_fields(request):
+    """
+    Return the fields requested through the ``fields`` and ``expand`` query parameters of the request.
+
+    ``fields`` lists the fields to serialize, separated by commas, nested fields being named with dots, e.g.
+    ``?fields=user_id,enterprise_customer.uuid,enterprise_customer.name``. ``expand`` lists nested fields to
+    add to those, e.g. ``?fields=uuid,name&expand=branding_configuration``, which serializes the branding
+    configuration in full. All fields are serialized if ``fields`` is missing.
+
+    Arguments:
+        request (Request): The request, or None.
+
+    Returns:
+        dict: The requested fields, each mapped to the dict of its requested nested fields, or to None if all
+            of them are. None if all fields are requested.
+    """
+    if request is None:
+        return None
+    query_params = request.query_params if hasattr(request, 'query_params') else request.GET
+    fields = [field for value in query_params.getlist('fields') for field in value.split(',') if field.strip()]
+    if not fields:
+        return None
+
+    fields += [field for value in query_params.getlist('expand') for field in value.split(',')]
+    requested_fields = {}
+    for field_path in fields:
+        names = [name.strip() for name in field_path.split('.') if name.strip()]
+        nested_fields = requested_fields
+        for name in names[:-1]:
+            if name in nested_fields and nested_fields[name] is None:
+                # All the nested fields of this one are already requested.
+                break
+            nested_fields = nested_fields.setdefault(name, {})
+        else:
+            if names:
+                nested_fields[names[-1]] = None
+    return requested_fields
+
+
+def is_field_requested(requested_fields, field_path):
+    """
+    Return whether the field at the given dotted path is part of the requested fields.
+
+    Arguments:
+        requested_fields (dict): Fields returned by ``get_requested_fields``.
+        field_path (str): The dotted path of the field, e.g. ``enterprise_customer.site``.
+    """
+    for name in field_path.split('.'):
+        if requested_fields is None:
+            return True
+        if name not in requested_fields:
+            return False
+        requested_fields = requested_fields[name]
+    return True
+
+
+def restrict_serializer_fields(serializer, requested_fields):
+    """
+    Drop the fields of the serializer, and of its nested serializers, that are not part of the requested fields.
+
+    Arguments:
+        serializer (BaseSerializer): The serializer, or list serializer.
+        requested_fields (dict): Fields returned by ``get_requested_fields``.
+    """
+    serializer = getattr(serializer, 'child', serializer)
+    fields = serializer.fields
+    for field_name in list(fields):
+        if field_name not in requested_fields:
+            fields.pop(field_name)
+        elif requested_fields[field_name] is not None:
+            nested_serializer = getattr(fields[field_name], 'child', fields[field_name])
+            if hasattr(nested_serializer, 'fields'):
+                restrict_serializer_fields(nested_serializer, requested_fields[field_name])
+
+
+class SparseFieldsetsSerializerMixin(object):
+    """
+    Serializer mixin restricting the serialized fields to those requested through ``fields`` and ``expand``.
+
+    Nested serializers are restricted along with the serializer they are part of, so that unrequested
+    relations are not serialized, nor looked up. See ``get_requested_fields`` for the query parameters.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Drop the fields that are not requested by the request found in the context, if any.
+        """
+        super(SparseFieldsetsSerializerMixin, self).__init__(*args, **kwargs)
+        requested_fields = get_requested_fields(self.context.get('request'))
+        if requested_fields is not None:
+            restrict_serializer_fields(self, requested_fields)
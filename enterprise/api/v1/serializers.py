@@ -4,17 +4,24 @@ Serializers for enterprise api version 1.
 """
 from __future__ import absolute_import, unicode_literals
 
-import copy
+from collections import defaultdict
 
 from rest_framework import serializers
 
+from django.apps import apps
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.utils.translation import ugettext_lazy as _
 
 from enterprise import models
-from enterprise.api.v1.mixins import EnterpriseCourseContextSerializerMixin
-from enterprise.utils import update_query_parameters
+from enterprise.api.v1.mixins import (
+    SPARSE_FIELDSETS_PARAMETERS,
+    EnterpriseCourseContextSerializerMixin,
+    SparseFieldsetsSerializerMixin,
+    get_requested_fields,
+    is_field_requested,
+)
+from enterprise.utils import EnterpriseUrlBuilder, update_query_parameters
 
 
 class ImmutableStateSerializer(serializers.Serializer):
@@ -70,7 +77,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class EnterpriseCustomerBrandingConfigurationSerializer(serializers.ModelSerializer):
+class EnterpriseCustomerBrandingConfigurationSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for EnterpriseCustomerBrandingConfiguration model.
     """
@@ -82,7 +89,7 @@ class EnterpriseCustomerBrandingConfigurationSerializer(serializers.ModelSeriali
         )
 
 
-class EnterpriseCustomerEntitlementSerializer(serializers.ModelSerializer):
+class EnterpriseCustomerEntitlementSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for EnterpriseCustomerEntitlement model.
     """
@@ -94,7 +101,7 @@ class EnterpriseCustomerEntitlementSerializer(serializers.ModelSerializer):
         )
 
 
-class EnterpriseCustomerSerializer(serializers.ModelSerializer):
+class EnterpriseCustomerSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for EnterpriseCustomer model.
     """
@@ -114,7 +121,7 @@ class EnterpriseCustomerSerializer(serializers.ModelSerializer):
     )
 
 
-class EnterpriseCourseEnrollmentReadOnlySerializer(serializers.ModelSerializer):
+class EnterpriseCourseEnrollmentReadOnlySerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for EnterpriseCourseEnrollment model.
     """
@@ -169,7 +176,7 @@ class EnterpriseCourseEnrollmentWriteSerializer(serializers.ModelSerializer):
         )
 
 
-class EnterpriseCustomerCatalogSerializer(serializers.ModelSerializer):
+class EnterpriseCustomerCatalogSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the ``EnterpriseCustomerCatalog`` model.
     """
@@ -187,6 +194,9 @@ class EnterpriseCustomerCatalogDetailSerializer(EnterpriseCustomerCatalogSeriali
     the catalog's discovery service search query results.
     """
 
+    # Fields of the representation that come from the discovery service search.
+    SEARCH_FIELDS = ('count', 'previous', 'next', 'results')
+
     def to_representation(self, instance):
         """
         Serialize the EnterpriseCustomerCatalog object.
@@ -202,18 +212,27 @@ class EnterpriseCustomerCatalogDetailSerializer(EnterpriseCustomerCatalogSeriali
 
         representation = super(EnterpriseCustomerCatalogDetailSerializer, self).to_representation(instance)
 
+        # Skip the discovery service search altogether when none of its fields are requested.
+        requested_fields = get_requested_fields(request)
+        search_fields = [
+            field for field in self.SEARCH_FIELDS if is_field_requested(requested_fields, field)
+        ]
+        if not search_fields:
+            return representation
+
         # Retrieve the EnterpriseCustomerCatalog search results from the discovery service.
-        paginated_content = instance.get_paginated_content(request.GET)
+        paginated_content = instance.get_paginated_content({
+            key: value for key, value in request.GET.items() if key not in SPARSE_FIELDSETS_PARAMETERS
+        })
         count = paginated_content['count']
         search_results = paginated_content['results']
 
         # Add the Enterprise enrollment URL to each content item returned from the discovery service.
+        url_builder = EnterpriseUrlBuilder(enterprise_customer)
         for item in search_results:
-            content_type = item['content_type']
-            if content_type == 'courserun':
-                item['enrollment_url'] = enterprise_customer.get_course_run_enrollment_url(item['key'])
-            elif content_type == 'program':
-                item['enrollment_url'] = enterprise_customer.get_program_enrollment_url(item['uuid'])
+            enrollment_url = url_builder.get_content_enrollment_url(item)
+            if enrollment_url is not None:
+                item['enrollment_url'] = enrollment_url
 
         # Build pagination URLs
         previous_url = None
@@ -225,15 +244,89 @@ class EnterpriseCustomerCatalogDetailSerializer(EnterpriseCustomerCatalogSeriali
         if paginated_content['next']:
             next_url = update_query_parameters(request_uri, {'page': page + 1})
 
-        representation['count'] = count
-        representation['previous'] = previous_url
-        representation['next'] = next_url
-        representation['results'] = search_results
+        search_representation = {
+            'count': count,
+            'previous': previous_url,
+            'next': next_url,
+            'results': search_results,
+        }
+        for field in search_fields:
+            representation[field] = search_representation[field]
 
         return representation
 
 
-class EnterpriseCustomerUserReadOnlySerializer(serializers.ModelSerializer):
+class EnterpriseCustomerUserListSerializer(serializers.ListSerializer):
+    """
+    List serializer for EnterpriseCustomerUser model.
+
+    Loads the users and data sharing consent records of the whole list with one query each, and checks
+    the catalog containment of the courses pending consent with one batch per customer, instead of
+    letting every row look them up on its own.
+    """
+
+    def to_representation(self, data):
+        """
+        Bulk-load the related records of all rows that are part of the serialized fields, then serialize them.
+        """
+        iterable = data.all() if hasattr(data, 'all') else data
+        enterprise_customer_users = list(iterable)
+        fields = self.child.fields
+        if 'user' in fields or 'data_sharing_consent_records' in fields:
+            models.EnterpriseCustomerUser.load_users(enterprise_customer_users)
+        if 'data_sharing_consent_records' in fields:
+            self.child.data_sharing_consent_records_map = self.get_data_sharing_consent_records_map(
+                enterprise_customer_users
+            )
+        return super(EnterpriseCustomerUserListSerializer, self).to_representation(enterprise_customer_users)
+
+    @staticmethod
+    def get_data_sharing_consent_records_map(enterprise_customer_users):
+        """
+        Return the DataSharingConsent records of the given learners.
+
+        Arguments:
+            enterprise_customer_users (list): EnterpriseCustomerUsers with their users already loaded.
+
+        Returns:
+            dict: Lists of DataSharingConsent records keyed by ``(enterprise_customer_id, username)``, whose
+                catalog containment is resolved for those that are not granted.
+        """
+        DataSharingConsent = apps.get_model('consent', 'DataSharingConsent')  # pylint: disable=invalid-name
+        enterprise_customers = {
+            ecu.enterprise_customer_id: ecu.enterprise_customer for ecu in enterprise_customer_users
+        }
+        usernames = set(ecu.username for ecu in enterprise_customer_users if ecu.username is not None)
+
+        records_map = defaultdict(list)
+        if not usernames:
+            return records_map
+
+        records = DataSharingConsent.objects.filter(
+            enterprise_customer_id__in=list(enterprise_customers),
+            username__in=list(usernames),
+        ).order_by('pk')
+        pending_records = defaultdict(list)
+        for record in records:
+            # Reuse the customer already loaded for the learner instead of fetching it again per record.
+            record.enterprise_customer = enterprise_customers[record.enterprise_customer_id]
+            records_map[(record.enterprise_customer_id, record.username)].append(record)
+            if not record.granted:
+                pending_records[record.enterprise_customer_id].append(record)
+
+        for enterprise_customer_id, customer_records in pending_records.items():
+            enterprise_customer = enterprise_customers[enterprise_customer_id]
+            if not enterprise_customer.enforces_data_sharing_consent('at_enrollment'):
+                continue
+            containment = enterprise_customer.catalog_contains_courses(
+                set(record.course_id for record in customer_records)
+            )
+            for record in customer_records:
+                record._catalog_contains_course = containment[record.course_id]  # pylint: disable=protected-access
+        return records_map
+
+
+class EnterpriseCustomerUserReadOnlySerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for EnterpriseCustomerUser model.
     """
@@ -243,11 +336,15 @@ class EnterpriseCustomerUserReadOnlySerializer(serializers.ModelSerializer):
         fields = (
             'id', 'enterprise_customer', 'user_id', 'user', 'data_sharing_consent_records'
         )
+        list_serializer_class = EnterpriseCustomerUserListSerializer
 
     user = UserSerializer()
     enterprise_customer = EnterpriseCustomerSerializer()
     data_sharing_consent_records = serializers.SerializerMethodField()
 
+    # Populated by ``EnterpriseCustomerUserListSerializer`` when serializing many learners at once.
+    data_sharing_consent_records_map = None
+
     def get_data_sharing_consent_records(self, obj):
         """
         Return serialization of EnterpriseCustomerUser.data_sharing_consent_records property.
@@ -258,7 +355,11 @@ class EnterpriseCustomerUserReadOnlySerializer(serializers.ModelSerializer):
         Returns:
             list of dict: The serialized DataSharingConsent records associated with the EnterpriseCustomerUser.
         """
-        return [record.serialize() for record in obj.data_sharing_consent_records]
+        if self.data_sharing_consent_records_map is None:
+            records = obj.data_sharing_consent_records
+        else:
+            records = self.data_sharing_consent_records_map.get((obj.enterprise_customer_id, obj.username), [])
+        return [record.serialize() for record in records]
 
 
 class EnterpriseCustomerUserWriteSerializer(serializers.ModelSerializer):
@@ -358,7 +459,8 @@ class CourseRunDetailSerializer(ImmutableStateSerializer):
         Returns:
             dict: The updated course run data.
         """
-        updated_course_run = copy.deepcopy(instance)
+        # Copy only the top level, which is all that is updated, so the (possibly cached) instance is left as is.
+        updated_course_run = dict(instance)
         enterprise_customer = self.context['enterprise_customer']
         updated_course_run['enrollment_url'] = enterprise_customer.get_course_run_enrollment_url(
             updated_course_run['key']
@@ -384,10 +486,19 @@ class ProgramDetailSerializer(ImmutableStateSerializer):
         Returns:
             dict: The updated program data.
         """
-        updated_program = copy.deepcopy(instance)
+        # Copy only the containers along the paths to the updated course runs, so the (possibly cached) instance
+        # is left as is while the rest of its nested data is shared.
         enterprise_customer = self.context['enterprise_customer']
-        updated_program['enrollment_url'] = enterprise_customer.get_program_enrollment_url(updated_program['uuid'])
-        for course in updated_program['courses']:
+        url_builder = EnterpriseUrlBuilder(enterprise_customer)
+        updated_program = dict(instance)
+        updated_program['enrollment_url'] = url_builder.get_program_enrollment_url(updated_program['uuid'])
+        updated_program['courses'] = []
+        for course in instance['courses']:
+            updated_course = dict(course)
+            updated_course['course_runs'] = []
             for course_run in course['course_runs']:
-                course_run['enrollment_url'] = enterprise_customer.get_course_run_enrollment_url(course_run['key'])
+                updated_course_run = dict(course_run)
+                updated_course_run['enrollment_url'] = url_builder.get_course_run_enrollment_url(course_run['key'])
+                updated_course['course_runs'].append(updated_course_run)
+            updated_program['courses'].append(updated_course)
         return updated_program
@@ -4,29 +4,54 @@ Views for enterprise api version 1 endpoint.
 """
 from __future__ import absolute_import, unicode_literals
 
+import calendar
+import hashlib
+import json
 from logging import getLogger
 
 from edx_rest_framework_extensions.authentication import BearerAuthentication, JwtAuthentication
-from rest_framework import filters, permissions, viewsets
+from rest_framework import filters, permissions, status, viewsets
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import detail_route
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
 from django.conf import settings
-from django.http import Http404
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 
 from enterprise import models
 from enterprise.api.filters import EnterpriseCustomerUserFilterBackend, UserFilterBackend
 from enterprise.api.pagination import get_paginated_response
 from enterprise.api.throttles import ServiceUserThrottle
 from enterprise.api.v1 import decorators, serializers
+from enterprise.api.v1.mixins import get_requested_fields, is_field_requested
 from enterprise.api_client.discovery import CourseCatalogApiClient
+from enterprise.utils import EnterpriseUrlBuilder, get_cache_key
 
 LOGGER = getLogger(__name__)
 
 
+def get_etag(data):
+    """
+    Return a strong ETag for the given JSON serializable data.
+    """
+    content = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"{}"'.format(hashlib.md5(content.encode('utf-8')).hexdigest())
+
+
+def etag_matches(request, etag):
+    """
+    Return whether the ``If-None-Match`` header of the request matches the given ETag, weakly or strongly.
+    """
+    if_none_match = [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]
+    return '*' in if_none_match or etag in if_none_match or 'W/' + etag in if_none_match
+
+
 class EnterpriseViewSet(object):
     """
     Base class for all Enterprise view sets.
@@ -64,12 +89,135 @@ class EnterpriseModelViewSet(EnterpriseViewSet):
     permission_classes = (permissions.IsAuthenticated, permissions.DjangoModelPermissions,)
     USER_ID_FILTER = 'id'
 
+    # Relations to select or prefetch along with the queryset, keyed by the dotted serializer field using them,
+    # so that relations left out of the ``fields`` query parameter aren't fetched.
+    SELECT_RELATED = {}
+    PREFETCH_RELATED = {}
+
+    def get_queryset(self):
+        """
+        Return the queryset, along with the related objects of the requested serializer fields.
+        """
+        queryset = super(EnterpriseModelViewSet, self).get_queryset()
+        requested_fields = get_requested_fields(self.request)
+        select_related = [
+            lookup for field_path, lookup in sorted(self.SELECT_RELATED.items())
+            if is_field_requested(requested_fields, field_path)
+        ]
+        prefetch_related = [
+            lookup for field_path, lookup in sorted(self.PREFETCH_RELATED.items())
+            if is_field_requested(requested_fields, field_path)
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
 
 class EnterpriseReadOnlyModelViewSet(EnterpriseModelViewSet, viewsets.ReadOnlyModelViewSet):
     """
     Base class for all read only Enterprise model view sets.
+
+    List and detail responses are sent with an ETag and a Last-Modified header, derived from the ``modified``
+    timestamps and the number of the objects they serialize, and of the objects related to them through
+    ``MODIFIED_RELATIONS``. Serialized fields of related objects without a ``modified`` timestamp are listed
+    in ``UNTIMESTAMPED_FIELDS``, and their distinct values are part of the ETag. Requests whose
+    ``If-None-Match`` header matches the ETag are answered with a 304 Not Modified, without serializing
+    anything.
+
+    Paginated lists only aggregate the objects of the requested page, so that the cost of the ETag doesn't
+    grow with the number of objects listed: the primary keys of the page are looked up first, with a single
+    query on top of the count of the pagination, and they are part of the ETag along with the pagination links.
     """
-    pass
+
+    MODIFIED_RELATIONS = ()
+    UNTIMESTAMPED_FIELDS = ()
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the objects, unless the client's copy of the list is up to date.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        # Related objects are only needed to serialize the page, once it is known.
+        page_pks = self.paginate_queryset(queryset.prefetch_related(None).values_list('pk', flat=True))
+        if page_pks is None:
+            return self.get_conditional_response(
+                request,
+                queryset,
+                lambda: super(EnterpriseReadOnlyModelViewSet, self).list(request, *args, **kwargs),
+            )
+
+        page_pks = list(page_pks)
+        page_queryset = queryset.filter(pk__in=page_pks)
+
+        def get_response():
+            """
+            Serialize the objects of the page, in the order of the pagination.
+            """
+            objects = {obj.pk: obj for obj in page_queryset}
+            page = [objects[pk] for pk in page_pks if pk in objects]
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        pagination = dict(self.get_paginated_response([]).data)
+        pagination.pop('results', None)
+        return self.get_conditional_response(
+            request,
+            page_queryset,
+            get_response,
+            extra_validators=[page_pks, sorted(pagination.items())],
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the object, unless the client's copy of it is up to date.
+        """
+        instance = self.get_object()
+        return self.get_conditional_response(
+            request,
+            self.get_queryset().filter(pk=instance.pk),
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def get_conditional_response(self, request, queryset, get_response, extra_validators=()):
+        """
+        Return a 304 Not Modified if the request's ``If-None-Match`` header matches the ETag of the queryset.
+
+        Otherwise, return the response of ``get_response``, along with the ETag and Last-Modified headers.
+
+        Arguments:
+            request (Request): The request.
+            queryset (QuerySet): The objects serialized by the response.
+            get_response (callable): Returns the response.
+            extra_validators (iterable): JSON serializable data that the response also depends on, to add to
+                the ETag.
+        """
+        aggregates = {'count': Count('pk', distinct=True), 'last_modified': Max('modified')}
+        for relation in self.MODIFIED_RELATIONS:
+            aggregates['{}_count'.format(relation)] = Count(relation, distinct=True)
+            aggregates['{}_last_modified'.format(relation)] = Max('{}__modified'.format(relation))
+        validators = queryset.order_by().aggregate(**aggregates)
+        untimestamped_values = []
+        if self.UNTIMESTAMPED_FIELDS:
+            untimestamped_values = sorted(set(queryset.order_by().values_list(*self.UNTIMESTAMPED_FIELDS)))
+
+        etag = get_etag([
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            request.user.pk,
+            sorted(validators.items()),
+            untimestamped_values,
+            list(extra_validators),
+        ])
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = get_response()
+        response['ETag'] = etag
+        last_modified = [value for key, value in validators.items() if key.endswith('last_modified') and value]
+        if last_modified:
+            response['Last-Modified'] = http_date(calendar.timegm(max(last_modified).utctimetuple()))
+        return response
 
 
 class EnterpriseReadWriteModelViewSet(EnterpriseModelViewSet, viewsets.ModelViewSet):
@@ -87,6 +235,15 @@ class EnterpriseCustomerViewSet(EnterpriseReadOnlyModelViewSet):
 
     queryset = models.EnterpriseCustomer.active_customers.all()
     serializer_class = serializers.EnterpriseCustomerSerializer
+    MODIFIED_RELATIONS = ('branding_configuration', 'enterprise_customer_entitlements')
+    UNTIMESTAMPED_FIELDS = ('site__id', 'site__domain', 'site__name')
+    SELECT_RELATED = {
+        'site': 'site',
+        'branding_configuration': 'branding_configuration',
+    }
+    PREFETCH_RELATED = {
+        'enterprise_customer_entitlements': 'enterprise_customer_entitlements',
+    }
 
     USER_ID_FILTER = 'enterprise_customer_users__user_id'
     FIELDS = (
@@ -169,6 +326,14 @@ class EnterpriseCustomerUserViewSet(EnterpriseReadWriteModelViewSet):
     """
 
     queryset = models.EnterpriseCustomerUser.objects.all()
+    SELECT_RELATED = {
+        'enterprise_customer': 'enterprise_customer',
+        'enterprise_customer.site': 'enterprise_customer__site',
+        'enterprise_customer.branding_configuration': 'enterprise_customer__branding_configuration',
+    }
+    PREFETCH_RELATED = {
+        'enterprise_customer.enterprise_customer_entitlements': 'enterprise_customer__enterprise_customer_entitlements',
+    }
     filter_backends = (filters.OrderingFilter, filters.DjangoFilterBackend, EnterpriseCustomerUserFilterBackend)
 
     FIELDS = (
@@ -250,12 +415,83 @@ class EnterpriseCustomerCatalogViewSet(EnterpriseReadOnlyModelViewSet):
     filter_fields = FIELDS
     ordering_fields = FIELDS
 
+    # Query parameters of the export endpoint passed on to the discovery service search, besides content filter keys.
+    EXPORT_SEARCH_PARAMETERS = ('page_size',)
+
     def get_serializer_class(self):
         action = getattr(self, 'action', None)
         if action == 'retrieve':
             return serializers.EnterpriseCustomerCatalogDetailSerializer
         return serializers.EnterpriseCustomerCatalogSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the catalog along with a page of its discovery service search results.
+
+        Pages are cached for ``ENTERPRISE_CATALOG_PAGE_CACHE_TIMEOUT`` seconds, keyed by the catalog, its
+        content filter and the request URL. They are sent with the ETag and Last-Modified headers of
+        ``get_conditional_response``, the ETag also covering the search results, so that clients polling
+        for the same page can be answered with a 304 Not Modified through ``If-None-Match``.
+        """
+        enterprise_customer_catalog = self.get_object()
+        cache_key = get_cache_key(
+            resource='enterprise_catalog_page',
+            catalog_uuid=enterprise_customer_catalog.uuid,
+            content_filter=enterprise_customer_catalog.content_filter,
+            request_uri=request.build_absolute_uri(),
+        )
+        cached_page = cache.get(cache_key)
+        if cached_page is None:
+            data = dict(self.get_serializer(enterprise_customer_catalog).data)
+            cached_page = (get_etag(data), data)
+            cache.set(cache_key, cached_page, getattr(settings, 'ENTERPRISE_CATALOG_PAGE_CACHE_TIMEOUT', 60))
+
+        content_etag, data = cached_page
+        return self.get_conditional_response(
+            request,
+            self.get_queryset().filter(pk=enterprise_customer_catalog.pk),
+            lambda: Response(data),
+            extra_validators=[content_etag],
+        )
+
+    @detail_route()
+    def export(self, request, pk):  # pylint: disable=invalid-name,unused-argument
+        """
+        Stream every content item of the specified catalog as newline-delimited JSON.
+
+        Each line holds a discovery service search result, decorated with its enterprise enrollment URL like
+        the items of the catalog's detail endpoint. Only the ``page_size`` query parameter, which sets how many
+        items are fetched per request, and those named like keys of the catalog's content filter are passed on
+        to the discovery service search; others, such as ``format``, are not.
+        """
+        enterprise_customer_catalog = self.get_object()
+        url_builder = EnterpriseUrlBuilder(enterprise_customer_catalog.enterprise_customer)
+        search_parameters = set(self.EXPORT_SEARCH_PARAMETERS) | set(enterprise_customer_catalog.content_filter)
+        content = enterprise_customer_catalog.iter_content(
+            {key: value for key, value in request.GET.items() if key in search_parameters}
+        )
+
+        def render():
+            """
+            Render each content item as a line of JSON.
+
+            The response headers are sent before the first line, so a failure partway through is reported
+            as a final ``{"error": ...}`` line instead of a truncated stream.
+            """
+            try:
+                for item in content:
+                    enrollment_url = url_builder.get_content_enrollment_url(item)
+                    if enrollment_url is not None:
+                        item['enrollment_url'] = enrollment_url
+                    yield json.dumps(item, cls=DjangoJSONEncoder) + '\n'
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception(
+                    'Failed to export the content of EnterpriseCustomerCatalog [%s]', enterprise_customer_catalog.uuid
+                )
+                yield json.dumps({'error': 'The catalog export failed before completing.'}) + '\n'
+
+        return StreamingHttpResponse(render(), content_type='application/x-ndjson')
+
     @detail_route(url_path='course-runs/{}'.format(settings.COURSE_ID_PATTERN))
     def course_run_detail(self, request, pk, course_id):  # pylint: disable=invalid-name,unused-argument
         """
@@ -389,6 +389,41 @@ class CourseCatalogApiClient(object):
 
         return resp.get('courses', {}).get(course_id, False)
 
+    def get_catalog_course_containment(self, catalog_id, course_ids):
+        """
+        Determine which of the given course or course run IDs are contained in the catalog with the given ID.
+
+        Course IDs and course run IDs are each checked with a single request, however many are given.
+
+        Args:
+            catalog_id (int): The ID of the catalog
+            course_ids (iterable): The IDs of the courses or course runs
+
+        Returns:
+            dict: Whether each of the given courses or course runs is contained in the given catalog, by the
+                given ID, even when the catalog API knows the course run by its normalized ID
+        """
+        # Map the IDs sent to the catalog API, i.e. normalized course run IDs, to the given ones.
+        course_run_ids = {}
+        plain_course_ids = {}
+        for course_id in set(course_ids):
+            try:
+                # Determine if we have a course run ID, rather than a plain course ID
+                course_run_ids.setdefault(str(CourseKey.from_string(course_id)), []).append(course_id)
+            except InvalidKeyError:
+                plain_course_ids[course_id] = [course_id]
+
+        endpoint = self.client.catalogs(catalog_id).contains
+        containment = {}
+        for querystring_key, ids in (('course_run_id', course_run_ids), ('course_id', plain_course_ids)):
+            if not ids:
+                continue
+            contained = endpoint.get(**{querystring_key: ','.join(sorted(ids))}).get('courses', {})
+            for requested_id, given_ids in ids.items():
+                for course_id in given_ids:
+                    containment[course_id] = contained.get(requested_id, False)
+        return containment
+
     def _load_data(self, resource, default=DEFAULT_VALUE_SAFEGUARD, **kwargs):
         """
         Load data from API client.
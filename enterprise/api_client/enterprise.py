@@ -5,10 +5,10 @@ Client for communicating with the Enterprise API.
 
 from __future__ import absolute_import, unicode_literals
 
+import time
 from logging import getLogger
 
 from django.conf import settings
-from django.core.cache import cache
 
 from enterprise import utils
 from enterprise.api_client.lms import JwtLmsApiClient
@@ -43,6 +43,107 @@ class EnterpriseApiClient(JwtLmsApiClient):
             **kwargs
         )
 
+    @JwtLmsApiClient.refresh_token
+    def iter_enterprise_courses(self, enterprise_customer):
+        """
+        Iterate over the courses of the given enterprise customer, across all pages of the Enterprise API.
+
+        Courses are yielded as soon as their page arrives, so that callers can start working on them before
+        the last page does. Once all of them have been read, they are cached like the response of
+        ``get_enterprise_courses`` with ``traverse_pagination=True``, from which they are read if available.
+        Like there, a single caller reloads expiring courses while the others read the cached ones.
+
+        Arguments:
+            enterprise_customer (Enterprise Customer): Enterprise customer for fetching courses
+        Returns:
+            generator: The course details.
+        """
+        resource_id = str(enterprise_customer.uuid)
+        cache_key = utils.get_cache_key(
+            resource=self.ENTERPRISE_CUSTOMER_ENDPOINT,
+            querystring={},
+            traverse_pagination=True,
+            resource_id=resource_id
+        )
+        response, locked = utils.get_cached_value_or_lock(cache_key)
+        if response is not utils.CACHE_MISS and not locked:
+            return iter(response.get('results', []))
+
+        # Fetch the first page right away, so that errors are raised before any course is consumed.
+        start = time.time()
+        fetched = False
+        try:
+            endpoint = self._get_endpoint(self.ENTERPRISE_CUSTOMER_ENDPOINT, resource_id, 'courses')
+            response = endpoint.get()
+            fetched = True
+        finally:
+            if locked and not fetched:
+                utils.release_cache_lock(cache_key)
+        get_worker_endpoint = self._get_worker_endpoint_function(
+            self.ENTERPRISE_CUSTOMER_ENDPOINT, resource_id, 'courses'
+        )
+        return self._iter_and_cache_results(response, endpoint, get_worker_endpoint, cache_key, locked, start)
+
+    def _iter_and_cache_results(self, response, endpoint, get_worker_endpoint, cache_key, locked, start):
+        """
+        Yield the results of all pages from the given response on, then cache them as a single traversed response.
+
+        The cache lock of ``cache_key`` is released once done if ``locked``, even if not all results are read.
+        """
+        try:
+            results = []
+            for result in utils.iter_pagination(
+                    response,
+                    endpoint,
+                    max_workers=self.pagination_workers,
+                    get_worker_endpoint=get_worker_endpoint,
+            ):
+                results.append(result)
+                yield result
+            utils.set_cached_value(
+                cache_key,
+                {
+                    'count': len(results),
+                    'next': 'None',
+                    'previous': 'None',
+                    'results': results,
+                },
+                settings.ENTERPRISE_API_CACHE_TIMEOUT,
+                load_time=time.time() - start,
+            )
+        finally:
+            if locked:
+                utils.release_cache_lock(cache_key)
+
+    @property
+    def pagination_workers(self):
+        """
+        Return the maximum number of pages to fetch concurrently when traversing paginated responses.
+        """
+        return getattr(settings, 'ENTERPRISE_API_PAGINATION_WORKERS', 4)
+
+    def _get_endpoint(self, resource, resource_id=None, detail_resource=None):
+        """
+        Return the slumber Resource of the given endpoint.
+        """
+        endpoint = getattr(self.client, resource)(resource_id)
+        return getattr(endpoint, detail_resource) if detail_resource else endpoint
+
+    def _get_worker_endpoint_function(self, resource, resource_id=None, detail_resource=None):
+        """
+        Return a function building the given endpoint for a pagination worker thread, see ``iter_pagination``.
+
+        Each call connects a new client, so that every worker thread has its own HTTP session.
+        """
+        def get_worker_endpoint():
+            """
+            Connect a new client and return its resource of the endpoint.
+            """
+            client = self.__class__(self.user, expires_in=self.expires_in)
+            client.connect()
+            return client._get_endpoint(resource, resource_id, detail_resource)  # pylint: disable=protected-access
+        return get_worker_endpoint
+
     @JwtLmsApiClient.refresh_token
     def _load_data(
             self,
@@ -73,21 +174,27 @@ class EnterpriseApiClient(JwtLmsApiClient):
             traverse_pagination=traverse_pagination,
             resource_id=resource_id
         )
-        response = cache.get(cache_key)
-        if not response:
-            # Response is not cached, so make a call.
-            endpoint = getattr(self.client, resource)(resource_id)
-            endpoint = getattr(endpoint, detail_resource) if detail_resource else endpoint
+
+        def load():
+            """
+            Make the call, traversing pagination if requested.
+            """
+            endpoint = self._get_endpoint(resource, resource_id, detail_resource)
             response = endpoint.get(**querystring)
             if traverse_pagination:
-                results = utils.traverse_pagination(response, endpoint)
+                results = utils.traverse_pagination(
+                    response,
+                    endpoint,
+                    max_workers=self.pagination_workers,
+                    get_worker_endpoint=self._get_worker_endpoint_function(resource, resource_id, detail_resource),
+                )
                 response = {
                     'count': len(results),
                     'next': 'None',
                     'previous': 'None',
                     'results': results,
                 }
-            if response:
-                # Now that we've got a response, cache it.
-                cache.set(cache_key, response, settings.ENTERPRISE_API_CACHE_TIMEOUT)
+            return response
+
+        response = utils.get_cached_or_load(cache_key, load, settings.ENTERPRISE_API_CACHE_TIMEOUT)
         return response or default_val
@@ -19,7 +19,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from enterprise.constants import COURSE_MODE_SORT_ORDER
-from enterprise.utils import NotConnectedToOpenEdX
+from enterprise.utils import NotConnectedToOpenEdX, chunked, get_cache_key, get_cached_or_load, traverse_pagination
 
 try:
     from student.models import CourseEnrollment
@@ -229,6 +229,25 @@ class EnrollmentApiClient(LmsApiClient):
 
         return result
 
+    def get_course_enrollments(self, course_id):
+        """
+        Query the enrollment API to get the roster of all enrollments in a course.
+
+        The roster endpoint is paginated; all pages are traversed and returned as a single list.
+
+        Args:
+            course_id (str): The string value of the course's unique identifier
+
+        Returns:
+            list: A list of enrollment dictionaries, each containing the ``user`` (username), ``mode``, etc.
+
+        """
+        endpoint = self.client.enrollments
+        response = endpoint.get(course_id=course_id)
+        if isinstance(response, list):
+            return response
+        return traverse_pagination(response, endpoint)
+
     def get_enrolled_courses(self, username):
         """
         Query the enrollment API to get a list of the courses a user is enrolled in.
@@ -258,11 +277,19 @@ class CourseApiClient(LmsApiClient):
         Args:
             course_id (str): The course ID identifying the course for which to retrieve details.
 
+        Details are cached for ``ENTERPRISE_COURSE_DETAILS_CACHE_TIMEOUT`` seconds, and shared by all callers,
+        with the stampede protection of ``get_cached_or_load``. Failed lookups are not cached.
+
         Returns:
             dict: Contains keys identifying those course details available from the courses API (e.g., name).
         """
+        cache_key = get_cache_key(resource='course_details', course_id=course_id)
         try:
-            return self.client.courses(course_id).get()
+            return get_cached_or_load(
+                cache_key,
+                lambda: self.client.courses(course_id).get(),
+                getattr(settings, 'ENTERPRISE_COURSE_DETAILS_CACHE_TIMEOUT', 3600),
+            )
         except (SlumberBaseException, ConnectionError, Timeout) as exc:
             LOGGER.exception('Details not found for course %s due to: %s', course_id, str(exc))
             return None
@@ -275,6 +302,9 @@ class ThirdPartyAuthApiClient(LmsApiClient):
 
     API_BASE_URL = settings.LMS_ROOT_URL + '/api/third_party_auth/v0/'
 
+    # Maximum number of usernames sent per request by ``get_remote_ids``.
+    REMOTE_ID_BATCH_SIZE = 100
+
     def get_remote_id(self, identity_provider, username):
         """
         Retrieve the remote identifier for the given username.
@@ -298,6 +328,35 @@ class ThirdPartyAuthApiClient(LmsApiClient):
                 return row.get('remote_id')
         return None
 
+    def get_remote_ids(self, identity_provider, usernames):
+        """
+        Retrieve the remote identifiers for many usernames at once.
+
+        Usernames are sent ``REMOTE_ID_BATCH_SIZE`` at a time, and all pages of each response are traversed.
+
+        Args:
+        * ``identity_provider`` (str): identifier slug for the third-party authentication service used during SSO.
+        * ``usernames`` (iterable): The usernames identifying the users for which to retrieve the remote names.
+
+        Returns:
+            dict: the remote names of the given users, keyed by username. Users without one are left out.
+        """
+        usernames = sorted(set(usernames))
+        remote_ids = {}
+        endpoint = self.client.providers(identity_provider).users
+        for batch in chunked(usernames, self.REMOTE_ID_BATCH_SIZE):
+            try:
+                results = traverse_pagination(endpoint.get(username=batch), endpoint)
+            except HttpNotFoundError:
+                LOGGER.error('remote_ids not found for third party provider=%s, usernames=%s', identity_provider, batch)
+                continue
+            batch_usernames = set(batch)
+            for row in results:
+                username = row.get('username')
+                if username in batch_usernames and username not in remote_ids:
+                    remote_ids[username] = row.get('remote_id')
+        return remote_ids
+
 
 class GradesApiClient(JwtLmsApiClient):
     """
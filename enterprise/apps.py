@@ -8,7 +8,15 @@ from __future__ import absolute_import, unicode_literals
 from django.apps import AppConfig, apps
 from django.conf import settings
 
-from enterprise.constants import USER_POST_SAVE_DISPATCH_UID
+from enterprise.constants import (
+    DATA_SHARING_CONSENT_CHANGE_DISPATCH_UID,
+    ENROLLMENT_TEMPLATE_CHANGE_DISPATCH_UID,
+    ENTERPRISE_CUSTOMER_CHANGE_DISPATCH_UID,
+    ENTERPRISE_CUSTOMER_ENTITLEMENT_CHANGE_DISPATCH_UID,
+    ENTERPRISE_CUSTOMER_RELATION_CHANGE_DISPATCH_UID,
+    SITE_CHANGE_DISPATCH_UID,
+    USER_POST_SAVE_DISPATCH_UID,
+)
 
 
 class EnterpriseConfig(AppConfig):
@@ -31,10 +39,62 @@ class EnterpriseConfig(AppConfig):
         """
         Perform other one-time initialization steps.
         """
-        from enterprise.signals import handle_user_post_save
-        from django.db.models.signals import pre_migrate, post_save
+        from enterprise.models import (
+            EnrollmentNotificationEmailTemplate,
+            EnterpriseCustomer,
+            EnterpriseCustomerBrandingConfiguration,
+            EnterpriseCustomerEntitlement,
+            EnterpriseCustomerIdentityProvider,
+        )
+        from enterprise.signals import (
+            handle_data_sharing_consent_change,
+            handle_enrollment_template_change,
+            handle_enterprise_customer_change,
+            handle_enterprise_customer_entitlement_change,
+            handle_enterprise_customer_relation_change,
+            handle_site_change,
+            handle_user_post_save,
+        )
+        from django.db.models.signals import pre_migrate, post_delete, post_save
 
         post_save.connect(handle_user_post_save, sender=self.auth_user_model, dispatch_uid=USER_POST_SAVE_DISPATCH_UID)
+        post_save.connect(
+            handle_enrollment_template_change,
+            sender=EnrollmentNotificationEmailTemplate,
+            dispatch_uid=ENROLLMENT_TEMPLATE_CHANGE_DISPATCH_UID,
+        )
+        post_delete.connect(
+            handle_enrollment_template_change,
+            sender=EnrollmentNotificationEmailTemplate,
+            dispatch_uid=ENROLLMENT_TEMPLATE_CHANGE_DISPATCH_UID,
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                handle_enterprise_customer_change,
+                sender=EnterpriseCustomer,
+                dispatch_uid=ENTERPRISE_CUSTOMER_CHANGE_DISPATCH_UID,
+            )
+            for relation_model in (EnterpriseCustomerIdentityProvider, EnterpriseCustomerBrandingConfiguration):
+                signal.connect(
+                    handle_enterprise_customer_relation_change,
+                    sender=relation_model,
+                    dispatch_uid=ENTERPRISE_CUSTOMER_RELATION_CHANGE_DISPATCH_UID,
+                )
+            signal.connect(
+                handle_site_change,
+                sender=apps.get_model('sites', 'Site'),
+                dispatch_uid=SITE_CHANGE_DISPATCH_UID,
+            )
+            signal.connect(
+                handle_enterprise_customer_entitlement_change,
+                sender=EnterpriseCustomerEntitlement,
+                dispatch_uid=ENTERPRISE_CUSTOMER_ENTITLEMENT_CHANGE_DISPATCH_UID,
+            )
+            signal.connect(
+                handle_data_sharing_consent_change,
+                sender=apps.get_model('consent', 'DataSharingConsent'),
+                dispatch_uid=DATA_SHARING_CONSENT_CHANGE_DISPATCH_UID,
+            )
         pre_migrate.connect(self._disconnect_user_post_save_for_migrations)
 
     def _disconnect_user_post_save_for_migrations(self, sender, **kwargs):  # pylint: disable=unused-argument
@@ -12,6 +12,22 @@ from django.utils.translation import ugettext_lazy as _
 # used to ensure that signal receiver is only called once.
 USER_POST_SAVE_DISPATCH_UID = "user_post_save_upgrade_pending_enterprise_customer_user"
 
+# Unique identifier for the receiver that drops compiled enrollment notification
+# templates when a template is edited or deleted.
+ENROLLMENT_TEMPLATE_CHANGE_DISPATCH_UID = "enrollment_template_change_clear_compiled_templates"
+
+# Unique identifiers for the receivers that drop cached enterprise customers when
+# an enterprise customer, its site, its identity provider or its branding configuration
+# is edited or deleted.
+ENTERPRISE_CUSTOMER_CHANGE_DISPATCH_UID = "enterprise_customer_change_clear_cached_customer"
+ENTERPRISE_CUSTOMER_RELATION_CHANGE_DISPATCH_UID = "enterprise_customer_relation_change_clear_cached_customer"
+SITE_CHANGE_DISPATCH_UID = "site_change_clear_cached_customers"
+
+# Unique identifiers for the receivers that drop cached learner entitlements when
+# an enterprise customer's entitlements or a learner's data sharing consent change.
+ENTERPRISE_CUSTOMER_ENTITLEMENT_CHANGE_DISPATCH_UID = "enterprise_customer_entitlement_change_clear_cached_entitlements"
+DATA_SHARING_CONSENT_CHANGE_DISPATCH_UID = "data_sharing_consent_change_clear_cached_entitlements"
+
 # Data sharing consent messages
 CONSENT_REQUEST_PROMPT = _(
     'To log in using this SSO identity provider and access special course offers, you must first '
@@ -13,7 +13,7 @@ from requests.utils import quote
 from django.http import Http404
 from django.shortcuts import redirect
 
-from enterprise.utils import get_enterprise_customer_or_404, get_identity_provider
+from enterprise.utils import get_enterprise_customer_or_404, get_identity_provider, request_memo
 from six.moves.urllib.parse import parse_qs, urlencode, urlparse, urlunparse  # pylint: disable=import-error
 
 
@@ -229,3 +229,19 @@ def force_fresh_session(view):
         return view(request, *args, **kwargs)
 
     return wrapper
+
+
+def memoize_per_request(view):
+    """
+    Memoize the decisions (e.g. catalog containment, consent requirements) made while handling a request.
+
+    Use this on a view function or, through ``method_decorator``, a view method.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        """
+        Wrap the view in a request memo.
+        """
+        with request_memo():
+            return view(*args, **kwargs)
+    return wrapper
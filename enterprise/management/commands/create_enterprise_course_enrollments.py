@@ -5,18 +5,28 @@ Django management command for creating EnterpriseCourseEnrollment records.
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import threading
+from multiprocessing.pool import ThreadPool
 
 from edx_rest_api_client.exceptions import HttpClientError
 from requests.exceptions import RequestException
 from slumber.exceptions import SlumberBaseException
 
+from django.contrib.auth.models import User
 from django.core.management import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 from enterprise.api_client.lms import CourseApiClient, EnrollmentApiClient
 from enterprise.models import EnterpriseCourseEnrollment, EnterpriseCustomer
+from enterprise.utils import chunked
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of values passed to a single ``__in`` lookup when matching a course roster against learners
+# and their enrollments.
+ROSTER_QUERY_CHUNK_SIZE = 500
+
 
 class Command(BaseCommand):
     """
@@ -43,9 +53,29 @@ class Command(BaseCommand):
             default='',
             help='Comma-delimited string of course run IDs.'
         )
+        parser.add_argument(
+            '-w',
+            '--workers',
+            action='store',
+            dest='workers',
+            type=int,
+            default=1,
+            help='Number of concurrent Enrollment API lookups to run per course.'
+        )
+        parser.add_argument(
+            '-r',
+            '--roster',
+            action='store_true',
+            dest='use_roster',
+            default=False,
+            help='Fetch each course\'s enrollment roster once and match it against the enterprise learners, '
+                 'instead of looking up every learner\'s enrollment.'
+        )
 
     def handle(self, *args, **options):
         enterprise_uuid = options.get('enterprise_uuid')
+        workers = max(options.get('workers') or 1, 1)
+        use_roster = options.get('use_roster', False)
         course_ids = [course_id.strip() for course_id in options.get('courses_ids', '').split(',')]
 
         if not enterprise_uuid or not course_ids:
@@ -56,16 +86,30 @@ class Command(BaseCommand):
         except EnterpriseCustomer.DoesNotExist:
             raise CommandError('No enterprise customer found for UUID: {uuid}'.format(uuid=enterprise_uuid))
 
-        enterprise_learners = enterprise_customer.enterprise_customer_users.all()
+        enterprise_learners = None
         for course_id in course_ids:
             if not self.get_course_details(course_id):
                 LOGGER.warning('Course {course} not found, skipping.'.format(course=course_id))
                 continue
 
-            enrolled_users_count, ent_course_enrollments_count = self.create_enterprise_course_enrollments(
-                course_id,
-                enterprise_learners
-            )
+            if use_roster:
+                enrolled_learners = self.get_enrolled_learners_from_roster(course_id, enterprise_customer)
+                if enrolled_learners is None:
+                    LOGGER.warning('Enrollment roster for {course} not available, skipping.'.format(course=course_id))
+                    continue
+                enrolled_users_count = len(enrolled_learners)
+                ent_course_enrollments_count = self.bulk_create_enterprise_course_enrollments(
+                    course_id,
+                    enrolled_learners
+                )
+            else:
+                if enterprise_learners is None:
+                    enterprise_learners = self.get_enterprise_learners_with_usernames(enterprise_customer)
+                enrolled_users_count, ent_course_enrollments_count = self.create_enterprise_course_enrollments(
+                    course_id,
+                    enterprise_learners,
+                    workers=workers,
+                )
 
             LOGGER.info(
                 'Created {created} missing EnterpriseCourseEnrollments '
@@ -94,32 +138,195 @@ class Command(BaseCommand):
 
         return None
 
-    def create_enterprise_course_enrollments(self, course_id, enterprise_learners):
+    @staticmethod
+    def get_enrolled_learners_from_roster(course_id, enterprise_customer):
         """
-        Create EnterpriseCourseEnrollments (if they do not exist) for each provided enterprise
-        learner in the provided course if the user is already enrolled in the given course.
+        Return the enterprise customer's learners that appear in the course's enrollment roster.
+
+        The roster is fetched once and matched against the customer's learners in the database,
+        so the cost is proportional to the size of the roster rather than the number of learners.
 
         Arguments:
             course_id (string): The course ID.
-            enterprise_learners (list): List of EnterpriseCustomerUsers.
+            enterprise_customer (EnterpriseCustomer): The enterprise customer whose learners to match.
 
         Returns:
-            tuple: Number of enrolled users in the course, Number of EnterpriseCourseEnrollments created.
+            list: EnterpriseCustomerUsers enrolled in the course, or None if the roster could not be retrieved.
+        """
+        try:
+            roster = EnrollmentApiClient().get_course_enrollments(course_id)
+        except (RequestException, SlumberBaseException, HttpClientError):
+            LOGGER.error('Failed to retrieve enrollment roster from LMS API for {course}'.format(course=course_id))
+            return None
+
+        roster_usernames = sorted({enrollment['user'] for enrollment in roster if enrollment.get('user')})
+        enrolled_user_ids = []
+        for usernames in chunked(roster_usernames, ROSTER_QUERY_CHUNK_SIZE):
+            enrolled_user_ids.extend(User.objects.filter(username__in=usernames).values_list('id', flat=True))
+
+        enrolled_learners = []
+        for user_ids in chunked(enrolled_user_ids, ROSTER_QUERY_CHUNK_SIZE):
+            enrolled_learners.extend(enterprise_customer.enterprise_customer_users.filter(user_id__in=user_ids))
+        return enrolled_learners
+
+    @staticmethod
+    def get_enterprise_learners_with_usernames(enterprise_customer):
+        """
+        Return the enterprise customer's learners paired with their usernames.
+
+        Usernames are resolved with a single ``User`` query for the whole customer instead of
+        one query per learner. Learners whose ``User`` record no longer exists are skipped.
+
+        Arguments:
+            enterprise_customer (EnterpriseCustomer): The enterprise customer whose learners to load.
+
+        Returns:
+            list: ``(EnterpriseCustomerUser, username)`` tuples.
+        """
+        enterprise_learners = enterprise_customer.enterprise_customer_users.all()
+        usernames = dict(
+            User.objects.filter(
+                pk__in=enterprise_learners.values('user_id')
+            ).values_list('id', 'username')
+        )
+        return [
+            (enterprise_learner, usernames[enterprise_learner.user_id])
+            for enterprise_learner in enterprise_learners
+            if enterprise_learner.user_id in usernames
+        ]
+
+    @staticmethod
+    def get_enrolled_learners(course_id, enterprise_learners, workers=1):
+        """
+        Return the enterprise learners that the Enrollment API reports as enrolled in the course.
+
+        Lookups are spread over ``workers`` threads; each thread keeps its own API client
+        so that HTTP sessions are not shared between threads.
+
+        Arguments:
+            course_id (string): The course ID.
+            enterprise_learners (list): ``(EnterpriseCustomerUser, username)`` tuples.
+            workers (int): Number of concurrent Enrollment API lookups.
+
+        Returns:
+            list: EnterpriseCustomerUsers enrolled in the course.
+        """
+        local = threading.local()
+
+        def is_enrolled(learner_with_username):
+            """
+            Query the Enrollment API for a single learner.
+            """
+            username = learner_with_username[1]
+            if not hasattr(local, 'client'):
+                local.client = EnrollmentApiClient()
+            return bool(local.client.get_course_enrollment(username, course_id))
+
+        if workers > 1 and len(enterprise_learners) > 1:
+            pool = ThreadPool(min(workers, len(enterprise_learners)))
+            try:
+                enrolled_flags = pool.map(is_enrolled, enterprise_learners)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            enrolled_flags = [is_enrolled(learner) for learner in enterprise_learners]
+
+        return [
+            enterprise_learner
+            for (enterprise_learner, __), enrolled in zip(enterprise_learners, enrolled_flags)
+            if enrolled
+        ]
+
+    @staticmethod
+    def bulk_create_enterprise_course_enrollments(course_id, enterprise_learners):
+        """
+        Create the missing EnterpriseCourseEnrollments for the given learners in the given course.
+
+        Learners that already have a record for the course are skipped. If another process creates
+        one of the records concurrently, the batch falls back to ``get_or_create`` per learner so that
+        conflicting rows are ignored rather than aborting the whole batch.
+
+        ``bulk_create`` bypasses ``simple_history``, so the matching historical records are written in
+        bulk as well.
+
+        Arguments:
+            course_id (string): The course ID.
+            enterprise_learners (list): EnterpriseCustomerUsers enrolled in the course.
+
+        Returns:
+            int: Number of EnterpriseCourseEnrollments created.
         """
-        enrolled_users_count = 0
-        ent_course_enrollments_count = 0
-        for enterprise_learner in enterprise_learners:
-            course_enrollment = EnrollmentApiClient().get_course_enrollment(enterprise_learner.user.username, course_id)
-
-            # If user is enrolled in the course, create EnterpriseCourseEnrollment.
-            if course_enrollment:
-                enrolled_users_count += 1
-                __, created = EnterpriseCourseEnrollment.objects.get_or_create(
-                    enterprise_customer_user=enterprise_learner,
+        learner_ids = [enterprise_learner.id for enterprise_learner in enterprise_learners]
+        existing_learner_ids = set()
+        for learner_ids_chunk in chunked(learner_ids, ROSTER_QUERY_CHUNK_SIZE):
+            existing_learner_ids.update(
+                EnterpriseCourseEnrollment.objects.filter(
                     course_id=course_id,
-                )
+                    enterprise_customer_user_id__in=learner_ids_chunk,
+                ).values_list('enterprise_customer_user_id', flat=True)
+            )
+        missing_learner_ids = [learner_id for learner_id in learner_ids if learner_id not in existing_learner_ids]
+        if not missing_learner_ids:
+            return 0
+
+        try:
+            with transaction.atomic():
+                EnterpriseCourseEnrollment.objects.bulk_create([
+                    EnterpriseCourseEnrollment(enterprise_customer_user_id=learner_id, course_id=course_id)
+                    for learner_id in missing_learner_ids
+                ])
+                created_enrollments = [
+                    enrollment
+                    for learner_ids_chunk in chunked(missing_learner_ids, ROSTER_QUERY_CHUNK_SIZE)
+                    for enrollment in EnterpriseCourseEnrollment.objects.filter(
+                        course_id=course_id,
+                        enterprise_customer_user_id__in=learner_ids_chunk,
+                    )
+                ]
+                history_date = timezone.now()
+                history_model = EnterpriseCourseEnrollment.history.model
+                history_model.objects.bulk_create([
+                    history_model(
+                        history_date=history_date,
+                        history_type='+',
+                        **{
+                            field.attname: getattr(enrollment, field.attname)
+                            for field in EnterpriseCourseEnrollment._meta.fields  # pylint: disable=protected-access
+                        }
+                    )
+                    for enrollment in created_enrollments
+                ])
+            return len(missing_learner_ids)
+        except IntegrityError:
+            LOGGER.warning(
+                'Conflicting EnterpriseCourseEnrollments created concurrently for {course}, '
+                'creating records one at a time.'.format(course=course_id)
+            )
+
+        created_count = 0
+        for learner_id in missing_learner_ids:
+            __, created = EnterpriseCourseEnrollment.objects.get_or_create(
+                enterprise_customer_user_id=learner_id,
+                course_id=course_id,
+            )
+            if created:
+                created_count += 1
+        return created_count
+
+    def create_enterprise_course_enrollments(self, course_id, enterprise_learners, workers=1):
+        """
+        Create EnterpriseCourseEnrollments (if they do not exist) for each provided enterprise
+        learner in the provided course if the user is already enrolled in the given course.
 
-                if created:
-                    ent_course_enrollments_count += 1
+        Arguments:
+            course_id (string): The course ID.
+            enterprise_learners (list): ``(EnterpriseCustomerUser, username)`` tuples.
+            workers (int): Number of concurrent Enrollment API lookups.
 
-        return enrolled_users_count, ent_course_enrollments_count
+        Returns:
+            tuple: Number of enrolled users in the course, Number of EnterpriseCourseEnrollments created.
+        """
+        enrolled_learners = self.get_enrolled_learners(course_id, enterprise_learners, workers=workers)
+        ent_course_enrollments_count = self.bulk_create_enterprise_course_enrollments(course_id, enrolled_learners)
+        return len(enrolled_learners), ent_course_enrollments_count
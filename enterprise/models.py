@@ -7,20 +7,24 @@ from __future__ import absolute_import, unicode_literals
 import collections
 import os
 from logging import getLogger
-from uuid import uuid4
+from multiprocessing.pool import ThreadPool
+from uuid import UUID, uuid4
 
 import six
 from jsonfield.fields import JSONField
+from requests.exceptions import RequestException
 from simple_history.models import HistoricalRecords
+from slumber.exceptions import SlumberBaseException
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.storage import default_storage
 from django.core.urlresolvers import reverse
-from django.db import models
+from django.db import connection, models
 from django.template import Context, Template
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.functional import lazy
@@ -32,7 +36,13 @@ from model_utils.models import TimeStampedModel
 from enterprise import utils
 from enterprise.api_client.discovery import CourseCatalogApiServiceClient
 from enterprise.api_client.lms import EnrollmentApiClient, ThirdPartyAuthApiClient, enroll_user_in_course_locally
-from enterprise.utils import get_configuration_value
+from enterprise.utils import (
+    chunked,
+    get_cache_key,
+    get_configuration_value,
+    get_request_memoized,
+    get_request_memoized_many,
+)
 from enterprise.validators import validate_image_extension, validate_image_size
 from six.moves.urllib.parse import urljoin  # pylint: disable=import-error,ungrouped-imports
 
@@ -143,6 +153,56 @@ class EnterpriseCustomer(TimeStampedModel):
         )
     )
 
+    # Relations preloaded on the cached copies of enterprise customers, see ``get_cached``.
+    CACHED_RELATIONS = ('site', 'enterprise_customer_identity_provider', 'branding_configuration')
+
+    @classmethod
+    def get_cached(cls, uuid):
+        """
+        Get the enterprise customer with the given UUID, along with its site, identity provider and branding.
+
+        The enterprise customer is read from the cache when possible. Cached copies are dropped whenever the
+        enterprise customer, its site, its identity provider or its branding configuration is saved or deleted.
+
+        Arguments:
+            uuid (UUID | str): The universally unique ID of the enterprise customer.
+
+        Returns:
+            (EnterpriseCustomer): A copy of the enterprise customer; changes to it aren't shared with other callers.
+
+        Raises:
+            EnterpriseCustomer.DoesNotExist: If there's no enterprise customer with the given UUID.
+        """
+        try:
+            uuid = UUID(str(uuid))
+        except ValueError:
+            raise cls.DoesNotExist('{} is not a valid EnterpriseCustomer UUID.'.format(uuid))
+
+        cache_key = cls.get_cache_key(uuid)
+        enterprise_customer = cache.get(cache_key)
+        if enterprise_customer is None:
+            enterprise_customer = cls.objects.select_related(*cls.CACHED_RELATIONS).get(uuid=uuid)
+            cache.set(
+                cache_key,
+                enterprise_customer,
+                getattr(settings, 'ENTERPRISE_CUSTOMER_CACHE_TIMEOUT', 3600)
+            )
+        return enterprise_customer
+
+    @classmethod
+    def clear_cached(cls, uuid):
+        """
+        Drop the cached copy of the enterprise customer with the given UUID.
+        """
+        cache.delete(cls.get_cache_key(uuid))
+
+    @staticmethod
+    def get_cache_key(uuid):
+        """
+        Get the cache key of the enterprise customer with the given UUID.
+        """
+        return get_cache_key(resource='enterprise_customer', uuid=str(uuid))
+
     @property
     def identity_provider(self):
         """
@@ -235,14 +295,96 @@ class EnterpriseCustomer(TimeStampedModel):
 
         Returns:
             bool: Whether the enterprise catalog includes the given course run.
+
+        The answer is memoized for the rest of the request, if any (see ``enterprise.utils.request_memo``).
         """
         if self.catalog is None:
             return False
-        client = CourseCatalogApiServiceClient()
-        return client.is_course_in_catalog(self.catalog, course_id)
+        return get_request_memoized(
+            ('catalog_contains_course', self.catalog, course_id),
+            lambda: CourseCatalogApiServiceClient().is_course_in_catalog(self.catalog, course_id)
+        )
+
+    def catalog_contains_courses(self, course_ids):
+        """
+        Determine which of the courses or course runs in question are contained in this enterprise's catalog.
+
+        All of the given IDs are checked with a single batch of catalog API requests, and the answers are
+        memoized for the rest of the request like those of ``catalog_contains_course``.
+
+        Args:
+            course_ids (iterable): The string IDs of the courses or course runs in question
 
+        Returns:
+            dict: Whether the enterprise catalog includes each of the given courses or course runs, by ID.
+        """
+        course_ids = list(course_ids)
+        if self.catalog is None or not course_ids:
+            return {course_id: False for course_id in course_ids}
+
+        def get_containment(keys):
+            """
+            Check the courses of the given memo keys that aren't memoized yet.
+            """
+            containment = CourseCatalogApiServiceClient().get_catalog_course_containment(
+                self.catalog,
+                [course_id for __, __, course_id in keys],
+            )
+            return {key: containment.get(key[2], False) for key in keys}
+
+        containment = get_request_memoized_many(
+            [('catalog_contains_course', self.catalog, course_id) for course_id in course_ids],
+            get_containment,
+        )
+        return {key[2]: contained for key, contained in containment.items()}
 
-class EnterpriseCustomerUserManager(models.Manager):
+
+class EnterpriseCustomerUserQuerySet(models.query.QuerySet):
+    """
+    Customized QuerySets for the ``EnterpriseCustomerUser`` model.
+
+    Adds ``prefetch_users``, which resolves the ``User`` of every fetched row with a single query,
+    the way ``prefetch_related`` would if ``user_id`` were a foreign key.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the queryset without user prefetching.
+        """
+        super(EnterpriseCustomerUserQuerySet, self).__init__(*args, **kwargs)
+        self._prefetch_users = False
+
+    def prefetch_users(self):
+        """
+        Return a new QuerySet that loads the linked ``User`` of all of its rows in one query once evaluated.
+        """
+        clone = self._clone()
+        clone._prefetch_users = True  # pylint: disable=protected-access
+        return clone
+
+    def _clone(self, *args, **kwargs):
+        """
+        Carry the user prefetching flag over to cloned querysets.
+        """
+        clone = super(EnterpriseCustomerUserQuerySet, self)._clone(*args, **kwargs)
+        clone._prefetch_users = getattr(self, '_prefetch_users', False)  # pylint: disable=protected-access
+        return clone
+
+    def _fetch_all(self):
+        """
+        Evaluate the queryset and, if requested, attach the linked users to the fetched rows.
+        """
+        needs_users = self._result_cache is None and self._prefetch_users
+        super(EnterpriseCustomerUserQuerySet, self)._fetch_all()
+        if needs_users:
+            EnterpriseCustomerUser.load_users(
+                [item for item in self._result_cache if isinstance(item, EnterpriseCustomerUser)]
+            )
+
+
+class EnterpriseCustomerUserManager(
+        models.Manager.from_queryset(EnterpriseCustomerUserQuerySet)  # pylint: disable=no-member
+):
     """
     Model manager for :class:`.EnterpriseCustomerUser` entity.
 
@@ -332,6 +474,9 @@ class EnterpriseCustomerUser(TimeStampedModel):
 
     objects = EnterpriseCustomerUserManager()
 
+    # Maximum number of user IDs looked up per query by ``load_users``.
+    USER_LOAD_BATCH_SIZE = 500
+
     class Meta(object):
         app_label = 'enterprise'
         verbose_name = _("Enterprise Customer Learner")
@@ -345,19 +490,29 @@ class EnterpriseCustomerUser(TimeStampedModel):
 
         Return :class:`django.contrib.auth.models.User` instance associated with this
         :class:`EnterpriseCustomerUser` instance via email.
+
+        The user is looked up once per instance (or once per queryset, see ``load_users``) and
+        memoized for as long as ``user_id`` does not change.
         """
+        cached_user_id, cached_user = getattr(self, '_user_cache', (None, None))
+        if cached_user_id is not None and cached_user_id == self.user_id:
+            return cached_user
+
         try:
-            return User.objects.get(pk=self.user_id)
+            user = User.objects.get(pk=self.user_id)
         except User.DoesNotExist:
-            return None
+            user = None
+        self._user_cache = (self.user_id, user)
+        return user
 
     @property
     def user_email(self):
         """
         Return linked user email.
         """
-        if self.user is not None:
-            return self.user.email
+        user = self.user
+        if user is not None:
+            return user.email
         return None
 
     @property
@@ -365,10 +520,34 @@ class EnterpriseCustomerUser(TimeStampedModel):
         """
         Return linked user's username.
         """
-        if self.user is not None:
-            return self.user.username
+        user = self.user
+        if user is not None:
+            return user.username
         return None
 
+    @classmethod
+    def load_users(cls, enterprise_customer_users):
+        """
+        Resolve and memoize the linked ``User`` of each of the given instances with a single query.
+
+        Arguments:
+            enterprise_customer_users (iterable): :class:`EnterpriseCustomerUser` instances.
+
+        Returns:
+            dict: The loaded users, keyed by user ID.
+        """
+        enterprise_customer_users = list(enterprise_customer_users)
+        user_ids = sorted(set(ecu.user_id for ecu in enterprise_customer_users))
+        users = {}
+        for user_ids_chunk in chunked(user_ids, cls.USER_LOAD_BATCH_SIZE):
+            users.update(User.objects.in_bulk(user_ids_chunk))
+        for enterprise_customer_user in enterprise_customer_users:
+            enterprise_customer_user._user_cache = (  # pylint: disable=protected-access
+                enterprise_customer_user.user_id,
+                users.get(enterprise_customer_user.user_id),
+            )
+        return users
+
     @property
     def entitlements(self):
         """
@@ -376,6 +555,9 @@ class EnterpriseCustomerUser(TimeStampedModel):
 
         Returns an empty list if enterprise customer requires data sharing consent and learner does not agree.
 
+        The answer is cached per learner for ``ENTERPRISE_ENTITLEMENTS_CACHE_TIMEOUT`` seconds, or until the
+        learner's consent, the enterprise customer or its entitlements change (see ``clear_cached_entitlements``).
+
         Returns:
             (list): A list of entitlements that learner can avail. Each item in the list is a dict with two
                 key-value pairs,
@@ -387,6 +569,17 @@ class EnterpriseCustomerUser(TimeStampedModel):
                     sharing in order to get benefits of entitlement.
                 "entitlement_id: id of the entitlements available to the learner.
 
+        """
+        cache_key = self.get_entitlements_cache_key(self.enterprise_customer_id, self.user_id)
+        entitlements = cache.get(cache_key)
+        if entitlements is None:
+            entitlements = self._get_entitlements()
+            cache.set(cache_key, entitlements, getattr(settings, 'ENTERPRISE_ENTITLEMENTS_CACHE_TIMEOUT', 3600))
+        return entitlements
+
+    def _get_entitlements(self):
+        """
+        Compute the entitlement ids available to the learner along-with consent data, see ``entitlements``.
         """
         # Check if Enterprise Learner consents to data sharing and store the boolean result
         DataSharingConsent = apps.get_model('consent', 'DataSharingConsent')  # pylint: disable=invalid-name
@@ -416,6 +609,44 @@ class EnterpriseCustomerUser(TimeStampedModel):
             } for entitlement in entitlements.all()
             ]
 
+    @staticmethod
+    def get_entitlements_version_cache_key(enterprise_customer_uuid):
+        """
+        Get the cache key of the version of an enterprise customer's cached entitlements.
+        """
+        return get_cache_key(resource='enterprise_customer_entitlements_version', uuid=str(enterprise_customer_uuid))
+
+    @staticmethod
+    def get_entitlements_cache_key(enterprise_customer_uuid, user_id):
+        """
+        Get the cache key of the entitlements available to a learner of an enterprise customer.
+
+        The key includes a version of the enterprise customer's cached entitlements, so that those of all of its
+        learners can be dropped at once by changing the version.
+        """
+        version_key = EnterpriseCustomerUser.get_entitlements_version_cache_key(enterprise_customer_uuid)
+        version = cache.get(version_key)
+        if version is None:
+            # Another process may be initializing the version at the same time; only one of them wins.
+            cache.add(version_key, uuid4().hex, None)
+            version = cache.get(version_key)
+        return get_cache_key(
+            resource='enterprise_customer_user_entitlements',
+            uuid=str(enterprise_customer_uuid),
+            user_id=user_id,
+            version=version,
+        )
+
+    @classmethod
+    def clear_cached_entitlements(cls, enterprise_customer_uuid, user_id=None):
+        """
+        Drop the cached entitlements of the given learner, or of all learners of the given enterprise customer.
+        """
+        if user_id is None:
+            cache.delete(cls.get_entitlements_version_cache_key(enterprise_customer_uuid))
+        else:
+            cache.delete(cls.get_entitlements_cache_key(enterprise_customer_uuid, user_id))
+
     @property
     def data_sharing_consent_records(self):
         """
@@ -455,12 +686,73 @@ class EnterpriseCustomerUser(TimeStampedModel):
         * the associated EnterpriseCustomer has no identity_provider, or
         * the remote identity is not found.
         """
+        if hasattr(self, '_remote_id'):
+            return self._remote_id
+
+        remote_id = None
         user = self.user
         identity_provider = self.enterprise_customer.identity_provider
         if user and identity_provider:
+            cache_key = self.get_remote_id_cache_key(identity_provider, user.username)
+            remote_id = cache.get(cache_key)
+            if remote_id is None:
+                client = ThirdPartyAuthApiClient()
+                remote_id = client.get_remote_id(identity_provider, user.username)
+                if remote_id is not None:
+                    cache.set(cache_key, remote_id, getattr(settings, 'ENTERPRISE_REMOTE_ID_CACHE_TIMEOUT', 3600))
+        self._remote_id = remote_id  # pylint: disable=attribute-defined-outside-init
+        return remote_id
+
+    @classmethod
+    def load_remote_ids(cls, enterprise_customer_users):
+        """
+        Resolve and memoize the SSO provider's identifier of each of the given instances in bulk.
+
+        Identifiers are read from the cache where possible; the rest are fetched from the LMS Third Party
+        API with as few requests as possible per identity provider, and cached. Identifiers which aren't
+        found are not cached, so that learners who link their account later are picked up.
+
+        Arguments:
+            enterprise_customer_users (iterable): :class:`EnterpriseCustomerUser` instances.
+        """
+        enterprise_customer_users = list(enterprise_customer_users)
+        cls.load_users(enterprise_customer_users)
+        learners_by_cache_key = collections.defaultdict(list)
+        for enterprise_customer_user in enterprise_customer_users:
+            user = enterprise_customer_user.user
+            identity_provider = enterprise_customer_user.enterprise_customer.identity_provider
+            if user and identity_provider:
+                cache_key = cls.get_remote_id_cache_key(identity_provider, user.username)
+                learners_by_cache_key[(identity_provider, user.username, cache_key)].append(enterprise_customer_user)
+            else:
+                enterprise_customer_user._remote_id = None  # pylint: disable=protected-access
+
+        remote_ids = cache.get_many([cache_key for __, __, cache_key in learners_by_cache_key])
+        usernames_by_identity_provider = collections.defaultdict(list)
+        for identity_provider, username, cache_key in learners_by_cache_key:
+            if cache_key not in remote_ids:
+                usernames_by_identity_provider[identity_provider].append(username)
+
+        if usernames_by_identity_provider:
             client = ThirdPartyAuthApiClient()
-            return client.get_remote_id(self.enterprise_customer.identity_provider, user.username)
-        return None
+            fetched_remote_ids = {}
+            for identity_provider, usernames in usernames_by_identity_provider.items():
+                for username, remote_id in client.get_remote_ids(identity_provider, usernames).items():
+                    if remote_id is not None:
+                        fetched_remote_ids[cls.get_remote_id_cache_key(identity_provider, username)] = remote_id
+            cache.set_many(fetched_remote_ids, getattr(settings, 'ENTERPRISE_REMOTE_ID_CACHE_TIMEOUT', 3600))
+            remote_ids.update(fetched_remote_ids)
+
+        for (__, __, cache_key), learners in learners_by_cache_key.items():
+            for enterprise_customer_user in learners:
+                enterprise_customer_user._remote_id = remote_ids.get(cache_key)  # pylint: disable=protected-access
+
+    @staticmethod
+    def get_remote_id_cache_key(identity_provider, username):
+        """
+        Get the cache key of the SSO provider's identifier for the given username.
+        """
+        return get_cache_key(resource='remote_id', identity_provider=identity_provider, username=username)
 
 
 @python_2_unicode_compatible
@@ -780,13 +1072,70 @@ class EnterpriseCourseEnrollment(TimeStampedModel):
 
         :return: Whether the course enrollment mode is of an audit type.
         """
-        course_enrollment_api = EnrollmentApiClient()
-        course_enrollment = course_enrollment_api.get_course_enrollment(
-            self.enterprise_customer_user.username,
-            self.course_id
-        )
         audit_modes = getattr(settings, 'ENTERPRISE_COURSE_ENROLLMENT_AUDIT_MODES', ['audit', 'honor'])
-        return course_enrollment and course_enrollment.get('mode') in audit_modes
+        mode = self.course_enrollment_mode
+        return mode is not None and mode in audit_modes
+
+    @property
+    def course_enrollment_mode(self):
+        """
+        Return the mode of the LMS course enrollment associated with this ``EnterpriseCourseEnrollment``.
+
+        The mode is fetched from the Enrollment API on first access and memoized on the instance;
+        use :meth:`load_course_enrollment_modes` to resolve many enrollments ahead of time.
+
+        :return: The course enrollment mode, or None if the learner has no such course enrollment.
+        """
+        if not hasattr(self, '_course_enrollment_mode'):
+            course_enrollment = EnrollmentApiClient().get_course_enrollment(
+                self.enterprise_customer_user.username,
+                self.course_id
+            )
+            mode = course_enrollment.get('mode') if course_enrollment else None
+            self._course_enrollment_mode = mode  # pylint: disable=attribute-defined-outside-init
+        return self._course_enrollment_mode
+
+    @classmethod
+    def load_course_enrollment_modes(cls, enterprise_enrollments):
+        """
+        Resolve and memoize the course enrollment mode of each of the given instances in bulk.
+
+        The Enrollment API is queried once per learner for the list of their course enrollments,
+        rather than once per enrollment. Courses missing from a learner's list have no course enrollment
+        mode. Enrollments of learners whose list can't be retrieved fall back to a single lookup on
+        first access.
+
+        Arguments:
+            enterprise_enrollments (iterable): :class:`EnterpriseCourseEnrollment` instances.
+        """
+        enterprise_enrollments = list(enterprise_enrollments)
+        EnterpriseCustomerUser.load_users(
+            enrollment.enterprise_customer_user for enrollment in enterprise_enrollments
+        )
+        enrollments_by_username = collections.defaultdict(list)
+        for enrollment in enterprise_enrollments:
+            username = enrollment.enterprise_customer_user.username
+            if username is not None:
+                enrollments_by_username[username].append(enrollment)
+
+        course_enrollment_api = EnrollmentApiClient()
+        for username, enrollments in enrollments_by_username.items():
+            try:
+                course_enrollments = course_enrollment_api.get_enrolled_courses(username)
+            except (RequestException, SlumberBaseException) as exc:
+                LOGGER.warning(
+                    'Failed to retrieve course enrollments for user [%s], falling back to single lookups: %s',
+                    username,
+                    exc,
+                )
+                continue
+
+            modes = {
+                course_enrollment['course_details']['course_id']: course_enrollment.get('mode')
+                for course_enrollment in course_enrollments or []
+            }
+            for enrollment in enrollments:
+                enrollment._course_enrollment_mode = modes.get(enrollment.course_id)  # pylint: disable=protected-access
 
     def __str__(self):
         """
@@ -804,6 +1153,17 @@ class EnterpriseCourseEnrollment(TimeStampedModel):
         return self.__str__()
 
 
+def _get_paginated_search_results(client, query):
+    """
+    Fetch a page of discovery service search results, outside of the thread serving the request.
+    """
+    try:
+        return client.get_paginated_search_results(query)
+    finally:
+        # Lookups of the API configuration may have opened a database connection for this thread.
+        connection.close()
+
+
 @python_2_unicode_compatible
 class EnterpriseCustomerCatalog(TimeStampedModel):
     """
@@ -881,6 +1241,44 @@ class EnterpriseCustomerCatalog(TimeStampedModel):
         query.update(query_parameters)
         return CourseCatalogApiServiceClient().get_paginated_search_results(query)
 
+    def iter_content(self, query_parameters=None):
+        """
+        Iterate over every discovery service search result of this catalog, across all pages.
+
+        While the results of one page are being consumed, the next page is fetched in a background thread.
+
+        Arguments:
+            query_parameters (dict): Additional query parameters to add to the search API calls, e.g. page_size.
+        Returns:
+            generator: The discovery service search results.
+        """
+        query = self.content_filter.copy()
+        query.update(query_parameters or {})
+        query['page'] = 1
+        # Create the client right away, so that configuration errors are raised before any result is consumed.
+        return self._iter_content(CourseCatalogApiServiceClient(), query)
+
+    @staticmethod
+    def _iter_content(client, query):
+        """
+        Yield the discovery service search results from the given page onwards, see ``iter_content``.
+        """
+        pool = None
+        try:
+            response = client.get_paginated_search_results(query)
+            while response:
+                next_response = None
+                if response.get('next'):
+                    query = dict(query, page=query['page'] + 1)
+                    pool = pool or ThreadPool(1)
+                    next_response = pool.apply_async(_get_paginated_search_results, (client, query))
+                for item in response.get('results', []):
+                    yield item
+                response = next_response and next_response.get()
+        finally:
+            if pool is not None:
+                pool.terminate()
+
     def contains_content(self, unique_field_name, unique_field_value):
         """
         Return true if this catalog contains the content item.
@@ -970,17 +1368,23 @@ class EnrollmentNotificationEmailTemplate(TimeStampedModel):
     )
     history = HistoricalRecords()
 
+    # Compiled templates shared by every instance in this process, keyed by ``(pk, template field)``.
+    # Each entry records the template source it was compiled from, so an edited template is recompiled
+    # the next time it is rendered, whether or not the edit was saved or this process received the
+    # save signal.
+    _compiled_templates = {}
+
     def render_html_template(self, kwargs):
         """
         Render just the HTML template and return it as a string.
         """
-        return self.render_template(mark_safe(self.html_template), kwargs)
+        return self.get_compiled_template('html_template').render(Context(kwargs))
 
     def render_plaintext_template(self, kwargs):
         """
         Render just the plaintext template and return it as a string.
         """
-        return self.render_template(self.plaintext_template, kwargs)
+        return self.get_compiled_template('plaintext_template').render(Context(kwargs))
 
     def render_all_templates(self, kwargs):
         """
@@ -996,6 +1400,40 @@ class EnrollmentNotificationEmailTemplate(TimeStampedModel):
         context = Context(kwargs)
         return template.render(context)
 
+    def get_compiled_template(self, template_field):
+        """
+        Return the compiled ``Template`` for one of the DB-backed template fields.
+
+        Compiling is done once per version of the template source; rendering a notification batch
+        reuses the same compiled object for every recipient.
+
+        Arguments:
+            template_field (str): Either ``html_template`` or ``plaintext_template``.
+        """
+        cache_key = (self.pk, template_field)
+        template_text = getattr(self, template_field)
+        cached = self._compiled_templates.get(cache_key)
+        if cached is not None and cached[0] == template_text:
+            return cached[1]
+
+        if template_field == 'html_template':
+            template = Template(mark_safe(template_text))
+        else:
+            template = Template(template_text)
+        self._compiled_templates[cache_key] = (template_text, template)
+        return template
+
+    @classmethod
+    def clear_compiled_templates(cls, pk=None):
+        """
+        Drop compiled templates for the template with the given primary key, or for all templates.
+        """
+        if pk is None:
+            cls._compiled_templates.clear()
+            return
+        for cache_key in [key for key in list(cls._compiled_templates) if key[0] == pk]:
+            cls._compiled_templates.pop(cache_key, None)
+
     def __str__(self):
         """
         Return human-readable string representation.
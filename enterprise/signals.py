@@ -6,8 +6,16 @@ from __future__ import absolute_import, unicode_literals
 
 from logging import getLogger
 
+from django.contrib.auth.models import User
+
 from enterprise.decorators import disable_for_loaddata
-from enterprise.models import EnterpriseCourseEnrollment, EnterpriseCustomerUser, PendingEnterpriseCustomerUser
+from enterprise.models import (
+    EnrollmentNotificationEmailTemplate,
+    EnterpriseCourseEnrollment,
+    EnterpriseCustomer,
+    EnterpriseCustomerUser,
+    PendingEnterpriseCustomerUser,
+)
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -60,3 +68,52 @@ def handle_user_post_save(sender, **kwargs):  # pylint: disable=unused-argument
             course_id=enrollment.course_id
         )
     pending_ecu.delete()
+
+
+def handle_enrollment_template_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle EnrollmentNotificationEmailTemplate changes - drop compiled copies of the edited or deleted template.
+    """
+    EnrollmentNotificationEmailTemplate.clear_compiled_templates(instance.pk)
+
+
+def handle_enterprise_customer_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle EnterpriseCustomer changes - drop cached data of the edited or deleted enterprise customer.
+
+    This covers the cached copy of the enterprise customer and the cached entitlements of its learners.
+    """
+    EnterpriseCustomer.clear_cached(instance.uuid)
+    EnterpriseCustomerUser.clear_cached_entitlements(instance.uuid)
+
+
+def handle_enterprise_customer_relation_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle changes to an EnterpriseCustomer's cached relations (identity provider, branding configuration).
+
+    Drops the cached copy of the related enterprise customer.
+    """
+    EnterpriseCustomer.clear_cached(instance.enterprise_customer_id)
+
+
+def handle_site_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle Site changes - drop the cached copies of the enterprise customers of the edited or deleted site.
+    """
+    for uuid in EnterpriseCustomer.objects.filter(site_id=instance.pk).values_list('uuid', flat=True):
+        EnterpriseCustomer.clear_cached(uuid)
+
+
+def handle_enterprise_customer_entitlement_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle EnterpriseCustomerEntitlement changes - drop the cached entitlements of the enterprise customer's learners.
+    """
+    EnterpriseCustomerUser.clear_cached_entitlements(instance.enterprise_customer_id)
+
+
+def handle_data_sharing_consent_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handle DataSharingConsent changes - drop the cached entitlements of the learner who consented.
+    """
+    for user_id in User.objects.filter(username=instance.username).values_list('id', flat=True):
+        EnterpriseCustomerUser.clear_cached_entitlements(instance.enterprise_customer_id, user_id)
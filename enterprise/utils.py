@@ -5,25 +5,37 @@ Utility functions for enterprise app.
 from __future__ import absolute_import, unicode_literals
 
 import hashlib
+import json
 import logging
+import math
+import random
 import re
-from uuid import UUID
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from uuid import UUID, uuid4
 
 from opaque_keys.edx.keys import CourseKey
-from six import iteritems  # pylint: disable=ungrouped-imports
+from six import text_type  # pylint: disable=ungrouped-imports
 
 from django.apps import apps
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.urlresolvers import reverse
 from django.http import Http404
 from django.template.loader import render_to_string
+from django.utils.http import urlquote
 from django.utils.translation import ugettext as _
 from django.utils.translation import ungettext
 
 from enterprise.constants import PROGRAM_TYPE_DESCRIPTION
 # pylint: disable=import-error,wrong-import-order,ungrouped-imports
+from six.moves import cPickle as pickle
 from six.moves.urllib.parse import parse_qs, urlencode, urlparse, urlsplit, urlunsplit
 
 try:
@@ -37,8 +49,21 @@ try:
 except ImportError:
     Registry = None
 
+try:
+    import newrelic.agent
+except ImportError:
+    newrelic = None  # pylint: disable=invalid-name
+
 LOGGER = logging.getLogger(__name__)
 
+_REQUEST_MEMO = threading.local()
+
+# Changing the format of cache keys, or of the values cached under them, requires a new version.
+CACHE_KEY_FORMAT_VERSION = 1
+
+# Returned by the cache helpers below for values that aren't cached, as None and other falsy values can be.
+CACHE_MISS = object()
+
 
 class NotConnectedToOpenEdX(Exception):
     """
@@ -305,7 +330,7 @@ def get_enterprise_customer(uuid):
     """
     EnterpriseCustomer = apps.get_model('enterprise', 'EnterpriseCustomer')  # pylint: disable=invalid-name
     try:
-        return EnterpriseCustomer.objects.get(uuid=uuid)  # pylint: disable=no-member
+        return EnterpriseCustomer.get_cached(uuid)
     except EnterpriseCustomer.DoesNotExist:
         return None
 
@@ -325,11 +350,15 @@ def get_enterprise_customer_for_user(auth_user):
         (EnterpriseCustomer): enterprise customer associated with the current user.
 
     """
+    EnterpriseCustomer = apps.get_model('enterprise', 'EnterpriseCustomer')  # pylint: disable=invalid-name
     EnterpriseCustomerUser = apps.get_model('enterprise', 'EnterpriseCustomerUser')  # pylint: disable=invalid-name
     try:
-        return EnterpriseCustomerUser.objects.get(user_id=auth_user.id).enterprise_customer  # pylint: disable=no-member
+        enterprise_customer_uuid = EnterpriseCustomerUser.objects.values_list(  # pylint: disable=no-member
+            'enterprise_customer_id', flat=True
+        ).get(user_id=auth_user.id)
     except EnterpriseCustomerUser.DoesNotExist:
         return None
+    return EnterpriseCustomer.get_cached(enterprise_customer_uuid)
 
 
 def get_enterprise_customer_user(user_id, enterprise_uuid):
@@ -410,6 +439,132 @@ def update_query_parameters(url, query_parameters):
     )
 
 
+class EnterpriseUrlBuilder(object):
+    """
+    Build the enterprise URLs of many course runs and programs for a single response.
+
+    The URL routes, the LMS root URL and the query string of the enterprise context are resolved once,
+    on first use, after which each URL is built with plain string substitution. Routes which can't be
+    resolved into a template are reversed for every URL instead.
+    """
+
+    # Route arguments substituted while resolving the URL templates; they must match the route patterns.
+    COURSE_RUN_KEY_PLACEHOLDER = 'course-v1:enterprise+url+placeholder'
+    PROGRAM_UUID_PLACEHOLDER = 'enterprise-url-placeholder'
+
+    # Characters left unquoted in route arguments by ``reverse``.
+    SAFE_ROUTE_CHARACTERS = str("!$&'()*+,;=/~:@")
+
+    def __init__(self, enterprise_customer, query_parameters=None):
+        """
+        Store the enterprise customer and the enterprise context to add to the URLs.
+
+        Arguments:
+            enterprise_customer (EnterpriseCustomer): The enterprise customer of the enrollment URLs.
+            query_parameters (dict): The query parameters to add to the track selection and marketing URLs.
+        """
+        self.enterprise_customer = enterprise_customer
+        self.query_parameters = query_parameters or {}
+        self._templates = {}
+        self._query_string = None
+
+    def get_course_run_enrollment_url(self, course_run_key):
+        """
+        Return the enterprise landing page URL for the given course run, see ``EnterpriseCustomer``.
+        """
+        return self._build('course_run_enrollment', course_run_key)
+
+    def get_program_enrollment_url(self, program_uuid):
+        """
+        Return the enterprise landing page URL for the given program, see ``EnterpriseCustomer``.
+        """
+        return self._build('program_enrollment', program_uuid)
+
+    def get_content_enrollment_url(self, content_item):
+        """
+        Return the enterprise landing page URL for the given discovery search result, if it has one.
+
+        Arguments:
+            content_item (dict): A course run or program returned by the discovery service ``search/all`` endpoint.
+
+        Returns:
+            (str): The enterprise landing page URL, or None for other types of content.
+        """
+        content_type = content_item['content_type']
+        if content_type == 'courserun':
+            return self.get_course_run_enrollment_url(content_item['key'])
+        if content_type == 'program':
+            return self.get_program_enrollment_url(content_item['uuid'])
+        return None
+
+    def get_course_track_selection_url(self, course_run):
+        """
+        Return the track selection URL for the given course run, see ``get_course_track_selection_url``.
+
+        Raises:
+            (KeyError): Raised when course run dict does not have 'key' key.
+        """
+        try:
+            course_run_key = course_run['key']
+        except KeyError:
+            LOGGER.exception(
+                "KeyError while parsing course run data.\nCourse Run: \n%s", course_run,
+            )
+            raise
+        return self._add_query_string(self._build('course_track_selection', course_run_key))
+
+    def update_query_parameters(self, url):
+        """
+        Return the given URL with the query parameters added, see ``update_query_parameters``.
+        """
+        if '?' in url or '#' in url:
+            return update_query_parameters(url, self.query_parameters)
+        return self._add_query_string(url)
+
+    def _add_query_string(self, url):
+        """
+        Append the encoded query parameters, if any, to a URL without a query string or fragment.
+        """
+        if self._query_string is None:
+            self._query_string = urlencode(self.query_parameters, doseq=True)
+        if not self._query_string:
+            return url
+        return '{}?{}'.format(url, self._query_string)
+
+    def _build(self, name, value):
+        """
+        Build the named URL for the given route argument, resolving its template first if needed.
+        """
+        if name not in self._templates:
+            placeholder = self._get_placeholder(name)
+            url = self._reverse(name, placeholder)
+            parts = url.split(placeholder)
+            self._templates[name] = parts if len(parts) == 2 else None
+
+        template = self._templates[name]
+        if template is None:
+            return self._reverse(name, value)
+        return urlquote(value, safe=self.SAFE_ROUTE_CHARACTERS).join(template)
+
+    def _get_placeholder(self, name):
+        """
+        Return the route argument placeholder of the named URL.
+        """
+        if name == 'program_enrollment':
+            return self.PROGRAM_UUID_PLACEHOLDER
+        return self.COURSE_RUN_KEY_PLACEHOLDER
+
+    def _reverse(self, name, value):
+        """
+        Build the named URL for the given route argument the slow way.
+        """
+        if name == 'course_run_enrollment':
+            return self.enterprise_customer.get_course_run_enrollment_url(value)
+        if name == 'program_enrollment':
+            return self.enterprise_customer.get_program_enrollment_url(value)
+        return '{}{}'.format(settings.LMS_ROOT_URL, reverse('course_modes_choose', kwargs={'course_id': value}))
+
+
 def safe_extract_key(data, key, default=''):
     """
     Safely extract the key, if it does not exist or is None, return the default.
@@ -454,7 +609,7 @@ def get_enterprise_customer_or_404(enterprise_uuid):
     EnterpriseCustomer = apps.get_model('enterprise', 'EnterpriseCustomer')  # pylint: disable=invalid-name
     try:
         enterprise_uuid = UUID(enterprise_uuid)
-        return EnterpriseCustomer.objects.get(uuid=enterprise_uuid)  # pylint: disable=no-member
+        return EnterpriseCustomer.get_cached(enterprise_uuid)
     except (ValueError, EnterpriseCustomer.DoesNotExist):
         LOGGER.error('Unable to find enterprise customer for UUID: %s', enterprise_uuid)
         raise Http404
@@ -490,29 +645,269 @@ def clean_html_for_template_rendering(text):
 
 def get_cache_key(**kwargs):
     """
-    Get MD5 encoded cache key for given arguments.
+    Get a cache key uniquely identified by the given arguments.
 
-    Here is the format of key before MD5 encryption.
-        key1:value1__key2:value2 ...
+    Keys are made of a versioned namespace, named after the ``resource`` argument, and of the MD5 hash of
+    the canonical JSON of all arguments, in which nested mappings are sorted by key so that equal arguments
+    always get the same cache key. The version of a namespace can be changed with the
+    ``ENTERPRISE_CACHE_KEY_VERSIONS`` setting to invalidate all of its entries at once.
 
     Example:
         >>> get_cache_key(site_domain="example.com", resource="enterprise")
-        # Here is key format for above call
-        # "site_domain:example.com__resource:enterprise"
-        a54349175618ff1659dee0978e3149ca
+        # Here is the hashed JSON for above call
+        # '{"resource":"enterprise","site_domain":"example.com"}'
+        'enterprise:v1:enterprise:1:7f06558385734b78861ce056cb9075e2'
 
     Arguments:
-        **kwargs: Key word arguments that need to be present in cache key.
+        **kwargs: Key word arguments that need to be present in cache key. Values that aren't JSON
+            serializable, such as UUIDs, are converted to text.
+
+    Returns:
+         A cache key uniquely identified by the key word arguments.
+    """
+    namespace = re.sub(r'[^\w-]', '_', text_type(kwargs.get('resource', 'default')))
+    version = getattr(settings, 'ENTERPRISE_CACHE_KEY_VERSIONS', {}).get(namespace, 1)
+    key = json.dumps(kwargs, sort_keys=True, separators=(',', ':'), default=text_type)
+    return 'enterprise:v{}:{}:{}:{}'.format(
+        CACHE_KEY_FORMAT_VERSION,
+        namespace,
+        version,
+        hashlib.md5(key.encode('utf-8')).hexdigest(),
+    )
+
+
+def get_cached_or_load(cache_key, load, timeout):
+    """
+    Return the value cached under ``cache_key``, loading and caching it with ``load`` if needed.
+
+    Guards against cache stampedes on expensive values:
+
+    * The value is kept for ``ENTERPRISE_CACHE_STALE_TIMEOUT`` more seconds after it expires, and its
+      expiry is recorded next to it.
+    * Each read may refresh the value ahead of its expiry, with a probability growing as it nears
+      expiry and with the time the value took to load, so refreshes are spread out instead of
+      happening all at once.
+    * Only the caller that acquires a lock key loads the value. The others keep returning the stale
+      value meanwhile, or wait for the value to be cached if there is none, for up to
+      ``ENTERPRISE_CACHE_LOCK_WAIT_TIMEOUT`` seconds, after which they load it themselves.
+
+    Falsy values, such as empty API responses, are cached like any other, so that they are loaded once too.
+
+    Arguments:
+        cache_key (str): The cache key.
+        load (callable): Returns the value to cache.
+        timeout (int): The number of seconds for which the value is fresh.
+
+    Returns:
+        The cached or loaded value.
+    """
+    value, locked = get_cached_value_or_lock(cache_key)
+    if value is not CACHE_MISS and not locked:
+        return value
+
+    try:
+        start = time.time()
+        value = load()
+        set_cached_value(cache_key, value, timeout, load_time=time.time() - start)
+    finally:
+        if locked:
+            release_cache_lock(cache_key)
+    return value
+
+
+def get_cached_value_or_lock(cache_key):
+    """
+    Return the value cached under ``cache_key`` if it can be served, or acquire the lock to load it.
+
+    This is the read half of ``get_cached_or_load``, for callers that load values in their own way, e.g.
+    while streaming them. A caller given the lock must cache the value it loads with ``set_cached_value``,
+    then release the lock with ``release_cache_lock``, even if loading fails.
 
     Returns:
-         An MD5 encoded key uniquely identified by the key word arguments.
+        tuple: The cached value, possibly stale, or ``CACHE_MISS``, and whether the caller acquired the lock.
+            The caller should load the value when it acquired the lock, or when the value is ``CACHE_MISS``.
     """
-    key = '__'.join(['{}:{}'.format(item, value) for item, value in iteritems(kwargs)])
+    metadata_key = '{}__metadata'.format(cache_key)
+    lock_key = '{}__lock'.format(cache_key)
+    cached = cache.get_many([cache_key, metadata_key])
+    value = _decode_cached_value(cached.get(cache_key))
+    if value is not CACHE_MISS and not _should_refresh_cached_value(cached.get(metadata_key)):
+        return value, False
+
+    lock_timeout = getattr(settings, 'ENTERPRISE_CACHE_LOCK_TIMEOUT', 60)
+    if cache.add(lock_key, True, lock_timeout):
+        return value, True
+    if value is not CACHE_MISS:
+        # Another caller is refreshing the value, serve the stale one in the meantime.
+        return value, False
+    # Don't hold up a request for as long as the lock may be held.
+    wait_timeout = min(lock_timeout, getattr(settings, 'ENTERPRISE_CACHE_LOCK_WAIT_TIMEOUT', 2))
+    value = _wait_for_cached_value(cache_key, lock_key, wait_timeout)
+    if value is CACHE_MISS:
+        LOGGER.info('Timed out waiting for [%s] to be cached, loading it.', cache_key)
+    return value, False
+
+
+def release_cache_lock(cache_key):
+    """
+    Release the lock acquired on ``cache_key`` through ``get_cached_value_or_lock``.
+    """
+    cache.delete('{}__lock'.format(cache_key))
 
-    return hashlib.md5(key.encode('utf-8')).hexdigest()
 
+def set_cached_value(cache_key, value, timeout, load_time=0):
+    """
+    Cache a value read with ``get_cached_or_load`` for ``timeout`` seconds.
 
-def traverse_pagination(response, endpoint):
+    Arguments:
+        cache_key (str): The cache key.
+        value: The value to cache.
+        timeout (int): The number of seconds for which the value is fresh.
+        load_time (float): The number of seconds it took to load the value.
+    """
+    stale_timeout = getattr(settings, 'ENTERPRISE_CACHE_STALE_TIMEOUT', 300)
+    values = _encode_cached_value(cache_key, value)
+    values['{}__metadata'.format(cache_key)] = {'expires_at': time.time() + timeout, 'load_time': load_time}
+    cache.set_many(values, timeout + stale_timeout)
+
+
+def get_cached_value(cache_key):
+    """
+    Return a value cached with ``set_cached_value``, or None if it isn't cached.
+    """
+    value = _decode_cached_value(cache.get(cache_key))
+    return None if value is CACHE_MISS else value
+
+
+class CompressedCacheValue(object):
+    """
+    A pickled value cached with ``set_cached_value``.
+
+    Its data may be compressed, and split in chunks cached under other keys.
+    """
+
+    def __init__(self, data=None, chunk_keys=(), compressed=True):
+        """
+        Initialize the value with its pickled data, or the keys of its chunks.
+        """
+        self.data = data
+        self.chunk_keys = list(chunk_keys)
+        self.compressed = compressed
+
+
+def _encode_cached_value(cache_key, value):
+    """
+    Return the items to cache for the given value.
+
+    The value is pickled once, and its pickle cached as is, so that neither measuring its size nor the cache
+    backend pickle the value again. Pickles larger than ``ENTERPRISE_CACHE_COMPRESSION_THRESHOLD`` bytes are
+    compressed. When the compressed data is still larger than ``ENTERPRISE_CACHE_CHUNK_SIZE`` bytes, which
+    should stay below the item size limit of the cache backend, it is split in chunks cached under keys unique
+    to this write.
+    """
+    threshold = getattr(settings, 'ENTERPRISE_CACHE_COMPRESSION_THRESHOLD', 64 * 1024)
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    if len(data) < threshold:
+        return {cache_key: CompressedCacheValue(data=data, compressed=False)}
+
+    compressed_data = zlib.compress(data)
+    chunk_size = getattr(settings, 'ENTERPRISE_CACHE_CHUNK_SIZE', 900 * 1024)
+    chunks = [compressed_data[start:start + chunk_size] for start in range(0, len(compressed_data), chunk_size)]
+    _record_cached_value_metrics(cache_key, len(data), len(compressed_data), len(chunks))
+    if len(chunks) == 1:
+        return {cache_key: CompressedCacheValue(data=compressed_data)}
+
+    write_id = uuid4().hex
+    chunk_keys = ['{}__{}__{}'.format(cache_key, write_id, index) for index in range(len(chunks))]
+    values = dict(zip(chunk_keys, chunks))
+    values[cache_key] = CompressedCacheValue(chunk_keys=chunk_keys)
+    return values
+
+
+def _decode_cached_value(value):
+    """
+    Return the value of an item cached with ``_encode_cached_value``.
+
+    ``CACHE_MISS`` is returned if there is no such item, or if some of its chunks were evicted.
+    """
+    if value is None:
+        return CACHE_MISS
+    if not isinstance(value, CompressedCacheValue):
+        return value
+    if value.chunk_keys:
+        chunks = cache.get_many(value.chunk_keys)
+        if len(chunks) < len(value.chunk_keys):
+            return CACHE_MISS
+        data = b''.join(chunks[key] for key in value.chunk_keys)
+    else:
+        data = value.data
+    return pickle.loads(zlib.decompress(data) if value.compressed else data)
+
+
+def _record_cached_value_metrics(cache_key, size, compressed_size, chunk_count):
+    """
+    Log and report to New Relic, if available, the size and compression ratio of a value being cached.
+    """
+    ratio = float(size) / compressed_size
+    LOGGER.debug(
+        'Caching [%s]: %d bytes compressed to %d bytes (ratio %.1f) in %d chunk(s).',
+        cache_key, size, compressed_size, ratio, chunk_count,
+    )
+    if newrelic:
+        newrelic.agent.record_custom_metric('Custom/Enterprise/Cache/ValueSize', size)
+        newrelic.agent.record_custom_metric('Custom/Enterprise/Cache/CompressedValueSize', compressed_size)
+        newrelic.agent.record_custom_metric('Custom/Enterprise/Cache/CompressionRatio', ratio)
+        newrelic.agent.record_custom_metric('Custom/Enterprise/Cache/ChunkCount', chunk_count)
+
+
+def _should_refresh_cached_value(metadata):
+    """
+    Return whether a cached value should be refreshed, given its metadata.
+
+    Values expire early at random, as in "Optimal Probabilistic Cache Stampede Prevention" (Vattani et al.).
+    Values cached without metadata are never refreshed early.
+    """
+    if not metadata:
+        return False
+    beta = getattr(settings, 'ENTERPRISE_CACHE_EARLY_REFRESH_BETA', 1.0)
+    # 1 - random() is in (0, 1], so that its log is defined.
+    early = -metadata['load_time'] * beta * math.log(1 - random.random())
+    return time.time() + early >= metadata['expires_at']
+
+
+def _wait_for_cached_value(cache_key, lock_key, timeout, interval=0.1):
+    """
+    Wait for up to ``timeout`` seconds for the value being loaded under ``lock_key`` to be cached.
+
+    Returns:
+        The cached value, or ``CACHE_MISS`` if it was not cached before the lock was released or the timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(interval)
+        value = _decode_cached_value(cache.get(cache_key))
+        if value is not CACHE_MISS or cache.get(lock_key) is None:
+            return value
+    return CACHE_MISS
+
+
+def chunked(items, size):
+    """
+    Split the given items into lists of at most ``size`` items, e.g. to bound the values of ``__in`` lookups.
+
+    Arguments:
+        items (iterable): The items.
+        size (int): The maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk of items, in order.
+    """
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def traverse_pagination(response, endpoint, max_workers=1, get_worker_endpoint=None):
     """
     Traverse a paginated API response.
 
@@ -522,21 +917,102 @@ def traverse_pagination(response, endpoint):
     Arguments:
         response (Dict): Current response dict from service API
         endpoint (slumber Resource object): slumber Resource object from edx-rest-api-client
+        max_workers (int): Maximum number of pages to fetch concurrently, see ``iter_pagination``.
+        get_worker_endpoint (callable): Build the endpoint of each concurrent worker, see ``iter_pagination``.
 
     Returns:
         list of dict.
 
     """
-    results = response.get('results', [])
+    return list(
+        iter_pagination(response, endpoint, max_workers=max_workers, get_worker_endpoint=get_worker_endpoint)
+    )
+
+
+def iter_pagination(response, endpoint, max_workers=1, get_worker_endpoint=None):
+    """
+    Iterate over the "results" of a paginated API response and of all of its following pages, in order.
+
+    Results are yielded as soon as their page arrives. With ``max_workers`` greater than 1 and a
+    ``get_worker_endpoint`` function, and when the response has a ``count`` and a ``next`` link using
+    ``page`` or ``limit``/``offset`` query parameters, the query strings of all remaining pages are known
+    in advance, and up to ``max_workers`` of them are fetched concurrently. Each worker thread fetches its
+    pages through its own endpoint, built by ``get_worker_endpoint``, so that HTTP sessions are not shared
+    between threads. Otherwise, ``next`` links are followed one at a time.
+
+    Arguments:
+        response (Dict): Current response dict from service API
+        endpoint (slumber Resource object): slumber Resource object from edx-rest-api-client
+        max_workers (int): Maximum number of pages to fetch concurrently.
+        get_worker_endpoint (callable): Return a new slumber Resource for ``endpoint``, with its own client.
+
+    Yields:
+        dict: The results.
+    """
+    for result in response.get('results', []):
+        yield result
+
+    querystrings = []
+    if max_workers > 1 and get_worker_endpoint is not None:
+        querystrings = get_remaining_page_querystrings(response)
+    if len(querystrings) > 1:
+        local = threading.local()
+
+        def get_page(querystring):
+            """
+            Fetch a page through the endpoint of the current worker thread.
+            """
+            if not hasattr(local, 'endpoint'):
+                local.endpoint = get_worker_endpoint()
+            return local.endpoint.get(**querystring)
+
+        pool = ThreadPool(min(max_workers, len(querystrings)))
+        try:
+            for response in pool.imap(get_page, querystrings):
+                for result in response.get('results', []):
+                    yield result
+        finally:
+            pool.terminate()
 
     next_page = response.get('next')
     while next_page:
         querystring = parse_qs(urlparse(next_page).query, keep_blank_values=True)
         response = endpoint.get(**querystring)
-        results += response.get('results', [])
+        for result in response.get('results', []):
+            yield result
         next_page = response.get('next')
 
-    return results
+
+def get_remaining_page_querystrings(response):
+    """
+    Return the query strings of the pages following the given paginated API response, if they can be known.
+
+    Arguments:
+        response (Dict): Current response dict from service API
+
+    Returns:
+        list: The query string of each remaining page, in order, or an empty list if they can't be determined
+            from the response's ``count`` and the ``page`` or ``limit``/``offset`` query parameters of its
+            ``next`` link.
+    """
+    next_page = response.get('next')
+    count = response.get('count')
+    if not next_page or not isinstance(count, int):
+        return []
+
+    querystring = parse_qs(urlparse(next_page).query, keep_blank_values=True)
+    try:
+        if 'offset' in querystring and 'limit' in querystring:
+            limit = int(querystring['limit'][0])
+            offsets = range(int(querystring['offset'][0]), count, limit)
+            return [dict(querystring, offset=[str(offset)]) for offset in offsets]
+        if 'page' in querystring:
+            page_size = int(querystring['page_size'][0]) if 'page_size' in querystring else len(response['results'])
+            pages = range(int(querystring['page'][0]), (count + page_size - 1) // page_size + 1)
+            return [dict(querystring, page=[str(page)]) for page in pages]
+    except (KeyError, ValueError, ZeroDivisionError):
+        pass
+    return []
 
 
 def ungettext_min_max(singular, plural, range_text, min_val, max_val):
@@ -635,3 +1111,66 @@ def get_program_type_description(program_type):
     :return: The description associated with the program type. If none exists, then the empty string.
     """
     return PROGRAM_TYPE_DESCRIPTION.get(program_type, '')
+
+
+@contextmanager
+def request_memo():
+    """
+    Memoize the values computed through ``get_request_memoized`` within the managed block.
+
+    The memo is local to the current thread, so it is scoped to the request being handled;
+    nested blocks share the outermost block's memo, which is discarded when that block exits.
+    """
+    if getattr(_REQUEST_MEMO, 'values', None) is not None:
+        yield
+        return
+
+    _REQUEST_MEMO.values = {}
+    try:
+        yield
+    finally:
+        _REQUEST_MEMO.values = None
+
+
+def get_request_memoized(key, compute):
+    """
+    Get the value memoized under ``key`` for the current request, computing it on the first call.
+
+    Outside of a ``request_memo`` block nothing is memoized, and ``compute`` is called every time.
+
+    Arguments:
+        key (tuple): Hashable key that uniquely identifies the value, e.g. ``('fact', enterprise_uuid, course_id)``.
+        compute (callable): Function without arguments that computes the value.
+
+    Returns:
+        The memoized value, or the return value of ``compute``.
+    """
+    values = getattr(_REQUEST_MEMO, 'values', None)
+    if values is None:
+        return compute()
+    if key not in values:
+        values[key] = compute()
+    return values[key]
+
+
+def get_request_memoized_many(keys, compute_many):
+    """
+    Get the values memoized under each of ``keys`` for the current request, computing the missing ones at once.
+
+    Outside of a ``request_memo`` block nothing is memoized, and all values are computed every time.
+
+    Arguments:
+        keys (list): Hashable keys that uniquely identify the values, see ``get_request_memoized``.
+        compute_many (callable): Function computing the values of a list of keys, returned as a dict by key.
+
+    Returns:
+        dict: The values, by key.
+    """
+    keys = list(OrderedDict.fromkeys(keys))
+    values = getattr(_REQUEST_MEMO, 'values', None)
+    if values is None:
+        return compute_many(keys)
+    missing_keys = [key for key in keys if key not in values]
+    if missing_keys:
+        values.update(compute_many(missing_keys))
+    return {key: values[key] for key in keys}
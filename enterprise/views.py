@@ -26,7 +26,7 @@ from django.views.generic import View
 from enterprise.api_client.discovery import CourseCatalogApiServiceClient
 from enterprise.api_client.ecommerce import EcommerceApiClient
 from enterprise.api_client.lms import CourseApiClient, EnrollmentApiClient
-from enterprise.decorators import enterprise_login_required, force_fresh_session
+from enterprise.decorators import enterprise_login_required, force_fresh_session, memoize_per_request
 from enterprise.messages import (
     add_consent_declined_message,
     add_missing_price_information_message,
@@ -424,6 +424,7 @@ class GrantDataSharingPermissions(View):
 
         return render(request, 'enterprise/grant_data_sharing_permissions.html', context=context_data)
 
+    @method_decorator(memoize_per_request)
     def get(self, request):
         """
         Render a form to collect user input about data sharing consent.
@@ -500,6 +501,7 @@ class GrantDataSharingPermissions(View):
 
         return redirect(success_url if consent_provided else failure_url)
 
+    @method_decorator(memoize_per_request)
     def post(self, request):
         """
         Process the above form.
@@ -795,6 +797,7 @@ class CourseEnrollmentView(NonAtomicView):
         context_data.update(global_context_data)
         return render(request, 'enterprise/enterprise_course_enrollment_page.html', context=context_data)
 
+    @method_decorator(memoize_per_request)
     @method_decorator(enterprise_login_required)
     def post(self, request, enterprise_uuid, course_id):
         """
@@ -891,6 +894,7 @@ class CourseEnrollmentView(NonAtomicView):
         # Note: LMS start flow automatically detects the paid mode
         return redirect(LMS_START_PREMIUM_COURSE_FLOW_URL.format(course_id=course_id))
 
+    @method_decorator(memoize_per_request)
     @method_decorator(force_fresh_session)
     @method_decorator(enterprise_login_required)
     def get(self, request, enterprise_uuid, course_id):
@@ -1205,6 +1209,7 @@ class ProgramEnrollmentView(NonAtomicView):
         })
         return render(request, 'enterprise/enterprise_program_enrollment_page.html', context=context_data)
 
+    @method_decorator(memoize_per_request)
     @method_decorator(force_fresh_session)
     @method_decorator(enterprise_login_required)
     def get(self, request, enterprise_uuid, program_uuid):
@@ -1240,6 +1245,7 @@ class ProgramEnrollmentView(NonAtomicView):
 
         return self.get_enterprise_program_enrollment_page(request, enterprise_customer, program_details)
 
+    @method_decorator(memoize_per_request)
     @method_decorator(enterprise_login_required)
     def post(self, request, enterprise_uuid, program_uuid):
         """
@@ -49,10 +49,7 @@ def get_course_runs(user, enterprise_customer):
     """
     client = EnterpriseApiClient(user)
 
-    enterprise_courses = client.get_enterprise_courses(
-        enterprise_customer,
-        traverse_pagination=True
-    ).get('results', [])
+    enterprise_courses = client.iter_enterprise_courses(enterprise_customer)
     LOGGER.info('Retrieving course list for enterprise %s', enterprise_customer.name)
 
     for course_detail in enterprise_courses:
@@ -10,13 +10,14 @@ from __future__ import absolute_import, unicode_literals
 
 from logging import getLogger
 
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from slumber.exceptions import HttpNotFoundError
 
 from consent.models import DataSharingConsent
 from enterprise.api_client.lms import CourseApiClient, GradesApiClient, CertificatesApiClient
-from enterprise.models import EnterpriseCourseEnrollment
+from enterprise.models import EnterpriseCourseEnrollment, EnterpriseCustomerUser
 
 
 LOGGER = getLogger(__name__)
@@ -31,6 +32,9 @@ class BaseLearnerExporter(object):
     GRADE_FAILING = 'Fail'
     GRADE_INCOMPLETE = 'In Progress'
 
+    # Number of enrollments read and resolved at a time by ``collect_learner_data``.
+    ENROLLMENT_CHUNK_SIZE = 500
+
     @property
     def grade_passing(self):
         """
@@ -88,18 +92,10 @@ class BaseLearnerExporter(object):
         * ``grade``: string grade recorded for the learner in the course.
         """
 
-        # Fetch the consenting enrollment data, including the enterprise_customer_user.
-        # Order by the course_id, to avoid fetching course API data more than we have to.
-        enrollment_queryset = EnterpriseCourseEnrollment.objects.select_related(
-            'enterprise_customer_user'
-        ).filter(
-            enterprise_customer_user__enterprise_customer=self.enterprise_customer,
-        ).order_by('course_id')
-
         # Fetch course details from the Course API, and cache between calls.
         course_details = None
 
-        for enterprise_enrollment in enrollment_queryset:
+        for enterprise_enrollment in self._iter_consenting_enrollments():
 
             course_id = enterprise_enrollment.course_id
 
@@ -115,13 +111,7 @@ class BaseLearnerExporter(object):
                              enterprise_enrollment.pk, course_id)
                 continue
 
-            consent = DataSharingConsent.objects.proxied_get(
-                username=enterprise_enrollment.enterprise_customer_user.username,
-                course_id=enterprise_enrollment.course_id,
-                enterprise_customer=enterprise_enrollment.enterprise_customer_user.enterprise_customer
-            )
-
-            if not consent.granted or enterprise_enrollment.audit_reporting_disabled:
+            if enterprise_enrollment.audit_reporting_disabled:
                 continue
 
             # For instructor-paced courses, let the certificate determine course completion
@@ -139,6 +129,57 @@ class BaseLearnerExporter(object):
                 is_passing=is_passing,
             )
 
+    def _iter_consenting_enrollments(self):
+        """
+        Yield the ``EnterpriseCourseEnrollment`` records of the ``EnterpriseCustomer`` where consent is granted.
+
+        Enrollments are ordered by course ID, to avoid fetching course API data more than we have to, and
+        are read in chunks of ``ENROLLMENT_CHUNK_SIZE`` using keyset pagination on ``(course_id, id)``, so
+        only one chunk is held in memory at a time. The users, consent records and, when audit data
+        reporting is disabled, course enrollment modes of each chunk are loaded in bulk, along with whatever
+        else the plugin configuration needs to build the learner data records.
+        """
+        enrollment_queryset = EnterpriseCourseEnrollment.objects.select_related(
+            'enterprise_customer_user'
+        ).filter(
+            enterprise_customer_user__enterprise_customer=self.enterprise_customer,
+        ).order_by('course_id', 'id')
+
+        last_enrollment = None
+        while True:
+            chunk_queryset = enrollment_queryset
+            if last_enrollment is not None:
+                chunk_queryset = chunk_queryset.filter(
+                    Q(course_id__gt=last_enrollment.course_id) |
+                    Q(course_id=last_enrollment.course_id, id__gt=last_enrollment.id)
+                )
+            enterprise_enrollments = list(chunk_queryset[:self.ENROLLMENT_CHUNK_SIZE])
+            if not enterprise_enrollments:
+                return
+            last_enrollment = enterprise_enrollments[-1]
+
+            for enrollment in enterprise_enrollments:
+                enrollment.enterprise_customer_user.enterprise_customer = self.enterprise_customer
+            EnterpriseCustomerUser.load_users(
+                enrollment.enterprise_customer_user for enrollment in enterprise_enrollments
+            )
+            consents = DataSharingConsent.objects.proxied_get_many(
+                self.enterprise_customer,
+                [
+                    (enrollment.enterprise_customer_user.username, enrollment.course_id)
+                    for enrollment in enterprise_enrollments
+                ]
+            )
+            enterprise_enrollments = [
+                enrollment for enrollment, consent in zip(enterprise_enrollments, consents) if consent.granted
+            ]
+            if not self.enterprise_customer.enables_audit_data_reporting:
+                EnterpriseCourseEnrollment.load_course_enrollment_modes(enterprise_enrollments)
+            self.plugin_configuration.prepare_learner_data_records(enterprise_enrollments)
+
+            for enrollment in enterprise_enrollments:
+                yield enrollment
+
     def _collect_certificate_data(self, enterprise_enrollment):
         """
         Collect the learner completion data from the course certificate.
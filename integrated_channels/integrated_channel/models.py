@@ -81,6 +81,13 @@ class EnterpriseCustomerPluginConfiguration(TimeStampedModel):
         """
         raise NotImplementedError('Implemented in concrete subclass.')
 
+    def prepare_learner_data_records(self, enterprise_enrollments):
+        """
+        Loads in bulk whatever ``get_learner_data_record`` needs for the given enrollments.
+
+        Called by the learner data exporter for each chunk of enrollments; does nothing by default.
+        """
+
     def get_learner_data_exporter(self, user):
         """
         Returns the class that can serialize the learner course completion data to the integrated channel.
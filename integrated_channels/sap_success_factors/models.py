@@ -14,6 +14,7 @@ from django.utils.encoding import python_2_unicode_compatible
 
 from model_utils.models import TimeStampedModel
 
+from enterprise.models import EnterpriseCustomerUser
 from integrated_channels.integrated_channel.models import EnterpriseCustomerPluginConfiguration
 from integrated_channels.sap_success_factors.utils import SapCourseExporter, parse_datetime_to_epoch
 from integrated_channels.integrated_channel.learner_data import BaseLearnerExporter
@@ -126,6 +127,14 @@ class SAPSuccessFactorsEnterpriseCustomerConfiguration(EnterpriseCustomerPluginC
             grade=grade,
         )
 
+    def prepare_learner_data_records(self, enterprise_enrollments):
+        """
+        Resolves the SAP user IDs of the given enrollments' learners in bulk.
+        """
+        EnterpriseCustomerUser.load_remote_ids(
+            enterprise_enrollment.enterprise_customer_user for enterprise_enrollment in enterprise_enrollments
+        )
+
     def get_learner_data_exporter(self, user):
         """
         Returns a SAP learner data exporter instance.
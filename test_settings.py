@@ -98,6 +98,14 @@ ENTERPRISE_PUBLIC_ENROLLMENT_API_URL = ENTERPRISE_ENROLLMENT_API_URL
 
 ENTERPRISE_API_CACHE_TIMEOUT = 60
 
+# Cached enterprise customers, entitlements, remote IDs, course details and catalog pages would outlive the tests
+# they were read in.
+ENTERPRISE_CUSTOMER_CACHE_TIMEOUT = 0
+ENTERPRISE_ENTITLEMENTS_CACHE_TIMEOUT = 0
+ENTERPRISE_REMOTE_ID_CACHE_TIMEOUT = 0
+ENTERPRISE_COURSE_DETAILS_CACHE_TIMEOUT = 0
+ENTERPRISE_CATALOG_PAGE_CACHE_TIMEOUT = 0
+
 ENTERPRISE_SUPPORT_URL = "http://foo"
 
 ENTERPRISE_TAGLINE = "High-quality online learning opportunities from the world's best universities"
@@ -5,8 +5,11 @@ Tests for the Consent application's API module.
 
 from __future__ import absolute_import, unicode_literals
 
+import json
+
 import ddt
 import mock
+from consent.api.v1.views import DataSharingConsentBatchView as DSCBatchView
 from consent.api.v1.views import DataSharingConsentView as DSCView
 from rest_framework.reverse import reverse
 
@@ -39,6 +42,9 @@ class TestConsentAPIViews(APITest, ConsentMixin):
         discovery_client_class = mock.patch('enterprise.models.CourseCatalogApiServiceClient')
         self.discovery_client = discovery_client_class.start().return_value
         self.discovery_client.is_course_in_catalog.return_value = True
+        self.discovery_client.get_catalog_course_containment.side_effect = lambda catalog_id, course_ids: {
+            course_id: self.discovery_client.is_course_in_catalog.return_value for course_id in course_ids
+        }
         self.addCleanup(discovery_client_class.stop)
         super(TestConsentAPIViews, self).setUp()
 
@@ -1431,3 +1437,123 @@ class TestConsentAPIViews(APITest, ConsentMixin):
         # Assert that an enterprise course enrollment exists without consent provided.
         if expected_status_code == 200:
             self._assert_consent_not_provided(response)
+
+
+@ddt.ddt
+class TestConsentBatchAPIView(APITest):
+    """
+    Tests for the Consent application's batch Data Sharing API view.
+    """
+
+    path = settings.TEST_SERVER + reverse('data_sharing_consent_batch')
+
+    def setUp(self):
+        discovery_client_class = mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+        self.discovery_client = discovery_client_class.start().return_value
+        self.discovery_client.is_course_in_catalog.return_value = True
+        self.addCleanup(discovery_client_class.stop)
+        super(TestConsentBatchAPIView, self).setUp()
+
+    def create_user(self, username=TEST_USERNAME, password=TEST_PASSWORD, **kwargs):
+        """
+        Create a test user and set its password.
+        """
+        self.user = factories.UserFactory(username=username, is_active=True, is_staff=True, id=TEST_USER_ID)
+        self.user.set_password(password)
+        self.user.save()
+
+    def _post(self, body):
+        """
+        Post the given body to the batch endpoint as JSON.
+        """
+        return self.client.post(self.path, json.dumps(body), content_type='application/json')
+
+    def test_batch_consent_records(self):
+        enterprise_customer = factories.EnterpriseCustomerFactory(
+            uuid=TEST_UUID,
+            catalog=1,
+            enable_data_sharing_consent=True,
+            enforce_data_sharing_consent='at_enrollment',
+        )
+        # Course-level consent applies to all of the course's runs.
+        factories.DataSharingConsentFactory(
+            username=TEST_USERNAME,
+            course_id='edX+DemoX',
+            enterprise_customer=enterprise_customer,
+            granted=True,
+        )
+        factories.DataSharingConsentFactory(
+            username='other_learner',
+            course_id=TEST_COURSE,
+            enterprise_customer=enterprise_customer,
+            granted=False,
+        )
+        response = self._post({
+            DSCBatchView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID,
+            DSCBatchView.REQUIRED_PARAM_CONSENT_REQUESTS: [
+                {'username': TEST_USERNAME, 'course_id': TEST_COURSE},
+                {'username': 'other_learner', 'course_id': TEST_COURSE},
+                {'username': 'other_learner', 'course_id': 'course-v1:edX+Other+Run'},
+            ],
+        })
+        assert response.status_code == 200
+        results = self.load_json(response.content)['results']
+        assert [
+            (result['username'], result['course_id'], result['exists'], result['consent_provided'])
+            for result in results
+        ] == [
+            (TEST_USERNAME, 'edX+DemoX', True, True),
+            ('other_learner', TEST_COURSE, True, False),
+            ('other_learner', 'course-v1:edX+Other+Run', False, False),
+        ]
+        assert [result['consent_required'] for result in results] == [False, True, True]
+
+    def test_batch_consent_records_no_enterprise(self):
+        response = self._post({
+            DSCBatchView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID,
+            DSCBatchView.REQUIRED_PARAM_CONSENT_REQUESTS: [{'username': TEST_USERNAME, 'course_id': TEST_COURSE}],
+        })
+        assert response.status_code == 200
+        assert self.load_json(response.content)['results'] == [{
+            DSCView.REQUIRED_PARAM_USERNAME: TEST_USERNAME,
+            DSCView.REQUIRED_PARAM_COURSE_ID: TEST_COURSE,
+            DSCView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID,
+            DSCView.CONSENT_EXISTS: False,
+            DSCView.CONSENT_GRANTED: False,
+            DSCView.CONSENT_REQUIRED: False,
+        }]
+
+    @ddt.data(
+        (
+            {DSCBatchView.REQUIRED_PARAM_CONSENT_REQUESTS: [{'username': TEST_USERNAME, 'course_id': TEST_COURSE}]},
+            DSCBatchView.MISSING_REQUIRED_PARAMS_MSG.format("'enterprise_customer_uuid'"),
+        ),
+        (
+            {DSCBatchView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID},
+            DSCBatchView.MISSING_REQUIRED_PARAMS_MSG.format("'consent_requests'"),
+        ),
+        (
+            {
+                DSCBatchView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID,
+                DSCBatchView.REQUIRED_PARAM_CONSENT_REQUESTS: [{'username': TEST_USERNAME}],
+            },
+            DSCBatchView.INVALID_CONSENT_REQUESTS_MSG.format(max_requests=DSCBatchView.MAX_CONSENT_REQUESTS),
+        ),
+    )
+    @ddt.unpack
+    def test_batch_consent_invalid_request(self, body, expected_error):
+        response = self._post(body)
+        assert response.status_code == 400
+        assert self.load_json(response.content) == {'error': expected_error}
+
+    def test_batch_consent_other_users_forbidden_for_non_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self._post({
+            DSCBatchView.REQUIRED_PARAM_ENTERPRISE_CUSTOMER: TEST_UUID,
+            DSCBatchView.REQUIRED_PARAM_CONSENT_REQUESTS: [
+                {'username': TEST_USERNAME, 'course_id': TEST_COURSE},
+                {'username': 'other_learner', 'course_id': TEST_COURSE},
+            ],
+        })
+        assert response.status_code == 403
@@ -11,7 +11,7 @@ from pytest import mark
 
 from django.test import testcases
 
-from test_utils import TEST_UUID
+from test_utils import TEST_COURSE, TEST_UUID, factories
 
 
 @mark.django_db
@@ -26,3 +26,42 @@ class ConsentHelpersTest(testcases.TestCase):
         Test that the returned consent record is None when no EnterpriseCustomer exists.
         """
         assert helpers.get_data_sharing_consent('bob', TEST_UUID, course_id='fake-course') is None
+
+    def test_get_course_data_sharing_consents_no_enterprise(self):
+        """
+        Test that no consent records are returned when no EnterpriseCustomer exists.
+        """
+        assert helpers.get_course_data_sharing_consents([('bob', 'fake-course')], TEST_UUID) is None
+
+    def test_get_course_data_sharing_consents(self):
+        """
+        Test that consent records are returned in order, with enterprise enrollments resolved in bulk.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=TEST_UUID)
+        factories.DataSharingConsentFactory(
+            username='bob',
+            course_id=TEST_COURSE,
+            enterprise_customer=enterprise_customer,
+            granted=True,
+        )
+        alice = factories.UserFactory(username='alice')
+        factories.EnterpriseCourseEnrollmentFactory(
+            course_id=TEST_COURSE,
+            enterprise_customer_user=factories.EnterpriseCustomerUserFactory(
+                user_id=alice.id,
+                enterprise_customer=enterprise_customer,
+            ),
+        )
+
+        with self.assertNumQueries(4):
+            consents = helpers.get_course_data_sharing_consents(
+                [('bob', TEST_COURSE), ('alice', TEST_COURSE), ('carol', TEST_COURSE)],
+                TEST_UUID,
+            )
+        assert [(consent.username, consent.exists, consent.granted) for consent in consents] == [
+            ('bob', True, True),
+            ('alice', False, False),
+            ('carol', False, False),
+        ]
+        with self.assertNumQueries(0):
+            assert [consent.enterprise_enrollment_exists for consent in consents[1:]] == [True, False]
@@ -5,6 +5,9 @@ Tests for the `edx-enterprise` serializer module.
 
 from __future__ import absolute_import, unicode_literals
 
+import copy
+import unittest
+
 import ddt
 import mock
 import six
@@ -17,8 +20,14 @@ from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.test import override_settings
 
-from enterprise.api.v1.serializers import EnterpriseCatalogCoursesReadOnlySerializer, ImmutableStateSerializer
-from test_utils import FAKE_UUIDS, TEST_USERNAME, APITest, factories
+from enterprise.api.v1.mixins import get_requested_fields, is_field_requested
+from enterprise.api.v1.serializers import (
+    CourseRunDetailSerializer,
+    EnterpriseCatalogCoursesReadOnlySerializer,
+    ImmutableStateSerializer,
+    ProgramDetailSerializer,
+)
+from test_utils import FAKE_UUIDS, TEST_USERNAME, APITest, factories, fake_catalog_api
 
 
 @mark.django_db
@@ -393,6 +402,46 @@ class TestEnterpriseCatalogCoursesSerializer(TestImmutableStateSerializer):
 
 
 @ddt.ddt
+@mark.django_db
+class TestContentDetailSerializers(APITest):
+    """
+    Tests for the ``CourseRunDetailSerializer`` and ``ProgramDetailSerializer``.
+    """
+
+    def setUp(self):
+        """
+        Set up the enterprise customer whose enrollment URLs are added.
+        """
+        super(TestContentDetailSerializers, self).setUp()
+        self.enterprise_customer = factories.EnterpriseCustomerFactory()
+
+    def test_course_run_detail_does_not_mutate_instance(self):
+        """
+        The course run is returned with its enrollment URL, leaving the serialized data untouched.
+        """
+        course_run = copy.deepcopy(fake_catalog_api.FAKE_COURSE_RUN)
+        original = copy.deepcopy(course_run)
+        data = CourseRunDetailSerializer(course_run, context={'enterprise_customer': self.enterprise_customer}).data
+        assert data['enrollment_url'] == self.enterprise_customer.get_course_run_enrollment_url(course_run['key'])
+        assert course_run == original
+
+    def test_program_detail_does_not_mutate_instance(self):
+        """
+        The program and its course runs are returned with enrollment URLs, sharing the data left as is.
+        """
+        program = copy.deepcopy(fake_catalog_api.FAKE_PROGRAM_RESPONSE3)
+        original = copy.deepcopy(program)
+        data = ProgramDetailSerializer(program, context={'enterprise_customer': self.enterprise_customer}).data
+        assert program == original
+
+        assert data['enrollment_url'] == self.enterprise_customer.get_program_enrollment_url(program['uuid'])
+        for course, updated_course in zip(program['courses'], data['courses']):
+            for course_run, updated_course_run in zip(course['course_runs'], updated_course['course_runs']):
+                assert updated_course_run['enrollment_url'] == \
+                    self.enterprise_customer.get_course_run_enrollment_url(course_run['key'])
+                assert updated_course_run['seats'] is course_run['seats']
+
+
 @mark.django_db
 class TestEnterpriseCustomerUserWriteSerializer(APITest):
     """
@@ -424,3 +473,50 @@ class TestEnterpriseCustomerUserWriteSerializer(APITest):
         response = self.load_json(response.content)
         if expected_status_code == 201:
             self.assertDictEqual(data, response)
+
+
+@ddt.ddt
+class TestSparseFieldsets(unittest.TestCase):
+    """
+    Tests for the ``fields`` and ``expand`` query parameters of enterprise serializers.
+    """
+
+    @ddt.data(
+        ('', None),
+        ('?expand=site', None),
+        ('?fields=uuid,name', {'uuid': None, 'name': None}),
+        ('?fields=uuid&fields=name', {'uuid': None, 'name': None}),
+        ('?fields=uuid&expand=site', {'uuid': None, 'site': None}),
+        (
+            '?fields=user_id,enterprise_customer.uuid,enterprise_customer.name',
+            {'user_id': None, 'enterprise_customer': {'uuid': None, 'name': None}},
+        ),
+        (
+            '?fields=enterprise_customer.uuid&expand=enterprise_customer',
+            {'enterprise_customer': None},
+        ),
+    )
+    @ddt.unpack
+    def test_get_requested_fields(self, query_string, expected_fields):
+        """
+        Test that requested fields are parsed into a tree of nested fields.
+        """
+        request = APIRequestFactory().get('/' + query_string)
+        assert get_requested_fields(request) == expected_fields
+        assert get_requested_fields(None) is None
+
+    @ddt.data(
+        ('enterprise_customer', True),
+        ('enterprise_customer.uuid', True),
+        ('enterprise_customer.site', False),
+        ('enterprise_customer.site.domain', False),
+        ('user', False),
+    )
+    @ddt.unpack
+    def test_is_field_requested(self, field_path, expected_requested):
+        """
+        Test that fields are requested when listed, or when all the fields of one of their parents are.
+        """
+        requested_fields = {'user_id': None, 'enterprise_customer': {'uuid': None, 'name': None}}
+        assert is_field_requested(requested_fields, field_path) == expected_requested
+        assert is_field_requested(None, field_path)
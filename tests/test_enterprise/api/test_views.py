@@ -4,16 +4,21 @@ Tests for the `edx-enterprise` api module.
 """
 from __future__ import absolute_import, unicode_literals
 
+import copy
 from operator import itemgetter
 
 import ddt
 import mock
 from pytest import mark
 from rest_framework.reverse import reverse
+from slumber.exceptions import HttpClientError
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from enterprise.models import EnterpriseCustomer, EnterpriseCustomerIdentityProvider
@@ -27,6 +32,7 @@ from test_utils import (
     factories,
     fake_catalog_api,
     fake_enterprise_api,
+    update_search_with_enterprise_context,
 )
 
 CATALOGS_LIST_ENDPOINT = reverse('catalogs-list')
@@ -37,6 +43,10 @@ ENTERPRISE_CATALOGS_DETAIL_ENDPOINT = reverse(
     'enterprise-catalogs-detail',
     kwargs={'pk': FAKE_UUIDS[1]}
 )
+ENTERPRISE_CATALOGS_EXPORT_ENDPOINT = reverse(
+    'enterprise-catalogs-export',
+    kwargs={'pk': FAKE_UUIDS[1]}
+)
 ENTERPRISE_CATALOGS_COURSE_RUN_ENDPOINT = reverse(
     # pylint: disable=anomalous-backslash-in-string
     'enterprise-catalogs-course-runs/(?P<course-id>[^/+]+(/|\+)[^/+]+(/|\+)[^/?]+)',
@@ -298,6 +308,129 @@ class TestEnterpriseAPIViews(APITest):
         response = self.load_json(response.content)
         assert expected_json == response['results'][0]['data_sharing_consent_records']
 
+    def test_get_enterprise_customer_users_query_count(self):
+        """
+        Make sure the number of queries to list enterprise learners does not grow with the number of learners.
+        """
+        def list_learners():
+            """
+            List the enterprise learners and return the number of consent records serialized.
+            """
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(settings.TEST_SERVER + ENTERPRISE_LEARNER_LIST_ENDPOINT)
+            response = self.load_json(response.content)
+            return len(queries), sum(len(result['data_sharing_consent_records']) for result in response['results'])
+
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+
+        def add_learner():
+            """
+            Create an enterprise learner with a granted consent record.
+            """
+            user = factories.UserFactory()
+            factories.EnterpriseCustomerUserFactory(user_id=user.id, enterprise_customer=enterprise_customer)
+            factories.DataSharingConsentFactory(
+                username=user.username,
+                enterprise_customer=enterprise_customer,
+                course_id=TEST_COURSE,
+                granted=True,
+            )
+
+        add_learner()
+        single_learner_queries, single_learner_records = list_learners()
+        for __ in range(4):
+            add_learner()
+        many_learners_queries, many_learners_records = list_learners()
+
+        assert single_learner_records == 1
+        assert many_learners_records == 5
+        assert many_learners_queries == single_learner_queries
+
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_get_enterprise_customer_users_catalog_containment(self, mock_catalog_api_client):
+        """
+        Make sure the catalog containment of the consent records pending on a page is checked in one batch.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        course_ids = ['course-v1:edX+DemoX+Demo_Course', 'course-v1:edX+DemoX+Other_Course', 'edX+DemoX']
+        for course_id in course_ids:
+            user = factories.UserFactory()
+            factories.EnterpriseCustomerUserFactory(user_id=user.id, enterprise_customer=enterprise_customer)
+            factories.DataSharingConsentFactory(
+                username=user.username,
+                enterprise_customer=enterprise_customer,
+                course_id=course_id,
+                granted=False,
+            )
+        get_catalog_course_containment = mock.Mock(
+            side_effect=lambda catalog, ids: {course_id: course_id != 'edX+DemoX' for course_id in ids}
+        )
+        mock_catalog_api_client.return_value = mock.Mock(
+            get_catalog_course_containment=get_catalog_course_containment,
+            is_course_in_catalog=mock.Mock(side_effect=AssertionError),
+        )
+
+        response = self.client.get(settings.TEST_SERVER + ENTERPRISE_LEARNER_LIST_ENDPOINT)
+        response = self.load_json(response.content)
+
+        consent_required = {
+            record['course_id']: record['consent_required']
+            for result in response['results']
+            for record in result['data_sharing_consent_records']
+        }
+        assert consent_required == {
+            'course-v1:edX+DemoX+Demo_Course': True,
+            'course-v1:edX+DemoX+Other_Course': True,
+            'edX+DemoX': False,
+        }
+        assert get_catalog_course_containment.call_count == 1
+        assert sorted(get_catalog_course_containment.call_args[0][1]) == sorted(course_ids)
+
+    @ddt.data(
+        (
+            ENTERPRISE_CUSTOMER_LIST_ENDPOINT,
+            'fields=uuid,name',
+            [{'uuid': FAKE_UUIDS[0], 'name': 'Test Enterprise Customer'}],
+            True,
+        ),
+        (
+            ENTERPRISE_CUSTOMER_LIST_ENDPOINT,
+            'fields=uuid,name&expand=enterprise_customer_entitlements',
+            [{
+                'uuid': FAKE_UUIDS[0], 'name': 'Test Enterprise Customer',
+                'enterprise_customer_entitlements': [{'enterprise_customer': FAKE_UUIDS[0], 'entitlement_id': 1}],
+            }],
+            False,
+        ),
+        (
+            ENTERPRISE_LEARNER_LIST_ENDPOINT,
+            'fields=user_id,enterprise_customer.uuid,enterprise_customer.name',
+            [{'user_id': 0, 'enterprise_customer': {'uuid': FAKE_UUIDS[0], 'name': 'Test Enterprise Customer'}}],
+            True,
+        ),
+    )
+    @ddt.unpack
+    def test_sparse_fieldsets(self, url, query_string, expected_results, fewer_queries):
+        """
+        Make sure only the fields requested through ``fields`` and ``expand`` are serialized, and queried.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0], name='Test Enterprise Customer')
+        factories.EnterpriseCustomerEntitlementFactory(enterprise_customer=enterprise_customer, entitlement_id=1)
+        factories.EnterpriseCustomerUserFactory(user_id=0, enterprise_customer=enterprise_customer)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(settings.TEST_SERVER + url)
+        all_fields_queries = len(queries)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('{}{}?{}'.format(settings.TEST_SERVER, url, query_string))
+        response = self.load_json(response.content)
+
+        assert response['results'] == expected_results
+        if fewer_queries:
+            assert len(queries) < all_fields_queries
+        else:
+            assert len(queries) == all_fields_queries
+
     @override_settings(ECOMMERCE_SERVICE_WORKER_USERNAME=TEST_USERNAME)
     @ddt.data(
         (True, 201),
@@ -786,6 +919,197 @@ class TestEnterpriseAPIViews(APITest):
 
         assert response == expected_result
 
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_enterprise_customer_catalogs_detail_sparse_fields(self, mock_catalog_api_client):
+        """
+        Verify the EnterpriseCustomerCatalog detail view only searches the discovery service for requested fields.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        factories.EnterpriseCustomerCatalogFactory(uuid=FAKE_UUIDS[1], enterprise_customer=enterprise_customer)
+        factories.EnterpriseCustomerUserFactory(user_id=self.user.id, enterprise_customer=enterprise_customer)
+        get_paginated_search_results = mock.Mock(return_value=fake_catalog_api.FAKE_SEARCH_ALL_RESULTS)
+        mock_catalog_api_client.return_value = mock.Mock(get_paginated_search_results=get_paginated_search_results)
+
+        response = self.load_json(self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?fields=uuid').content)
+        assert response == {'uuid': FAKE_UUIDS[1]}
+        assert not get_paginated_search_results.called
+
+        response = self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?fields=uuid,count&expand=results&page=1')
+        response = self.load_json(response.content)
+        assert sorted(response) == ['count', 'results', 'uuid']
+        query = get_paginated_search_results.call_args[0][0]
+        assert query['page'] == '1'
+        assert 'fields' not in query
+        assert 'expand' not in query
+
+    @ddt.data(
+        ENTERPRISE_CUSTOMER_LIST_ENDPOINT,
+        reverse('enterprise-customer-detail', (FAKE_UUIDS[0],)),
+    )
+    def test_enterprise_customer_conditional_get(self, url):
+        """
+        Verify the EnterpriseCustomer views answer conditional requests until the customer or its relations change.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        response = self.client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert not response.content
+
+        factories.EnterpriseCustomerEntitlementFactory(enterprise_customer=enterprise_customer, entitlement_id=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert self.load_json(response.content)
+
+        etag = response['ETag']
+        enterprise_customer.name = 'Renamed Enterprise Customer'
+        enterprise_customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+        # Sites have no modified timestamp, but their serialized fields are part of the ETag.
+        etag = response['ETag']
+        enterprise_customer.site.domain = 'renamed.example.com'
+        enterprise_customer.site.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert self.load_json(response.content)
+
+    def test_enterprise_customer_list_conditional_get_paginated(self):
+        """
+        Verify the ETag of a page of EnterpriseCustomers only depends on the customers of that page, and the pagination.
+        """
+        enterprise_customers = [factories.EnterpriseCustomerFactory() for __ in range(11)]
+        response = self.client.get(ENTERPRISE_CUSTOMER_LIST_ENDPOINT)
+        assert response.status_code == 200
+        etag = response['ETag']
+        page_uuids = set(result['uuid'] for result in self.load_json(response.content)['results'])
+        assert len(page_uuids) == 10
+
+        # Customers of other pages are not part of the ETag.
+        other_customer = [customer for customer in enterprise_customers if str(customer.uuid) not in page_uuids][0]
+        other_customer.name = 'Renamed Enterprise Customer'
+        other_customer.save()
+        response = self.client.get(ENTERPRISE_CUSTOMER_LIST_ENDPOINT, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        # Customers of the page are.
+        page_customer = [customer for customer in enterprise_customers if str(customer.uuid) in page_uuids][0]
+        page_customer.name = 'Renamed Enterprise Customer'
+        page_customer.save()
+        response = self.client.get(ENTERPRISE_CUSTOMER_LIST_ENDPOINT, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+
+        # So is the pagination.
+        etag = response['ETag']
+        factories.EnterpriseCustomerFactory()
+        response = self.client.get(ENTERPRISE_CUSTOMER_LIST_ENDPOINT, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert self.load_json(response.content)['count'] == 12
+
+    @override_settings(ENTERPRISE_CATALOG_PAGE_CACHE_TIMEOUT=60)
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_enterprise_customer_catalogs_detail_cached(self, mock_catalog_api_client):
+        """
+        Verify the EnterpriseCustomerCatalog detail view caches pages and supports conditional requests.
+        """
+        cache.clear()
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        factories.EnterpriseCustomerCatalogFactory(uuid=FAKE_UUIDS[1], enterprise_customer=enterprise_customer)
+        factories.EnterpriseCustomerUserFactory(user_id=self.user.id, enterprise_customer=enterprise_customer)
+        get_paginated_search_results = mock.Mock(return_value=fake_catalog_api.FAKE_SEARCH_ALL_RESULTS_WITH_PAGINATION)
+        mock_catalog_api_client.return_value = mock.Mock(get_paginated_search_results=get_paginated_search_results)
+
+        response = self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?page=2')
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+        etag = response['ETag']
+        expected_result = self.load_json(response.content)
+
+        # Repeat polls are served from the cache.
+        response = self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?page=2')
+        assert response.status_code == 200
+        assert response['ETag'] == etag
+        assert self.load_json(response.content) == expected_result
+        response = self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?page=2', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert get_paginated_search_results.call_count == 1
+
+        # Other pages are not.
+        response = self.client.get(ENTERPRISE_CATALOGS_DETAIL_ENDPOINT + '?page=3', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert get_paginated_search_results.call_count == 2
+        cache.clear()
+
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_enterprise_customer_catalogs_export(self, mock_catalog_api_client):
+        """
+        Verify the EnterpriseCustomerCatalog export view streams every page of the catalog as NDJSON.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        factories.EnterpriseCustomerCatalogFactory(
+            uuid=FAKE_UUIDS[1],
+            enterprise_customer=enterprise_customer,
+            content_filter={'content_type': 'courserun'},
+        )
+        factories.EnterpriseCustomerUserFactory(user_id=self.user.id, enterprise_customer=enterprise_customer)
+        pages = [
+            copy.deepcopy(fake_catalog_api.FAKE_SEARCH_ALL_RESULTS_WITH_PAGINATION),
+            copy.deepcopy(fake_catalog_api.FAKE_SEARCH_ALL_RESULTS),
+        ]
+        get_paginated_search_results = mock.Mock(side_effect=pages)
+        mock_catalog_api_client.return_value = mock.Mock(get_paginated_search_results=get_paginated_search_results)
+
+        # Only the page size and content filter keys are passed on to the discovery service.
+        query_string = '?page=5&page_size=3&format=json&fields=uuid&q=demo&content_type=courserun'
+        response = self.client.get(ENTERPRISE_CATALOGS_EXPORT_ENDPOINT + query_string)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+
+        expected_items = []
+        for page in pages:
+            expected_items.extend(update_search_with_enterprise_context(page)['results'])
+        assert [self.load_json(line) for line in lines] == expected_items
+        assert [call[0][0]['page'] for call in get_paginated_search_results.call_args_list] == [1, 2]
+        for call in get_paginated_search_results.call_args_list:
+            query = call[0][0]
+            assert query['page_size'] == '3'
+            assert query['content_type'] == 'courserun'
+            assert not set(query) & {'format', 'fields', 'q'}
+
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_enterprise_customer_catalogs_export_error(self, mock_catalog_api_client):
+        """
+        Verify the EnterpriseCustomerCatalog export view ends the stream with an error line if a page fails to load.
+        """
+        enterprise_customer = factories.EnterpriseCustomerFactory(uuid=FAKE_UUIDS[0])
+        factories.EnterpriseCustomerCatalogFactory(uuid=FAKE_UUIDS[1], enterprise_customer=enterprise_customer)
+        factories.EnterpriseCustomerUserFactory(user_id=self.user.id, enterprise_customer=enterprise_customer)
+        first_page = copy.deepcopy(fake_catalog_api.FAKE_SEARCH_ALL_RESULTS_WITH_PAGINATION)
+        get_paginated_search_results = mock.Mock(side_effect=[first_page, HttpClientError])
+        mock_catalog_api_client.return_value = mock.Mock(get_paginated_search_results=get_paginated_search_results)
+
+        with mock.patch('enterprise.api.v1.views.LOGGER') as mock_logger:
+            response = self.client.get(ENTERPRISE_CATALOGS_EXPORT_ENDPOINT)
+            lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        assert response.status_code == 200
+
+        expected_items = update_search_with_enterprise_context(copy.deepcopy(first_page))['results']
+        assert [self.load_json(line) for line in lines[:-1]] == expected_items
+        assert list(self.load_json(lines[-1])) == ['error']
+        assert mock_logger.exception.call_count == 1
+
     @ddt.data(
         (False, False, False, {}, {'detail': 'Not found.'}),
         (False, True, False, {'detail': 'Not found.'}, {'detail': 'Not found.'}),
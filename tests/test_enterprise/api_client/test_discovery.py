@@ -458,6 +458,61 @@ class TestCourseCatalogApi(CourseDiscoveryApiTestMixin, unittest.TestCase):
         else:
             discovery_client.catalogs.return_value.contains.get.assert_called_once_with(course_id=course_id)
 
+    @mock.patch('enterprise.api_client.discovery.course_discovery_api_client')
+    def test_get_catalog_course_containment(self, mock_discovery_client_factory):
+        """
+        Test the API client that checks which of many course and course run IDs are present in a catalog.
+        """
+        def contains(course_run_id=None, course_id=None):
+            """
+            Mock the catalog "contains" endpoint, which accepts comma-separated IDs.
+            """
+            ids = (course_run_id or course_id).split(',')
+            return {'courses': {requested_id: requested_id != 'edX+NotInCatalog' for requested_id in ids}}
+
+        discovery_client = mock_discovery_client_factory.return_value
+        discovery_client.catalogs.return_value.contains.get.side_effect = contains
+        self.api = CourseCatalogApiClient(self.user_mock)
+
+        assert self.api.get_catalog_course_containment(
+            1,
+            ['course-v1:edX+DemoX+Demo_Course', 'edX+DemoX', 'edX+NotInCatalog', 'edX+DemoX'],
+        ) == {
+            'course-v1:edX+DemoX+Demo_Course': True,
+            'edX+DemoX': True,
+            'edX+NotInCatalog': False,
+        }
+        discovery_client.catalogs.assert_called_once_with(1)
+        assert discovery_client.catalogs.return_value.contains.get.call_args_list == [
+            mock.call(course_run_id='course-v1:edX+DemoX+Demo_Course'),
+            mock.call(course_id='edX+DemoX,edX+NotInCatalog'),
+        ]
+
+    @mock.patch('enterprise.api_client.discovery.CourseKey')
+    @mock.patch('enterprise.api_client.discovery.course_discovery_api_client')
+    def test_get_catalog_course_containment_normalized_ids(self, mock_discovery_client_factory, mock_course_key):
+        """
+        Test that containment is returned by the given course run IDs, rather than by their normalized form.
+        """
+        mock_course_key.from_string.side_effect = lambda course_id: course_id.replace('COURSE-V1:', 'course-v1:')
+        discovery_client = mock_discovery_client_factory.return_value
+        discovery_client.catalogs.return_value.contains.get.return_value = {
+            'courses': {'course-v1:edX+DemoX+Demo_Course': True}
+        }
+        self.api = CourseCatalogApiClient(self.user_mock)
+
+        assert self.api.get_catalog_course_containment(
+            1,
+            ['COURSE-V1:edX+DemoX+Demo_Course', 'course-v1:edX+DemoX+Demo_Course', 'course-v1:edX+Other+Course'],
+        ) == {
+            'COURSE-V1:edX+DemoX+Demo_Course': True,
+            'course-v1:edX+DemoX+Demo_Course': True,
+            'course-v1:edX+Other+Course': False,
+        }
+        discovery_client.catalogs.return_value.contains.get.assert_called_once_with(
+            course_run_id='course-v1:edX+DemoX+Demo_Course,course-v1:edX+Other+Course'
+        )
+
     @ddt.data(
         (None, []),
         ({}, []),
@@ -12,6 +12,7 @@ from pytest import mark
 from django.conf import settings
 from django.core.cache import cache
 
+from enterprise import utils
 from enterprise.api_client import enterprise as enterprise_api
 from enterprise.utils import get_cache_key
 from test_utils.factories import EnterpriseCustomerFactory, UserFactory
@@ -59,9 +60,9 @@ class TestEnterpriseApiClient(unittest.TestCase, EnterpriseMockMixin):
 
     @responses.activate
     @mock.patch('enterprise.api_client.lms.JwtBuilder', mock.Mock())
-    def test_no_response_doesnt_get_cached(self):
+    def test_empty_response_cached(self):
         """
-        Response doesn't get cached when empty.
+        Empty responses are cached too, so that they aren't requested again by every caller.
         """
         uuid = str(self.enterprise_customer.uuid)
         api_resource_name = 'enterprise-customer'
@@ -83,10 +84,15 @@ class TestEnterpriseApiClient(unittest.TestCase, EnterpriseMockMixin):
             resource_id=uuid,
         )
         assert not response
+        assert utils.get_cached_value(cache_key) == {}
 
-        # The empty response is not cached.
-        cached_api_response = cache.get(cache_key)
-        assert not cached_api_response
+        response = client._load_data(  # pylint: disable=protected-access
+            resource=api_resource_name,
+            detail_resource='courses',
+            resource_id=uuid,
+        )
+        assert not response
+        self._assert_num_requests(1)
 
     @mock.patch('enterprise.api_client.lms.JwtBuilder', mock.Mock())
     def test_skip_request_if_response_cached(self):
@@ -172,3 +178,101 @@ class TestEnterpriseApiClient(unittest.TestCase, EnterpriseMockMixin):
         )
         # Verify the enterprise API was called multiple time for each paginated view
         self._assert_num_requests(len(course_run_ids))
+
+    @responses.activate
+    @mock.patch('enterprise.api_client.lms.JwtBuilder', mock.Mock())
+    def test_iter_enterprise_courses(self):
+        """
+        Verify that the client method `iter_enterprise_courses` yields all courses, then caches them.
+        """
+        uuid = str(self.enterprise_customer.uuid)
+        course_run_ids = ['course-v1:edX+DemoX+Demo_Course_1', 'course-v1:edX+DemoX+Demo_Course_2']
+        self.mock_ent_courses_api_with_pagination(
+            enterprise_uuid=uuid,
+            course_run_ids=course_run_ids
+        )
+        cache_key = get_cache_key(
+            resource='enterprise-customer',
+            querystring={},
+            resource_id=uuid,
+            traverse_pagination=True,
+        )
+
+        client = enterprise_api.EnterpriseApiClient(self.user)
+        courses = client.iter_enterprise_courses(self.enterprise_customer)
+        # The first page is fetched right away, and the following ones as they are consumed.
+        self._assert_num_requests(1)
+        assert cache.get(cache_key) is None
+        courses = list(courses)
+        assert [course['course_runs'][0]['key'] for course in courses] == course_run_ids
+        self._assert_num_requests(len(course_run_ids))
+
+        # The courses are cached as the response of `get_enterprise_courses` traversing pagination.
+        api_response = client.get_enterprise_courses(self.enterprise_customer, traverse_pagination=True)
+        self._assert_enterprise_courses_api_response(
+            course_run_ids, api_response, expected_courses_count=len(course_run_ids)
+        )
+        assert list(client.iter_enterprise_courses(self.enterprise_customer)) == courses
+        self._assert_num_requests(len(course_run_ids))
+
+    @responses.activate
+    @mock.patch('enterprise.api_client.lms.JwtBuilder', mock.Mock())
+    @mock.patch('enterprise.utils.time.sleep')
+    def test_iter_enterprise_courses_concurrently(self, mock_sleep):
+        """
+        Verify that concurrent `iter_enterprise_courses` calls on a cold cache traverse the courses only once.
+        """
+        uuid = str(self.enterprise_customer.uuid)
+        course_run_ids = ['course-v1:edX+DemoX+Demo_Course_1', 'course-v1:edX+DemoX+Demo_Course_2']
+        self.mock_ent_courses_api_with_pagination(enterprise_uuid=uuid, course_run_ids=course_run_ids)
+        cache_key = get_cache_key(
+            resource='enterprise-customer',
+            querystring={},
+            resource_id=uuid,
+            traverse_pagination=True,
+        )
+        client = enterprise_api.EnterpriseApiClient(self.user)
+
+        # The first caller takes the lock, so the second one waits for it to be done.
+        first_courses = client.iter_enterprise_courses(self.enterprise_customer)
+        assert cache.get(cache_key + '__lock')
+        consumed_courses = []
+        mock_sleep.side_effect = lambda interval: consumed_courses.extend(first_courses)
+        second_courses = list(client.iter_enterprise_courses(self.enterprise_customer))
+
+        assert [course['course_runs'][0]['key'] for course in consumed_courses] == course_run_ids
+        assert second_courses == consumed_courses
+        self._assert_num_requests(len(course_run_ids))
+        assert cache.get(cache_key + '__lock') is None
+
+    @responses.activate
+    @mock.patch('enterprise.api_client.lms.JwtBuilder', mock.Mock())
+    @mock.patch('enterprise.utils.random.random', mock.Mock(return_value=0.5))
+    def test_iter_enterprise_courses_early_refresh(self):
+        """
+        Verify that a single `iter_enterprise_courses` caller refreshes courses nearing expiry.
+        """
+        uuid = str(self.enterprise_customer.uuid)
+        course_run_ids = ['course-v1:edX+DemoX+Demo_Course_1', 'course-v1:edX+DemoX+Demo_Course_2']
+        self.mock_ent_courses_api_with_pagination(enterprise_uuid=uuid, course_run_ids=course_run_ids)
+        cache_key = get_cache_key(
+            resource='enterprise-customer',
+            querystring={},
+            resource_id=uuid,
+            traverse_pagination=True,
+        )
+        stale_response = {'count': 1, 'next': 'None', 'previous': 'None', 'results': [{'key': 'stale'}]}
+        # Courses that took long to load are refreshed well ahead of their expiry.
+        utils.set_cached_value(cache_key, stale_response, 60, load_time=1000)
+        client = enterprise_api.EnterpriseApiClient(self.user)
+
+        refreshed_courses = client.iter_enterprise_courses(self.enterprise_customer)
+        # Concurrent callers are served the stale courses meanwhile.
+        assert list(client.iter_enterprise_courses(self.enterprise_customer)) == [{'key': 'stale'}]
+        self._assert_num_requests(1)
+
+        refreshed_courses = list(refreshed_courses)
+        assert [course['course_runs'][0]['key'] for course in refreshed_courses] == course_run_ids
+        assert list(client.iter_enterprise_courses(self.enterprise_customer)) == refreshed_courses
+        self._assert_num_requests(len(course_run_ids))
+        assert cache.get(cache_key + '__lock') is None
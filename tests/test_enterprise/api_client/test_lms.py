@@ -14,6 +14,8 @@ from pytest import raises
 from slumber.exceptions import HttpNotFoundError
 
 from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
 
 from enterprise.api_client import lms as lms_api
 from enterprise.utils import NotConnectedToOpenEdX
@@ -213,6 +215,34 @@ def test_get_enrolled_courses():
     assert actual_response == expected_response
 
 
+@responses.activate
+def test_get_course_enrollments():
+    course_id = "edX/DemoX/Demo_Course"
+    first_page = {
+        "next": _url("enrollment", "enrollments") + "?course_id={}&cursor=abc".format(course_id),
+        "results": [{"user": "first_learner", "course_id": course_id, "mode": "audit"}],
+    }
+    second_page = {
+        "next": None,
+        "results": [{"user": "second_learner", "course_id": course_id, "mode": "verified"}],
+    }
+    responses.add(
+        responses.GET,
+        _url("enrollment", "enrollments") + "?course_id={}".format(course_id),
+        match_querystring=True,
+        json=first_page,
+    )
+    responses.add(
+        responses.GET,
+        _url("enrollment", "enrollments") + "?course_id={}&cursor=abc".format(course_id),
+        match_querystring=True,
+        json=second_page,
+    )
+    client = lms_api.EnrollmentApiClient()
+    actual_response = client.get_course_enrollments(course_id)
+    assert [enrollment["user"] for enrollment in actual_response] == ["first_learner", "second_learner"]
+
+
 def test_enroll_locally_raises():
     with raises(NotConnectedToOpenEdX):
         lms_api.enroll_user_in_course_locally(None, None, None)
@@ -247,6 +277,25 @@ def test_get_full_course_details_not_found():
     assert actual_response is None
 
 
+@responses.activate
+@override_settings(ENTERPRISE_COURSE_DETAILS_CACHE_TIMEOUT=60)
+def test_get_full_course_details_cached():
+    cache.clear()
+    course_id = "course-v1:edX+DemoX+Demo_Course"
+    expected_response = {
+        "name": "edX Demo Course"
+    }
+    responses.add(
+        responses.GET,
+        _url("courses", "courses/course-v1:edX+DemoX+Demo_Course/"),
+        json=expected_response,
+    )
+    assert lms_api.CourseApiClient().get_course_details(course_id) == expected_response
+    assert lms_api.CourseApiClient().get_course_details(course_id) == expected_response
+    assert len(responses.calls) == 1
+    cache.clear()
+
+
 @responses.activate
 def test_get_remote_id_not_found():
     username = "Darth"
@@ -316,6 +365,66 @@ def test_get_remote_id():
     assert actual_response == "LukeIamYrFather"
 
 
+@responses.activate
+def test_get_remote_ids():
+    provider_id = "DeathStar"
+    responses.add(
+        responses.GET,
+        _url("third_party_auth", "providers/{provider}/users?username=Darth&username=Leia&username=Luke".format(
+            provider=provider_id
+        )),
+        match_querystring=True,
+        json={
+            "next": _url("third_party_auth", "providers/{provider}/users?page=2&username=Darth&username=Leia"
+                                             "&username=Luke".format(provider=provider_id)),
+            "results": [
+                {"username": "Darth", "remote_id": "LukeIamYrFather"},
+                {"username": "Obi-Wan", "remote_id": "Kenobi"},
+            ],
+        },
+    )
+    responses.add(
+        responses.GET,
+        _url("third_party_auth", "providers/{provider}/users?page=2&username=Darth&username=Leia"
+                                 "&username=Luke".format(provider=provider_id)),
+        match_querystring=True,
+        json={
+            "next": None,
+            "results": [
+                {"username": "Luke", "remote_id": "Skywalker"},
+            ],
+        },
+    )
+    client = lms_api.ThirdPartyAuthApiClient()
+    actual_response = client.get_remote_ids(provider_id, ["Luke", "Darth", "Leia", "Luke"])
+    assert actual_response == {"Darth": "LukeIamYrFather", "Luke": "Skywalker"}
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_get_remote_ids_batched():
+    provider_id = "DeathStar"
+    responses.add(
+        responses.GET,
+        _url("third_party_auth", "providers/{provider}/users?username=Darth&username=Leia".format(
+            provider=provider_id
+        )),
+        match_querystring=True,
+        json={"results": [{"username": "Darth", "remote_id": "LukeIamYrFather"}]},
+    )
+    responses.add(
+        responses.GET,
+        _url("third_party_auth", "providers/{provider}/users?username=Luke".format(provider=provider_id)),
+        match_querystring=True,
+        status=404,
+    )
+    client = lms_api.ThirdPartyAuthApiClient()
+    with mock.patch.object(lms_api.ThirdPartyAuthApiClient, 'REMOTE_ID_BATCH_SIZE', 2):
+        actual_response = client.get_remote_ids(provider_id, ["Luke", "Darth", "Leia"])
+    assert actual_response == {"Darth": "LukeIamYrFather"}
+    assert len(responses.calls) == 2
+
+
 def test_jwt_lms_api_client_locally_raises():
     with raises(NotConnectedToOpenEdX):
         client = lms_api.JwtLmsApiClient('user-goes-here')
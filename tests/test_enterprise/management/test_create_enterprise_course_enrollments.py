@@ -13,6 +13,7 @@ from django.core.management import CommandError, call_command
 from django.test import TestCase
 
 from enterprise.management.commands.create_enterprise_course_enrollments import HttpClientError
+from enterprise.models import EnterpriseCourseEnrollment
 from test_utils.factories import (
     EnterpriseCourseEnrollmentFactory,
     EnterpriseCustomerFactory,
@@ -208,3 +209,151 @@ class CreateEnterpriseCourseEnrollmentCommandTests(TestCase):
                                            course=course_id,
                                        )
         logger_mock.info.assert_called_with(expected_command_log_message)
+
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.ROSTER_QUERY_CHUNK_SIZE', 1)
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.CourseApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.EnrollmentApiClient')
+    def test_command_with_chunked_learner_queries(self, enrollment_api_client_mock, course_api_client_mock):
+        """
+        Test that the command matches learners against existing enrollments in chunks.
+        """
+        course_id = 'course-v1:edX+DemoX+Demo_Course'
+        learners = [self.enterprise_customer_user] + [
+            EnterpriseCustomerUserFactory(
+                user_id=UserFactory.create(username='learner_{}'.format(index)).id,
+                enterprise_customer=self.enterprise_customer,
+            )
+            for index in range(2)
+        ]
+        EnterpriseCourseEnrollmentFactory(course_id=course_id, enterprise_customer_user=learners[1])
+        course_api_client_mock.return_value.get_course_details.return_value = {'name': 'edX Demo Course'}
+        enrollment_api_client_mock.return_value.get_course_enrollment.side_effect = lambda username, __: {
+            'user': username, 'is_active': True,
+        }
+        call_command(self.command, enterprise_uuid=self.enterprise_customer.uuid, courses=course_id)
+
+        enrollments = EnterpriseCourseEnrollment.objects.filter(course_id=course_id)
+        assert sorted(enrollments.values_list('enterprise_customer_user_id', flat=True)) == sorted(
+            learner.id for learner in learners
+        )
+        assert EnterpriseCourseEnrollment.history.filter(course_id=course_id, history_type='+').count() == 3
+
+    @ddt.data(1, 4)
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.CourseApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.EnrollmentApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.LOGGER')
+    def test_command_with_workers(
+            self,
+            workers,
+            logger_mock,
+            enrollment_api_client_mock,
+            course_api_client_mock
+    ):
+        """
+        Test that the command creates enterprise course enrollment records only for
+        the enrolled learners, whatever the number of concurrent lookups.
+        """
+        course_id = 'course-v1:edX+DemoX+Demo_Course'
+        enrolled_user = UserFactory.create(username='enrolled_learner')
+        enrolled_learner = EnterpriseCustomerUserFactory(
+            user_id=enrolled_user.id,
+            enterprise_customer=self.enterprise_customer,
+        )
+        EnterpriseCustomerUserFactory(
+            user_id=UserFactory.create(username='not_enrolled_learner').id,
+            enterprise_customer=self.enterprise_customer,
+        )
+        course_api_client_mock.return_value.get_course_details.return_value = {
+            'name': 'edX Demo Course',
+        }
+        enrollment_api_client = enrollment_api_client_mock.return_value
+        enrollment_api_client.get_course_enrollment.side_effect = lambda username, __: (
+            {'user': username, 'is_active': True}
+            if username in (self.user.username, enrolled_user.username) else None
+        )
+        call_command(
+            self.command,
+            enterprise_uuid=self.enterprise_customer.uuid,
+            courses=course_id,
+            workers=workers,
+        )
+
+        assert enrollment_api_client.get_course_enrollment.call_count == 3
+        enrollments = EnterpriseCourseEnrollment.objects.filter(course_id=course_id)
+        assert sorted(enrollments.values_list('enterprise_customer_user_id', flat=True)) == sorted(
+            [self.enterprise_customer_user.id, enrolled_learner.id]
+        )
+        assert EnterpriseCourseEnrollment.history.filter(course_id=course_id, history_type='+').count() == 2
+        logger_mock.info.assert_called_with(
+            'Created 2 missing EnterpriseCourseEnrollments for 2 enterprise learners enrolled in {course}.'.format(
+                course=course_id
+            )
+        )
+
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.CourseApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.EnrollmentApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.LOGGER')
+    def test_command_with_roster(self, logger_mock, enrollment_api_client_mock, course_api_client_mock):
+        """
+        Test that the roster mode matches the course roster against the enterprise learners
+        without looking up each learner's enrollment.
+        """
+        course_id = 'course-v1:edX+DemoX+Demo_Course'
+        EnterpriseCustomerUserFactory(
+            user_id=UserFactory.create(username='not_enrolled_learner').id,
+            enterprise_customer=self.enterprise_customer,
+        )
+        course_api_client_mock.return_value.get_course_details.return_value = {
+            'name': 'edX Demo Course',
+        }
+        enrollment_api_client = enrollment_api_client_mock.return_value
+        enrollment_api_client.get_course_enrollments.return_value = [
+            {'user': self.user.username, 'course_id': course_id, 'mode': 'verified'},
+            {'user': UserFactory.create(username='non_enterprise_learner').username, 'course_id': course_id},
+        ]
+        call_command(
+            self.command,
+            enterprise_uuid=self.enterprise_customer.uuid,
+            courses=course_id,
+            roster=True,
+        )
+
+        assert not enrollment_api_client.get_course_enrollment.called
+        enrollment_api_client.get_course_enrollments.assert_called_once_with(course_id)
+        assert list(
+            EnterpriseCourseEnrollment.objects.filter(course_id=course_id).values_list(
+                'enterprise_customer_user_id', flat=True
+            )
+        ) == [self.enterprise_customer_user.id]
+        logger_mock.info.assert_called_with(
+            'Created 1 missing EnterpriseCourseEnrollments for 1 enterprise learners enrolled in {course}.'.format(
+                course=course_id
+            )
+        )
+
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.CourseApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.EnrollmentApiClient')
+    @mock.patch('enterprise.management.commands.create_enterprise_course_enrollments.LOGGER')
+    def test_command_with_unavailable_roster(self, logger_mock, enrollment_api_client_mock, course_api_client_mock):
+        """
+        Test that the roster mode skips courses whose roster can not be retrieved.
+        """
+        course_id = 'course-v1:edX+DemoX+Demo_Course'
+        course_api_client_mock.return_value.get_course_details.return_value = {
+            'name': 'edX Demo Course',
+        }
+        enrollment_api_client_mock.return_value.get_course_enrollments.side_effect = HttpClientError
+        call_command(
+            self.command,
+            enterprise_uuid=self.enterprise_customer.uuid,
+            courses=course_id,
+            roster=True,
+        )
+
+        logger_mock.error.assert_called_with(
+            'Failed to retrieve enrollment roster from LMS API for {course}'.format(course=course_id)
+        )
+        logger_mock.warning.assert_called_with(
+            'Enrollment roster for {course} not available, skipping.'.format(course=course_id)
+        )
+        assert not EnterpriseCourseEnrollment.objects.filter(course_id=course_id).exists()
@@ -14,6 +14,7 @@ import mock
 from consent.errors import InvalidProxyConsent
 from consent.helpers import get_data_sharing_consent
 from consent.models import DataSharingConsent, ProxyDataSharingConsent
+from edx_rest_api_client.exceptions import HttpClientError
 from faker import Factory as FakerFactory
 from integrated_channels.integrated_channel.models import (
     EnterpriseCustomerPluginConfiguration,
@@ -28,10 +29,16 @@ from integrated_channels.sap_success_factors.models import (
 from opaque_keys.edx.keys import CourseKey
 from pytest import mark, raises
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.files.storage import Storage
+from django.db import connection
+from django.template import Template
+from django.test import override_settings
 from django.test.testcases import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 
 from enterprise.models import (
     EnrollmentNotificationEmailTemplate,
@@ -44,6 +51,7 @@ from enterprise.models import (
     PendingEnterpriseCustomerUser,
     logo_path,
 )
+from enterprise.utils import request_memo
 from test_utils.factories import (
     DataSharingConsentFactory,
     EnterpriseCourseEnrollmentFactory,
@@ -120,6 +128,66 @@ class TestEnterpriseCourseEnrollment(unittest.TestCase):
         )
         assert expected_str == method(self.enrollment)
 
+    @ddt.data(
+        ('audit', True),
+        ('honor', True),
+        ('verified', False),
+    )
+    @ddt.unpack
+    @mock.patch('enterprise.models.EnrollmentApiClient')
+    def test_is_audit_enrollment(self, mode, expected, mock_enrollment_api):
+        """
+        Test that the course enrollment mode is fetched once and memoized on the instance.
+        """
+        mock_enrollment_api.return_value.get_course_enrollment.return_value = dict(mode=mode)
+        assert self.enrollment.is_audit_enrollment == expected
+        assert self.enrollment.is_audit_enrollment == expected
+        mock_enrollment_api.return_value.get_course_enrollment.assert_called_once_with(
+            self.username, self.course_id
+        )
+
+    @mock.patch('enterprise.models.EnrollmentApiClient')
+    def test_load_course_enrollment_modes(self, mock_enrollment_api):
+        """
+        Test that course enrollment modes are resolved with one Enrollment API call per learner.
+        """
+        other_course_id = 'course-v1:edX+DemoX+OtherCourse'
+        other_enrollment = EnterpriseCourseEnrollment.objects.create(
+            enterprise_customer_user=self.enterprise_customer_user,
+            course_id=other_course_id,
+        )
+        unlisted_enrollment = EnterpriseCourseEnrollment.objects.create(
+            enterprise_customer_user=self.enterprise_customer_user,
+            course_id='course-v1:edX+DemoX+UnlistedCourse',
+        )
+        mock_enrollment_api.return_value.get_enrolled_courses.return_value = [
+            {'course_details': {'course_id': self.course_id}, 'mode': 'audit'},
+            {'course_details': {'course_id': other_course_id}, 'mode': 'verified'},
+        ]
+
+        enrollments = [self.enrollment, other_enrollment, unlisted_enrollment]
+        EnterpriseCourseEnrollment.load_course_enrollment_modes(enrollments)
+        assert [enrollment.course_enrollment_mode for enrollment in enrollments] == ['audit', 'verified', None]
+        assert [enrollment.is_audit_enrollment for enrollment in enrollments] == [True, False, False]
+        mock_enrollment_api.return_value.get_enrolled_courses.assert_called_once_with(self.username)
+
+        # Courses missing from the listing have no enrollment, without looking them up one by one.
+        assert not mock_enrollment_api.return_value.get_course_enrollment.called
+
+    @mock.patch('enterprise.models.EnrollmentApiClient')
+    def test_load_course_enrollment_modes_api_error(self, mock_enrollment_api):
+        """
+        Test that enrollments fall back to single lookups when the learner's enrollments can't be listed.
+        """
+        mock_enrollment_api.return_value.get_enrolled_courses.side_effect = HttpClientError
+        mock_enrollment_api.return_value.get_course_enrollment.return_value = dict(mode='audit')
+
+        EnterpriseCourseEnrollment.load_course_enrollment_modes([self.enrollment])
+        assert self.enrollment.is_audit_enrollment
+        mock_enrollment_api.return_value.get_course_enrollment.assert_called_once_with(
+            self.username, self.course_id
+        )
+
 
 @mark.django_db
 class TestEnterpriseCustomerManager(unittest.TestCase):
@@ -220,6 +288,96 @@ class TestEnterpriseCustomer(unittest.TestCase):
         catalogless_customer = EnterpriseCustomerFactory(catalog=None)
         assert catalogless_customer.catalog_contains_course(course_id) is False
 
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_catalog_contains_course_memoized_per_request(self, mock_catalog_api_class):
+        """
+        Test that catalog containment is looked up once per course within a request memo only.
+        """
+        mock_catalog_api = mock_catalog_api_class.return_value
+        mock_catalog_api.is_course_in_catalog.return_value = True
+        customer = EnterpriseCustomerFactory()
+
+        with request_memo():
+            assert customer.catalog_contains_course('course_exists')
+            assert customer.catalog_contains_course('course_exists')
+            assert customer.catalog_contains_course('course_also_exists')
+        assert mock_catalog_api.is_course_in_catalog.call_count == 2
+
+        assert customer.catalog_contains_course('course_exists')
+        assert mock_catalog_api.is_course_in_catalog.call_count == 3
+
+    @mock.patch('enterprise.models.CourseCatalogApiServiceClient')
+    def test_catalog_contains_courses_memoized_per_request(self, mock_catalog_api_class):
+        """
+        Test that only courses whose containment isn't memoized yet are looked up, in a single batch.
+        """
+        mock_catalog_api = mock_catalog_api_class.return_value
+        mock_catalog_api.is_course_in_catalog.return_value = True
+        # Answers for IDs that weren't asked about are ignored, and IDs missing from the answer aren't contained.
+        mock_catalog_api.get_catalog_course_containment.return_value = {'course_also_exists': True, 'other': True}
+        customer = EnterpriseCustomerFactory()
+
+        with request_memo():
+            assert customer.catalog_contains_course('course_exists')
+            assert customer.catalog_contains_courses(['course_exists', 'course_also_exists', 'fake_course']) == {
+                'course_exists': True,
+                'course_also_exists': True,
+                'fake_course': False,
+            }
+            assert customer.catalog_contains_courses(['course_exists', 'fake_course']) == {
+                'course_exists': True,
+                'fake_course': False,
+            }
+        mock_catalog_api.get_catalog_course_containment.assert_called_once_with(
+            customer.catalog,
+            ['course_also_exists', 'fake_course'],
+        )
+
+    @override_settings(ENTERPRISE_CUSTOMER_CACHE_TIMEOUT=60)
+    def test_get_cached(self):
+        """
+        Test that ``get_cached`` reads enterprise customers and their relations from the cache until they change.
+        """
+        cache.clear()
+        customer = EnterpriseCustomerFactory()
+        EnterpriseCustomerIdentityProviderFactory(provider_id='first-idp', enterprise_customer=customer)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_customer = EnterpriseCustomer.get_cached(str(customer.uuid))
+            assert cached_customer == customer
+            assert cached_customer.identity_provider == 'first-idp'
+            assert cached_customer.site == customer.site
+        assert len(queries) == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            cached_customer = EnterpriseCustomer.get_cached(customer.uuid.hex)
+            assert cached_customer.identity_provider == 'first-idp'
+            assert cached_customer.site == customer.site
+        assert len(queries) == 0
+
+        customer.enterprise_customer_identity_provider.provider_id = 'second-idp'
+        customer.enterprise_customer_identity_provider.save()
+        assert EnterpriseCustomer.get_cached(customer.uuid).identity_provider == 'second-idp'
+
+        customer.name = 'Renamed'
+        customer.save()
+        assert EnterpriseCustomer.get_cached(customer.uuid).name == 'Renamed'
+
+        customer.site.domain = 'renamed.example.com'
+        customer.site.save()
+        assert EnterpriseCustomer.get_cached(customer.uuid).site.domain == 'renamed.example.com'
+
+        customer.delete()
+        with raises(EnterpriseCustomer.DoesNotExist):
+            EnterpriseCustomer.get_cached(customer.uuid)
+
+    def test_get_cached_invalid_uuid(self):
+        """
+        Test that ``get_cached`` raises ``DoesNotExist`` for invalid UUIDs.
+        """
+        with raises(EnterpriseCustomer.DoesNotExist):
+            EnterpriseCustomer.get_cached('not-a-uuid')
+
 
 @mark.django_db
 @ddt.ddt
@@ -397,6 +555,39 @@ class TestEnterpriseCustomerUser(unittest.TestCase):
         enterprise_customer_user = EnterpriseCustomerUserFactory(user_id=42)
         assert enterprise_customer_user.username is None
 
+    def test_user_properties_memoized(self):
+        user = UserFactory(username='memoized', email='memoized@example.com')
+        enterprise_customer_user = EnterpriseCustomerUser.objects.get(
+            pk=EnterpriseCustomerUserFactory(user_id=user.id).pk
+        )
+        with mock.patch('enterprise.models.User.objects.get', wraps=User.objects.get) as get_user:
+            assert enterprise_customer_user.user == user
+            assert enterprise_customer_user.username == 'memoized'
+            assert enterprise_customer_user.user_email == 'memoized@example.com'
+        assert get_user.call_count == 1
+
+    def test_user_memo_follows_user_id(self):
+        first_user, second_user = UserFactory(), UserFactory()
+        enterprise_customer_user = EnterpriseCustomerUserFactory(user_id=first_user.id)
+        assert enterprise_customer_user.user == first_user
+        enterprise_customer_user.user_id = second_user.id
+        assert enterprise_customer_user.user == second_user
+
+    def test_prefetch_users(self):
+        enterprise_customer = EnterpriseCustomerFactory()
+        users = [UserFactory() for __ in range(3)]
+        for user in users:
+            EnterpriseCustomerUserFactory(user_id=user.id, enterprise_customer=enterprise_customer)
+        EnterpriseCustomerUserFactory(user_id=424242, enterprise_customer=enterprise_customer)
+
+        queryset = EnterpriseCustomerUser.objects.filter(enterprise_customer=enterprise_customer).prefetch_users()
+        with mock.patch('enterprise.models.User.objects.in_bulk', wraps=User.objects.in_bulk) as in_bulk:
+            with mock.patch('enterprise.models.User.objects.get') as get_user:
+                usernames = sorted(ecu.username for ecu in queryset.order_by('user_id') if ecu.user)
+        assert in_bulk.call_count == 1
+        assert not get_user.called
+        assert usernames == sorted(user.username for user in users)
+
     @ddt.data(
         (None, None, False),
         ('fake-identity', 'saml-user-id', True),
@@ -417,6 +608,59 @@ class TestEnterpriseCustomerUser(unittest.TestCase):
         else:
             assert mock_third_party_api.return_value.get_remote_id.call_count == 0
 
+    @override_settings(ENTERPRISE_REMOTE_ID_CACHE_TIMEOUT=60)
+    @mock.patch('enterprise.models.ThirdPartyAuthApiClient')
+    def test_get_remote_id_cached(self, mock_third_party_api):
+        """
+        Test that remote IDs which are found are cached, and those which aren't are not.
+        """
+        cache.clear()
+        enterprise_customer = EnterpriseCustomerFactory()
+        EnterpriseCustomerIdentityProviderFactory(provider_id='fake-identity', enterprise_customer=enterprise_customer)
+        learner = EnterpriseCustomerUserFactory(
+            user_id=UserFactory(username='hi').id,
+            enterprise_customer=enterprise_customer,
+        )
+        mock_third_party_api.return_value.get_remote_id.return_value = None
+        for expected_value in (None, 'saml-user-id', 'saml-user-id'):
+            enterprise_customer_user = EnterpriseCustomerUser.objects.get(pk=learner.pk)
+            assert enterprise_customer_user.get_remote_id() == expected_value
+            assert enterprise_customer_user.get_remote_id() == expected_value
+            mock_third_party_api.return_value.get_remote_id.return_value = 'saml-user-id'
+        assert mock_third_party_api.return_value.get_remote_id.call_count == 2
+
+    @override_settings(ENTERPRISE_REMOTE_ID_CACHE_TIMEOUT=60)
+    @mock.patch('enterprise.models.ThirdPartyAuthApiClient')
+    def test_load_remote_ids(self, mock_third_party_api):
+        """
+        Test that remote IDs are fetched in bulk per identity provider, and read from the cache afterwards.
+        """
+        cache.clear()
+        enterprise_customer = EnterpriseCustomerFactory()
+        EnterpriseCustomerIdentityProviderFactory(provider_id='fake-identity', enterprise_customer=enterprise_customer)
+        learners = [
+            EnterpriseCustomerUserFactory(user_id=UserFactory(username=username).id,
+                                          enterprise_customer=enterprise_customer)
+            for username in ('Darth', 'Luke', 'Leia')
+        ]
+        learners.append(EnterpriseCustomerUserFactory(user_id=UserFactory(username='Han').id))
+        mock_third_party_api.return_value.get_remote_ids.return_value = {'Darth': 'Vader', 'Luke': 'Skywalker'}
+
+        EnterpriseCustomerUser.load_remote_ids(learners)
+        assert [learner.get_remote_id() for learner in learners] == ['Vader', 'Skywalker', None, None]
+        get_remote_ids = mock_third_party_api.return_value.get_remote_ids
+        assert get_remote_ids.call_count == 1
+        assert get_remote_ids.call_args[0][0] == 'fake-identity'
+        assert sorted(get_remote_ids.call_args[0][1]) == ['Darth', 'Leia', 'Luke']
+        assert not mock_third_party_api.return_value.get_remote_id.called
+
+        # Only the learner whose remote ID wasn't found is looked up again.
+        learners = [EnterpriseCustomerUser.objects.get(pk=learner.pk) for learner in learners]
+        EnterpriseCustomerUser.load_remote_ids(learners)
+        assert [learner.get_remote_id() for learner in learners] == ['Vader', 'Skywalker', None, None]
+        assert get_remote_ids.call_count == 2
+        assert get_remote_ids.call_args[0][1] == ['Leia']
+
     @ddt.data(
         (
             True,
@@ -547,6 +791,63 @@ class TestEnterpriseCustomerUser(unittest.TestCase):
         assert sorted(enterprise_customer_user.entitlements, key=itemgetter('entitlement_id')) == \
             sorted(expected_entitlements, key=itemgetter('entitlement_id'))
 
+    @override_settings(ENTERPRISE_ENTITLEMENTS_CACHE_TIMEOUT=60)
+    def test_entitlements_cached(self):
+        """
+        Test that entitlements are cached per learner until consent, entitlements or the customer change.
+        """
+        cache.clear()
+        enterprise_customer = EnterpriseCustomerFactory(
+            enable_data_sharing_consent=True,
+            enforce_data_sharing_consent=EnterpriseCustomer.AT_ENROLLMENT,
+        )
+        user = UserFactory()
+        enterprise_customer_user = EnterpriseCustomerUserFactory(
+            user_id=user.id,
+            enterprise_customer=enterprise_customer,
+        )
+        EnterpriseCustomerEntitlementFactory(enterprise_customer=enterprise_customer, entitlement_id=1)
+
+        def get_entitlements():
+            """
+            Get the entitlements of a freshly loaded copy of the learner.
+            """
+            learner = EnterpriseCustomerUser.objects.get(pk=enterprise_customer_user.pk)
+            return sorted(learner.entitlements, key=itemgetter('entitlement_id'))
+
+        assert get_entitlements() == [{'entitlement_id': 1, 'requires_consent': True}]
+        learner = EnterpriseCustomerUser.objects.get(pk=enterprise_customer_user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            assert learner.entitlements == [{'entitlement_id': 1, 'requires_consent': True}]
+        assert len(queries) == 0
+
+        consent = DataSharingConsentFactory(
+            username=user.username,
+            enterprise_customer=enterprise_customer,
+            granted=True,
+        )
+        assert get_entitlements() == [{'entitlement_id': 1, 'requires_consent': False}]
+
+        EnterpriseCustomerEntitlementFactory(enterprise_customer=enterprise_customer, entitlement_id=2)
+        assert get_entitlements() == [
+            {'entitlement_id': 1, 'requires_consent': False},
+            {'entitlement_id': 2, 'requires_consent': False},
+        ]
+
+        consent.granted = False
+        consent.save()
+        assert get_entitlements() == [
+            {'entitlement_id': 1, 'requires_consent': True},
+            {'entitlement_id': 2, 'requires_consent': True},
+        ]
+
+        enterprise_customer.enforce_data_sharing_consent = EnterpriseCustomer.EXTERNALLY_MANAGED
+        enterprise_customer.save()
+        assert get_entitlements() == [
+            {'entitlement_id': 1, 'requires_consent': False},
+            {'entitlement_id': 2, 'requires_consent': False},
+        ]
+
 
 @mark.django_db
 @ddt.ddt
@@ -853,6 +1154,46 @@ class TestEnrollmentNotificationEmailTemplate(unittest.TestCase):
         assert plain == 'This is a template - testing real course, filled in'
         assert html == '<b>This is an HTML template! real course!!!</b>'
 
+    def test_templates_compiled_once(self):
+        """
+        Test that rendering the same template for many recipients compiles it only once.
+        """
+        with mock.patch('enterprise.models.Template', wraps=Template) as template_class:
+            for course_name in ('first course', 'second course', 'third course'):
+                plain, html = self.template.render_all_templates({'course_name': course_name})
+                assert html == '<b>This is an HTML template! {}!!!</b>'.format(course_name)
+                assert plain.startswith('This is a template - testing {}'.format(course_name))
+        assert template_class.call_count == 2
+
+    def test_edited_template_recompiled(self):
+        """
+        Test that saving an edited template makes the next render use the new text.
+        """
+        assert self.template.render_html_template({'course_name': 'course'}) == (
+            '<b>This is an HTML template! course!!!</b>'
+        )
+        self.template.html_template = '<i>Edited {{ course_name }}</i>'
+        self.template.save()
+
+        reloaded = EnrollmentNotificationEmailTemplate.objects.get(pk=self.template.pk)
+        assert reloaded.render_html_template({'course_name': 'course'}) == '<i>Edited course</i>'
+
+    def test_unsaved_template_edit_recompiled(self):
+        """
+        Test that editing a template without saving it makes the next render use the new text.
+        """
+        assert self.template.render_plaintext_template({'course_name': 'course'}).startswith(
+            'This is a template - testing course'
+        )
+        self.template.plaintext_template = 'Edited {{ course_name }}'
+        assert self.template.render_plaintext_template({'course_name': 'course'}) == 'Edited course'
+
+        # The saved template is compiled again for instances holding its saved text.
+        reloaded = EnrollmentNotificationEmailTemplate.objects.get(pk=self.template.pk)
+        assert reloaded.render_plaintext_template({'course_name': 'course'}).startswith(
+            'This is a template - testing course'
+        )
+
     @ddt.data(
         str, repr
     )
@@ -867,6 +1208,7 @@ class TestEnrollmentNotificationEmailTemplate(unittest.TestCase):
 
 
 @mark.django_db
+@ddt.ddt
 class TestDataSharingConsentManager(unittest.TestCase):
     """
     Tests for the custom Data Sharing Consent Manager.
@@ -903,6 +1245,90 @@ class TestDataSharingConsentManager(unittest.TestCase):
         assert isinstance(same_dsc, DataSharingConsent)
         assert dsc == same_dsc
 
+    @ddt.data(
+        (['course-v1:edX+DemoX+Demo_Course', 'edX+DemoX'], 'course-v1:edX+DemoX+Demo_Course'),
+        (['edX+DemoX'], 'edX+DemoX'),
+        (['course-v1:edX+DemoX+Other_Run'], None),
+    )
+    @ddt.unpack
+    def test_proxied_get_course_run_fallback(self, existing_course_ids, expected_course_id):
+        """
+        Test that ``proxied_get`` prefers the course run record, falls back to the course record, and
+        finds either with a single query when given an already-loaded EnterpriseCustomer.
+        """
+        enterprise_customer = EnterpriseCustomerFactory()
+        for course_id in existing_course_ids:
+            DataSharingConsentFactory(
+                enterprise_customer=enterprise_customer,
+                username='lowly_bob',
+                course_id=course_id,
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            dsc = DataSharingConsent.objects.proxied_get(
+                username='lowly_bob',
+                course_id='course-v1:edX+DemoX+Demo_Course',
+                enterprise_customer=enterprise_customer,
+            )
+            assert dsc.enterprise_customer == enterprise_customer
+        assert len(queries) == 1
+
+        if expected_course_id is None:
+            assert isinstance(dsc, ProxyDataSharingConsent)
+            assert dsc.course_id == 'course-v1:edX+DemoX+Demo_Course'
+        else:
+            assert isinstance(dsc, DataSharingConsent)
+            assert dsc.course_id == expected_course_id
+
+    def test_proxied_get_prefers_course_run_record(self):
+        """
+        Test that ``proxied_get`` returns the course run record when the course record exists as well.
+        """
+        enterprise_customer = EnterpriseCustomerFactory()
+        DataSharingConsentFactory(
+            enterprise_customer=enterprise_customer, username='lowly_bob', course_id='edX+DemoX', granted=False,
+        )
+        DataSharingConsentFactory(
+            enterprise_customer=enterprise_customer,
+            username='lowly_bob',
+            course_id='course-v1:edX+DemoX+Demo_Course',
+            granted=True,
+        )
+
+        dsc = DataSharingConsent.objects.proxied_get(
+            username='lowly_bob',
+            course_id='course-v1:edX+DemoX+Demo_Course',
+            enterprise_customer=enterprise_customer,
+        )
+        assert dsc.course_id == 'course-v1:edX+DemoX+Demo_Course'
+        assert dsc.granted
+
+    def test_proxied_get_multiple_records(self):
+        """
+        Test that ``proxied_get`` raises when several records match the same course run, like ``get`` does.
+        """
+        for username in ('lowly_bob', 'optimistic_bob'):
+            DataSharingConsentFactory(username=username, course_id='course-v1:edX+DemoX+Demo_Course')
+
+        with raises(DataSharingConsent.MultipleObjectsReturned):
+            DataSharingConsent.objects.proxied_get(course_id='course-v1:edX+DemoX+Demo_Course')
+
+    def test_proxied_get_by_enterprise_customer_uuid(self):
+        """
+        Test that ``proxied_get`` loads the related EnterpriseCustomer along with an existing record.
+        """
+        enterprise_customer = EnterpriseCustomerFactory()
+        DataSharingConsentFactory(enterprise_customer=enterprise_customer, username='lowly_bob', course_id='edX+DemoX')
+
+        with CaptureQueriesContext(connection) as queries:
+            dsc = DataSharingConsent.objects.proxied_get(
+                username='lowly_bob',
+                course_id='course-v1:edX+DemoX+Demo_Course',
+                enterprise_customer__uuid=enterprise_customer.uuid,
+            )
+            assert dsc.enterprise_customer == enterprise_customer
+        assert len(queries) == 1
+
 
 @ddt.ddt
 class TestProxyDataSharingConsent(TransactionTestCase):
@@ -934,6 +1360,40 @@ class TestProxyDataSharingConsent(TransactionTestCase):
         assert DataSharingConsent.objects.all().first() == new_dsc
         assert no_new_dsc.pk == new_dsc.pk
 
+    @ddt.data(True, False)
+    def test_commit_program_consent(self, granted):
+        """
+        Test that committing a program-level ``ProxyDataSharingConsent`` updates and creates all of its children's
+        records at once, along with their history.
+        """
+        enterprise_customer = self.proxy_dsc.enterprise_customer
+        existing_dsc = DataSharingConsentFactory(
+            enterprise_customer=enterprise_customer,
+            username='lowly_bob',
+            course_id='easy_course_2017',
+            granted=not granted,
+        )
+        program_dsc = ProxyDataSharingConsent.from_children('fake-program', self.proxy_dsc, existing_dsc)
+        program_dsc.granted = granted
+
+        with self.assertNumQueries(6):
+            committed_dsc = program_dsc.commit()
+
+        assert [child.course_id for child in committed_dsc._child_consents] == [  # pylint: disable=protected-access
+            'hard_course_2017', 'easy_course_2017'
+        ]
+        assert committed_dsc.exists
+        assert committed_dsc.granted == granted
+        assert sorted(DataSharingConsent.objects.values_list('course_id', 'granted')) == [
+            ('easy_course_2017', granted),
+            ('hard_course_2017', granted),
+        ]
+        assert sorted(DataSharingConsent.history.values_list('course_id', 'history_type')) == [
+            ('easy_course_2017', '+'),
+            ('easy_course_2017', '~'),
+            ('hard_course_2017', '+'),
+        ]
+
     @ddt.data(
         {
             'enterprise_customer__name': 'rich_enterprise',
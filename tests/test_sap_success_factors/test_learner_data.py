@@ -95,8 +95,9 @@ class TestBaseLearnerExporter(unittest.TestCase):
         assert not learner_data
         assert mock_grades_api.call_count == 0
 
+    @mock.patch('enterprise.models.EnrollmentApiClient')
     @mock.patch('integrated_channels.integrated_channel.learner_data.CourseApiClient')
-    def test_collect_learner_data_no_course_details(self, mock_course_api):
+    def test_collect_learner_data_no_course_details(self, mock_course_api, mock_enrollment_api):
         EnterpriseCourseEnrollmentFactory(
             enterprise_customer_user=self.enterprise_customer_user,
             course_id=self.course_id,
@@ -107,6 +108,51 @@ class TestBaseLearnerExporter(unittest.TestCase):
 
         learner_data = list(self.exporter.collect_learner_data())
         assert not learner_data
+        assert not mock_enrollment_api.return_value.get_course_enrollment.called
+
+    @ddt.data(1, 2, 500)
+    @mock.patch('enterprise.models.EnrollmentApiClient')
+    @mock.patch('integrated_channels.integrated_channel.learner_data.GradesApiClient')
+    @mock.patch('integrated_channels.integrated_channel.learner_data.CourseApiClient')
+    def test_collect_learner_data_in_chunks(self, chunk_size, mock_course_api, mock_grades_api, mock_enrollment_api):
+        course_ids = [self.course_id, 'course-v1:edX+DemoX+DemoCourse2']
+        enrollments = []
+        for index, username in enumerate(['R2D2', 'BB8', 'K2SO'], start=2):
+            enterprise_customer_user = EnterpriseCustomerUserFactory(
+                user_id=UserFactory(username=username, id=index).id,
+                enterprise_customer=self.enterprise_customer,
+            )
+            for course_id in course_ids:
+                enrollments.append(EnterpriseCourseEnrollmentFactory(
+                    enterprise_customer_user=enterprise_customer_user,
+                    course_id=course_id,
+                ))
+                DataSharingConsentFactory(
+                    username=username,
+                    course_id=course_id,
+                    enterprise_customer=self.enterprise_customer,
+                    granted=True,
+                )
+
+        def get_course_details(course_id):
+            """
+            Mock self-paced course details - set course_id to match input
+            """
+            return dict(pacing='self', course_id=course_id)
+        mock_course_api.return_value.get_course_details.side_effect = get_course_details
+        mock_grades_api.return_value.get_course_grade.return_value = dict(passed=False)
+        mock_enrollment_api.return_value.get_enrolled_courses.return_value = [
+            dict(course_details=dict(course_id=course_id), mode='verified') for course_id in course_ids
+        ]
+
+        with mock.patch.object(BaseLearnerExporter, 'ENROLLMENT_CHUNK_SIZE', chunk_size):
+            with freeze_time(self.NOW):
+                learner_data = list(self.exporter.collect_learner_data())
+
+        # Every enrollment is reported exactly once, ordered by course, and course details are fetched once per course.
+        expected_ids = [enrollment.id for enrollment in sorted(enrollments, key=lambda e: (e.course_id, e.id))]
+        assert [report.enterprise_course_enrollment_id for report in learner_data] == expected_ids
+        assert mock_course_api.return_value.get_course_details.call_count == len(course_ids)
 
     @mock.patch('enterprise.models.EnrollmentApiClient')
     @mock.patch('integrated_channels.integrated_channel.learner_data.CourseApiClient')
@@ -426,10 +472,10 @@ class TestBaseLearnerExporter(unittest.TestCase):
             passed=True,
         )
 
-        # Mock enrollment data, in particular the enrollment mode
-        mock_enrollment_api.return_value.get_course_enrollment.return_value = dict(
-            mode=mode
-        )
+        # Mock the learner's enrollments, in particular the enrollment mode
+        mock_enrollment_api.return_value.get_enrolled_courses.return_value = [
+            dict(course_details=dict(course_id=self.course_id), mode=mode),
+        ]
 
         # Collect the learner data
         with freeze_time(self.NOW):
@@ -437,6 +483,9 @@ class TestBaseLearnerExporter(unittest.TestCase):
 
         assert len(learner_data) == expected_data_len
 
+        # The enrollment mode is resolved in bulk, without per-enrollment lookups
+        assert not mock_enrollment_api.return_value.get_course_enrollment.called
+
         if expected_data_len == 1:
             report = learner_data[0]
             assert report.enterprise_course_enrollment_id == enrollment.id
@@ -6,6 +6,7 @@ from __future__ import absolute_import, unicode_literals
 
 import datetime
 import unittest
+from uuid import UUID
 
 import ddt
 import mock
@@ -17,6 +18,8 @@ from pytest import mark, raises
 from waffle.testutils import override_switch
 
 from django.core import mail
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
 from django.test import override_settings
 
 from enterprise import utils
@@ -26,6 +29,7 @@ from enterprise.models import (
     EnterpriseCustomerIdentityProvider,
     EnterpriseCustomerUser,
 )
+from six.moves.urllib.parse import parse_qs, urlsplit  # pylint: disable=import-error
 from test_utils import TEST_UUID, create_items
 from test_utils.factories import (
     EnterpriseCustomerFactory,
@@ -877,6 +881,308 @@ class TestEnterpriseUtils(unittest.TestCase):
         with raises(KeyError):
             utils.get_course_track_selection_url({}, {})
 
+    @override_settings(LMS_ROOT_URL='http://testserver')
+    def test_enterprise_url_builder_enrollment_urls(self):
+        """
+        Test that `EnterpriseUrlBuilder` builds the same enrollment URLs as `EnterpriseCustomer`, reversing once.
+        """
+        enterprise_customer = EnterpriseCustomerFactory()
+        course_run_keys = ['course-v1:edX+DemoX+Demo_Course', 'edX/DemoX/2017', 'course-v1:edX+Démo X+1T2017']
+        program_uuids = ['52ad909b-c57a-4ff1-bab3-74d2a8a13d73', 'a6a7fa93-7be5-4c3b-8a8b-4e4d6c6b2f06']
+        expected_urls = [enterprise_customer.get_course_run_enrollment_url(key) for key in course_run_keys]
+        expected_urls += [enterprise_customer.get_program_enrollment_url(uuid) for uuid in program_uuids]
+
+        url_builder = utils.EnterpriseUrlBuilder(enterprise_customer)
+        with mock.patch('enterprise.models.reverse', wraps=reverse) as mock_reverse:
+            urls = [url_builder.get_course_run_enrollment_url(key) for key in course_run_keys]
+            urls += [url_builder.get_program_enrollment_url(uuid) for uuid in program_uuids]
+        assert urls == expected_urls
+        assert mock_reverse.call_count == 2
+
+    @override_settings(LMS_ROOT_URL='http://testserver')
+    def test_enterprise_url_builder_track_selection_urls(self):
+        """
+        Test that `EnterpriseUrlBuilder` builds the same track selection and marketing URLs as the helpers.
+        """
+        query_parameters = {'tpa_hint': 'test-shib', 'catalog_id': 1}
+        course_runs = [{'key': 'course-v1:edX+DemoX+Demo_Course'}, {'key': 'course-v1:edX+DemoX+1T2017'}]
+        marketing_urls = ['http://testserver/course/demo', 'http://testserver/course/demo?utm_source=edX']
+
+        def course_modes_choose(__, kwargs):
+            """
+            Reverse the LMS track selection route, which is not part of this package.
+            """
+            return '/course_modes/choose/{}/'.format(kwargs['course_id'])
+
+        with mock.patch('enterprise.utils.reverse', side_effect=course_modes_choose) as mock_reverse:
+            expected_urls = [utils.get_course_track_selection_url(run, query_parameters) for run in course_runs]
+            mock_reverse.reset_mock()
+            url_builder = utils.EnterpriseUrlBuilder(EnterpriseCustomerFactory(), query_parameters)
+            urls = [url_builder.get_course_track_selection_url(run) for run in course_runs]
+            assert mock_reverse.call_count == 1
+            with raises(KeyError):
+                url_builder.get_course_track_selection_url({})
+
+        for url, expected_url in zip(urls, expected_urls):
+            assert urlsplit(url) == urlsplit(expected_url)
+        for url in marketing_urls:
+            expected_url = utils.update_query_parameters(url, query_parameters)
+            assert parse_qs(urlsplit(url_builder.update_query_parameters(url)).query) == \
+                parse_qs(urlsplit(expected_url).query)
+
+    @override_settings(LMS_ROOT_URL='http://testserver')
+    def test_enterprise_url_builder_without_query_parameters(self):
+        """
+        Test that `EnterpriseUrlBuilder` builds the same URLs as the helpers when there are no query parameters.
+        """
+        course_run = {'key': 'course-v1:edX+DemoX+Demo_Course'}
+        url = 'http://testserver/course/demo'
+
+        def course_modes_choose(__, kwargs):
+            """
+            Reverse the LMS track selection route, which is not part of this package.
+            """
+            return '/course_modes/choose/{}/'.format(kwargs['course_id'])
+
+        with mock.patch('enterprise.utils.reverse', side_effect=course_modes_choose):
+            expected_url = utils.get_course_track_selection_url(course_run, {})
+            url_builder = utils.EnterpriseUrlBuilder(EnterpriseCustomerFactory(), {})
+            assert url_builder.get_course_track_selection_url(course_run) == expected_url
+        assert url_builder.update_query_parameters(url) == utils.update_query_parameters(url, {}) == url
+
+    @ddt.data(
+        ([], 2, []),
+        ([1, 2, 3], 2, [[1, 2], [3]]),
+        ((item for item in range(4)), 2, [[0, 1], [2, 3]]),
+    )
+    @ddt.unpack
+    def test_chunked(self, items, size, expected_chunks):
+        """
+        Test that items are split into ordered chunks of at most the given size.
+        """
+        assert list(utils.chunked(items, size)) == expected_chunks
+
+    def test_get_cache_key(self):
+        """
+        Test that cache keys are namespaced by resource, and don't depend on the order of the arguments.
+        """
+        cache_key = utils.get_cache_key(
+            resource='enterprise-customer',
+            querystring={'page': 2, 'page_size': [10, 20]},
+            resource_id=UUID(TEST_UUID),
+        )
+        assert cache_key.startswith('enterprise:v{}:enterprise-customer:1:'.format(utils.CACHE_KEY_FORMAT_VERSION))
+        assert cache_key == utils.get_cache_key(
+            resource_id=TEST_UUID,
+            querystring={'page_size': [10, 20], 'page': 2},
+            resource='enterprise-customer',
+        )
+        assert cache_key != utils.get_cache_key(
+            resource='enterprise-customer',
+            querystring={'page': 3, 'page_size': [10, 20]},
+            resource_id=TEST_UUID,
+        )
+        assert utils.get_cache_key(course_id='course-v1:edX+DemoX+Demo_Course').startswith('enterprise:v1:default:1:')
+
+        # The entries of a namespace are invalidated by changing its version.
+        with override_settings(ENTERPRISE_CACHE_KEY_VERSIONS={'enterprise-customer': 2}):
+            new_cache_key = utils.get_cache_key(
+                resource='enterprise-customer',
+                querystring={'page': 2, 'page_size': [10, 20]},
+                resource_id=TEST_UUID,
+            )
+        assert new_cache_key.startswith('enterprise:v1:enterprise-customer:2:')
+        assert new_cache_key.split(':')[-1] == cache_key.split(':')[-1]
+
+    @ddt.data(
+        ({'count': 5, 'next': None, 'results': [1]}, []),
+        ({'count': 5, 'next': 'http://api/?cursor=abc', 'results': [1]}, []),
+        (
+            {'count': 5, 'next': 'http://api/?limit=2&offset=2', 'results': [1, 2]},
+            [{'limit': ['2'], 'offset': ['2']}, {'limit': ['2'], 'offset': ['4']}],
+        ),
+        (
+            {'count': 5, 'next': 'http://api/?page=2&q=x', 'results': [1, 2]},
+            [{'page': ['2'], 'q': ['x']}, {'page': ['3'], 'q': ['x']}],
+        ),
+        (
+            {'count': 4, 'next': 'http://api/?page=2&page_size=2', 'results': [1, 2]},
+            [{'page': ['2'], 'page_size': ['2']}],
+        ),
+    )
+    @ddt.unpack
+    def test_get_remaining_page_querystrings(self, response, expected_querystrings):
+        """
+        Test that the query strings of the remaining pages are derived from the response count and next link.
+        """
+        assert utils.get_remaining_page_querystrings(response) == expected_querystrings
+
+    @ddt.data(1, 3)
+    def test_traverse_pagination(self, max_workers):
+        """
+        Test that all pages are traversed and their results assembled in order, fetching them concurrently or not.
+        """
+        pages = {
+            str(page): {
+                'count': 7,
+                'next': 'http://api/?page={}'.format(page + 1) if page < 4 else None,
+                'results': list(range(page * 2 - 1, min(page * 2, 7) + 1)),
+            }
+            for page in range(1, 5)
+        }
+        endpoints = []
+
+        def get_endpoint():
+            """
+            Return a new endpoint serving the pages.
+            """
+            endpoint = mock.Mock()
+            endpoint.get.side_effect = lambda page: pages[page[0]]
+            endpoints.append(endpoint)
+            return endpoint
+
+        endpoint = get_endpoint()
+        results = utils.traverse_pagination(
+            pages['1'], endpoint, max_workers=max_workers, get_worker_endpoint=get_endpoint,
+        )
+        assert results == list(range(1, 8))
+        assert sorted(
+            call[1]['page'][0] for worker_endpoint in endpoints for call in worker_endpoint.get.call_args_list
+        ) == ['2', '3', '4']
+        if max_workers > 1:
+            # Concurrent pages are fetched through an endpoint of each worker thread, never the shared one.
+            assert not endpoint.get.called
+            assert 1 < len(endpoints) <= max_workers + 1
+
+        # Without a way to build an endpoint per worker thread, the pages are fetched one at a time.
+        endpoint.reset_mock()
+        assert utils.traverse_pagination(pages['1'], endpoint, max_workers=max_workers) == list(range(1, 8))
+        assert endpoint.get.call_count == 3
+
+        # Results of the first page are available before any other page is fetched.
+        endpoint.reset_mock()
+        results = utils.iter_pagination(pages['1'], endpoint, max_workers=max_workers, get_worker_endpoint=get_endpoint)
+        assert [next(results), next(results)] == [1, 2]
+        assert not endpoint.get.called
+
+    def test_get_cached_or_load(self):
+        """
+        Test that values are loaded once, then read from the cache until they expire.
+        """
+        cache.clear()
+        load = mock.Mock(return_value={'fake': 'response'})
+        assert utils.get_cached_or_load('fake-key', load, 60) == {'fake': 'response'}
+        assert utils.get_cached_or_load('fake-key', load, 60) == {'fake': 'response'}
+        assert load.call_count == 1
+        assert cache.get('fake-key__metadata')['load_time'] >= 0
+        assert cache.get('fake-key__lock') is None
+
+        # Falsy values are cached too, including None.
+        for value in ({}, None):
+            load = mock.Mock(return_value=value)
+            assert utils.get_cached_or_load('empty-key-{}'.format(value), load, 60) == value
+            assert utils.get_cached_or_load('empty-key-{}'.format(value), load, 60) == value
+            assert load.call_count == 1
+
+    @ddt.data(
+        # Expired values are refreshed by the caller acquiring the lock, and served stale to the others.
+        (-1, 0, False, 'fresh'),
+        (-1, 0, True, 'stale'),
+        # Values may be refreshed ahead of their expiry, more likely the longer they take to load.
+        (30, 0, False, 'stale'),
+        (30, 1000, False, 'fresh'),
+    )
+    @ddt.unpack
+    @mock.patch('enterprise.utils.random.random', mock.Mock(return_value=0.5))
+    def test_get_cached_or_load_refresh(self, expires_in, load_time, locked, expected_value):
+        """
+        Test that cached values are refreshed by a single caller around their expiry.
+        """
+        cache.clear()
+        utils.set_cached_value('fake-key', 'stale', 60, load_time=load_time)
+        metadata = cache.get('fake-key__metadata')
+        metadata['expires_at'] = metadata['expires_at'] - 60 + expires_in
+        cache.set('fake-key__metadata', metadata)
+        if locked:
+            cache.set('fake-key__lock', True)
+
+        assert utils.get_cached_or_load('fake-key', lambda: 'fresh', 60) == expected_value
+        assert utils.get_cached_value('fake-key') == expected_value
+
+    @mock.patch('enterprise.utils.time.sleep')
+    def test_get_cached_or_load_waits_for_lock(self, mock_sleep):
+        """
+        Test that callers wait for the value being loaded by another one when there is no stale value to serve.
+        """
+        cache.clear()
+        cache.set('fake-key__lock', True)
+        mock_sleep.side_effect = lambda interval: utils.set_cached_value('fake-key', 'loaded', 60)
+        load = mock.Mock(return_value='fresh')
+
+        assert utils.get_cached_or_load('fake-key', load, 60) == 'loaded'
+        assert not load.called
+
+        # Callers load the value themselves if the lock is released without it being cached.
+        cache.clear()
+        cache.set('fake-key__lock', True)
+        mock_sleep.side_effect = lambda interval: cache.delete('fake-key__lock')
+        assert utils.get_cached_or_load('fake-key', load, 60) == 'fresh'
+        assert load.call_count == 1
+
+        # Callers wait for a short time at most, even if the lock is held for longer, then load the value.
+        cache.clear()
+        cache.set('fake-key__lock', True)
+        mock_sleep.side_effect = None
+        with mock.patch('enterprise.utils._wait_for_cached_value', return_value=utils.CACHE_MISS) as mock_wait:
+            assert utils.get_cached_or_load('fake-key', load, 60) == 'fresh'
+        assert mock_wait.call_args[0][2] == 2
+        assert load.call_count == 2
+
+    @ddt.data(
+        (1000000, 1000000, False, False),
+        (100, 1000000, True, False),
+        (100, 100, True, True),
+    )
+    @ddt.unpack
+    @mock.patch('enterprise.utils.pickle.dumps', wraps=utils.pickle.dumps)
+    @mock.patch('enterprise.utils.newrelic')
+    def test_set_cached_value_compressed(self, threshold, chunk_size, compressed, chunked, mock_newrelic,
+                                         mock_dumps):
+        """
+        Test that large cached values are compressed, and split in chunks when still larger than the chunk size.
+        """
+        cache.clear()
+        value = {'results': [{'key': 'course-{}'.format(index), 'title': 'Demo Course'} for index in range(500)]}
+        with override_settings(
+                ENTERPRISE_CACHE_COMPRESSION_THRESHOLD=threshold,
+                ENTERPRISE_CACHE_CHUNK_SIZE=chunk_size,
+        ):
+            utils.set_cached_value('fake-key', value, 60)
+
+        # Values are pickled once, whether or not they are compressed.
+        assert mock_dumps.call_count == 1
+        cached_value = cache.get('fake-key')
+        assert isinstance(cached_value, utils.CompressedCacheValue)
+        assert cached_value.compressed == compressed
+        assert bool(cached_value.chunk_keys) == chunked
+        assert mock_newrelic.agent.record_custom_metric.called == compressed
+        assert utils.get_cached_value('fake-key') == value
+        assert utils.get_cached_or_load('fake-key', mock.Mock(side_effect=AssertionError), 60) == value
+
+    @override_settings(ENTERPRISE_CACHE_COMPRESSION_THRESHOLD=100, ENTERPRISE_CACHE_CHUNK_SIZE=100)
+    def test_get_cached_value_evicted_chunk(self):
+        """
+        Test that values are considered not cached when one of their chunks was evicted.
+        """
+        cache.clear()
+        value = {'results': [{'key': 'course-{}'.format(index), 'title': 'Demo Course'} for index in range(500)]}
+        utils.set_cached_value('fake-key', value, 60)
+        cache.delete(cache.get('fake-key').chunk_keys[-1])
+
+        assert utils.get_cached_value('fake-key') is None
+        assert utils.get_cached_or_load('fake-key', lambda: value, 60) == value
+        assert utils.get_cached_value('fake-key') == value
+
     @mock.patch('integrated_channels.integrated_channel.course_metadata.get_course_runs')
     def test_base_course_exporter_serialized_data_raises(self, mock_get_course_runs):
         mock_get_course_runs.return_value = []
@@ -983,6 +1289,22 @@ class TestEnterpriseUtils(unittest.TestCase):
         """
         assert utils.get_program_type_description(program_type) == expected_description
 
+    def test_get_request_memoized(self):
+        """
+        ``get_request_memoized`` should compute each value once per (outermost) ``request_memo`` block only.
+        """
+        compute = mock.Mock(side_effect=lambda: compute.call_count)
+
+        with utils.request_memo():
+            assert utils.get_request_memoized(('fact', 'a'), compute) == 1
+            with utils.request_memo():
+                assert utils.get_request_memoized(('fact', 'a'), compute) == 1
+            assert utils.get_request_memoized(('fact', 'a'), compute) == 1
+            assert utils.get_request_memoized(('fact', 'b'), compute) == 2
+
+        assert utils.get_request_memoized(('fact', 'a'), compute) == 3
+        assert utils.get_request_memoized(('fact', 'a'), compute) == 4
+
 
 def get_transformed_course_metadata(course_id, status):
     """